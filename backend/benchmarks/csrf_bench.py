@@ -0,0 +1,82 @@
+"""
+Задержка CSRF слоя: прежний @app.middleware("http") (BaseHTTPMiddleware + контейнер на каждый запрос)
+против CSRFMiddleware на чистом ASGI. Приложение за middleware сразу отвечает 200,
+запросы подаются прямо в ASGI callable, без HTTP клиента.
+
+Запуск: python -m backend.benchmarks.csrf_bench [--requests 20000]
+"""
+import argparse
+import asyncio
+import time
+
+from fastapi import HTTPException, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse, Response
+
+from backend.di_container import container as c
+from backend.src.app.core.middlewares.csrf import CSRFMiddleware
+from backend.src.app.core.services.security import SecurityService
+
+
+async def endpoint(scope, receive, send):
+    await Response(b'ok')(scope, receive, send)
+
+
+async def legacy_csrf_middleware(request: Request, call_next) -> Response:
+    # копия прежнего csrf_middleware из main.py
+    if request.method in ("POST", "DELETE", "PUT", "PATCH", ):
+        try:
+            c.security_service().require_csrf(request)
+        except HTTPException as e:
+            return JSONResponse(status_code=e.status_code, content={"detail": e.detail})
+    return await call_next(request)
+
+
+def make_scope(method: str, token: str) -> dict:
+    return {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': method,
+        'scheme': 'http', 'path': '/auth/refresh', 'raw_path': b'/auth/refresh', 'root_path': '',
+        'query_string': b'', 'server': ('bench', 80), 'client': ('127.0.0.1', 1000),
+        'headers': [
+            (b'host', b'bench'),
+            (b'cookie', f'{SecurityService.ACCESS_COOKIE}=access; {SecurityService.CSRF_COOKIE}={token}'.encode()),
+            (SecurityService.CSRF_HEADER.lower().encode(), token.encode()),
+        ],
+    }
+
+
+async def measure(app, scope: dict, requests: int) -> float:
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        pass
+
+    for _ in range(200):
+        await app(dict(scope), receive, send)
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=20000)
+    args = parser.parse_args()
+
+    token = SecurityService.create_csrf_token()
+    variants = {
+        'none': endpoint,
+        'legacy http middleware': BaseHTTPMiddleware(endpoint, dispatch=legacy_csrf_middleware),
+        'asgi CSRFMiddleware': CSRFMiddleware(endpoint, security=SecurityService),
+    }
+    print(f"{'middleware':<26}{'GET us':>10}{'POST us':>10}")
+    for name, app in variants.items():
+        get_us = await measure(app, make_scope('GET', token), args.requests)
+        post_us = await measure(app, make_scope('POST', token), args.requests)
+        print(f'{name:<26}{get_us:>10.1f}{post_us:>10.1f}')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+"""
+Микробенчмарк EventHandler: fire/link/unlink до (списки + inspect на каждый fire) и после (предкомпилированные таблицы).
+
+Запуск: python -m backend.benchmarks.event_handler_bench
+"""
+import asyncio
+import inspect
+import time
+
+from backend.src.modules.event_handler.event_handler import EventHandler
+
+
+class ListEventHandler:
+    """Старая реализация: список колбэков и inspect.iscoroutinefunction на каждый вызов."""
+
+    def __init__(self, *event_names):
+        self.events = {event_name: [] for event_name in event_names}
+
+    def link(self, callback, event_name):
+        if callback not in self.events[event_name]:
+            self.events[event_name].append(callback)
+            return True
+        return False
+
+    def unlink(self, callback, event_name):
+        if callback in self.events[event_name]:
+            self.events[event_name].remove(callback)
+            return True
+        return False
+
+    async def fire(self, event_name, *args, **kwargs):
+        for callback in self.events.get(event_name, []):
+            if inspect.iscoroutinefunction(callback):
+                await callback(*args, **kwargs)
+            else:
+                callback(*args, **kwargs)
+        return True
+
+
+def make_callbacks(count: int):
+    callbacks = []
+    for i in range(count):
+        if i % 2:
+            async def callback(*args, **kwargs):
+                return None
+        else:
+            def callback(*args, **kwargs):
+                return None
+        callback.__name__ = f'callback_{i}'
+        callbacks.append(callback)
+    return callbacks
+
+
+async def bench_fire(handler, event_name: str, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await handler.fire(event_name, 1, hp=10)
+    return iterations / (time.perf_counter() - started)
+
+
+def bench_link_unlink(handler, callbacks, event_name: str, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for callback in callbacks:
+            handler.link(callback, event_name)
+        for callback in reversed(callbacks):
+            handler.unlink(callback, event_name)
+    return rounds * len(callbacks) * 2 / (time.perf_counter() - started)
+
+
+async def run(subscribers: int, iterations: int, rounds: int):
+    print(f'--- подписчиков: {subscribers}')
+    callbacks = make_callbacks(subscribers)
+    for name, handler_class in (('before', ListEventHandler), ('after', EventHandler)):
+        handler = handler_class('tick', 'empty')
+        for callback in callbacks:
+            handler.link(callback, 'tick')
+
+        fire_rate = await bench_fire(handler, 'tick', iterations)
+        empty_rate = await bench_fire(handler, 'empty', iterations)
+        link_rate = bench_link_unlink(handler_class('tick'), callbacks, 'tick', rounds)
+        print(f'{name:>6}: fire {fire_rate:>12,.0f}/s | fire без подписчиков {empty_rate:>12,.0f}/s '
+              f'| link+unlink {link_rate:>12,.0f} оп/s')
+
+
+async def main():
+    await run(subscribers=20, iterations=50_000, rounds=500)
+    await run(subscribers=1000, iterations=1_000, rounds=10)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
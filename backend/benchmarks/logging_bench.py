@@ -0,0 +1,100 @@
+"""
+Накладные расходы логирования на запрос: логи выключены, синхронный StreamHandler (как было),
+QueueHandler без прореживания и QueueHandler с LOG_SAMPLING по умолчанию.
+Вывод логов уходит в /dev/null, чтобы терминал не влиял на цифры.
+
+Запуск: python -m backend.benchmarks.logging_bench [--requests 2000]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import queue
+import time
+from logging.handlers import QueueListener
+
+import httpx
+from fastapi import Depends, FastAPI
+
+from backend.logger import GLOG, LOG_SAMPLING, ColorFormatter, LogQueueHandler, SamplingFilter
+from backend.src.app.core.services.security import SecurityService
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get('/me')
+    async def me(user=Depends(SecurityService.require_auth)):
+        return {'id': user.user_id}
+
+    return app
+
+
+def configure(mode: str, devnull) -> QueueListener | None:
+    GLOG.handlers.clear()
+    GLOG.setLevel(logging.INFO)
+    stream_handler = logging.StreamHandler(devnull)
+    stream_handler.setFormatter(ColorFormatter('%(asctime)s - %(levelname)s - %(message)s'))
+    if mode == 'off':
+        GLOG.setLevel(logging.WARNING)
+        GLOG.addHandler(stream_handler)
+        return None
+    if mode == 'sync':
+        GLOG.addHandler(stream_handler)
+        return None
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = LogQueueHandler(log_queue)
+    if mode == 'queue+sampling':
+        queue_handler.addFilter(SamplingFilter(SamplingFilter.parse(LOG_SAMPLING)))
+    GLOG.addHandler(queue_handler)
+    listener = QueueListener(log_queue, stream_handler)
+    listener.start()
+    return listener
+
+
+async def bench_requests(app: FastAPI, token: str, requests: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench',
+                                 cookies={SecurityService.ACCESS_COOKIE: token}) as client:
+        for _ in range(100):
+            await client.get('/me')
+        started = time.perf_counter()
+        for _ in range(requests):
+            await client.get('/me')
+        return (time.perf_counter() - started) / requests * 1e6
+
+
+def bench_log_call(calls: int) -> float:
+    security_log = GLOG.getChild('security')
+    started = time.perf_counter()
+    for _ in range(calls):
+        security_log.info('Проверяем аутентификацию')
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    app = make_app()
+    token = SecurityService.create_access_token(1)
+    saved_level, saved_handlers = GLOG.level, list(GLOG.handlers)
+    print(f"{'mode':<18}{'request us':>12}{'log call us':>14}")
+    with open(os.devnull, 'w') as devnull:
+        try:
+            for mode in ('off', 'sync', 'queue', 'queue+sampling'):
+                listener = configure(mode, devnull)
+                request_us = await bench_requests(app, token, args.requests)
+                log_call_us = bench_log_call(args.requests * 10)
+                if listener is not None:
+                    listener.stop()
+                print(f'{mode:<18}{request_us:>12.1f}{log_call_us:>14.2f}')
+        finally:
+            GLOG.handlers[:] = saved_handlers
+            GLOG.setLevel(saved_level)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
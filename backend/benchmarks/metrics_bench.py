@@ -0,0 +1,79 @@
+"""
+Стоимость метрик на горячем пути: Histogram.observe с метками и без, Counter.inc,
+и запрос через MetricsMiddleware против того же приложения без него (прямо в ASGI callable).
+
+Запуск: python -m backend.benchmarks.metrics_bench [--requests 20000]
+"""
+import argparse
+import asyncio
+import time
+
+from fastapi import FastAPI
+
+from backend.src.app.core.middlewares.metrics import MetricsMiddleware
+from backend.src.modules.metrics.registry import MetricsRegistry
+
+
+def bench_calls(func, calls: int) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - started) / calls * 1e9
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get('/auth/me')
+    async def me():
+        return {'id': 1}
+
+    return app
+
+
+async def measure(app, requests: int) -> float:
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': '/auth/me', 'raw_path': b'/auth/me', 'root_path': '',
+        'query_string': b'', 'server': ('bench', 80), 'client': ('127.0.0.1', 1000), 'headers': [],
+    }
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        pass
+
+    for _ in range(200):
+        await app(dict(scope), receive, send)
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=20000)
+    args = parser.parse_args()
+
+    registry = MetricsRegistry()
+    histogram = registry.histogram('plain_seconds', 'bench')
+    labelled = registry.histogram('labelled_seconds', 'bench', ('method', 'route', 'status'))
+    counter = registry.counter('events_total', 'bench')
+    calls = args.requests * 50
+    print(f"{'operation':<32}{'ns':>10}")
+    print(f"{'Histogram.observe':<32}{bench_calls(lambda: histogram.observe(0.003), calls):>10.0f}")
+    print(f"{'Histogram.labels().observe':<32}"
+          f"{bench_calls(lambda: labelled.labels('GET', '/auth/me', '200').observe(0.003), calls):>10.0f}")
+    print(f"{'Counter.inc':<32}{bench_calls(counter.inc, calls):>10.0f}")
+
+    app = make_app()
+    without = await measure(app, args.requests)
+    with_metrics = await measure(MetricsMiddleware(app, histogram=labelled), args.requests)
+    print(f"{'request without metrics, us':<32}{without:>10.1f}")
+    print(f"{'request with metrics, us':<32}{with_metrics:>10.1f}")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
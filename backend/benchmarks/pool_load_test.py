@@ -0,0 +1,70 @@
+"""
+Нагрузочный режим для пула соединений: растим число конкурентных задач и смотрим,
+на каком уровне checkout начинает ждать свободное соединение.
+
+Запуск: python -m backend.benchmarks.pool_load_test [--url URL] [--hold 0.01] [--levels 1,5,10,20,40]
+По умолчанию используется SDB_URL и настройки пула из cfg.py.
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+
+from backend.db_connection import SDB_URL
+from backend.db_pool import create_pooled_engine
+
+
+async def worker(engine, hold: float, requests: int):
+    for _ in range(requests):
+        async with engine.connect() as connection:
+            await connection.execute(text('SELECT 1'))
+            # имитация работы запроса, пока соединение занято
+            await asyncio.sleep(hold)
+
+
+async def run_level(engine, metrics, concurrency: int, hold: float, requests: int) -> dict:
+    wait_count, wait_total = metrics.wait_count, metrics.wait_seconds_total
+    metrics.wait_seconds_max = 0.0
+    metrics.overflow_max = 0
+    timeouts = metrics.timeouts
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(worker(engine, hold, requests) for _ in range(concurrency)), return_exceptions=True)
+    elapsed = time.perf_counter() - started
+
+    waits = metrics.wait_count - wait_count
+    stats = metrics.stats()
+    return {
+        'concurrency': concurrency,
+        'rps': concurrency * requests / elapsed,
+        'wait_avg_ms': (metrics.wait_seconds_total - wait_total) / waits * 1000 if waits else 0.0,
+        'wait_max_ms': metrics.wait_seconds_max * 1000,
+        'overflow_max': stats['overflow_max'],
+        'timeouts': metrics.timeouts - timeouts,
+        'errors': sum(isinstance(result, Exception) for result in results),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', default=SDB_URL)
+    parser.add_argument('--hold', type=float, default=0.01, help='сколько секунд держать соединение')
+    parser.add_argument('--requests', type=int, default=20, help='запросов на одну задачу')
+    parser.add_argument('--levels', default='1,5,10,20,40,80')
+    args = parser.parse_args()
+
+    engine = create_pooled_engine(args.url, name='load_test')
+    metrics = engine.sync_engine.pool.metrics
+    print(f"pool_size={engine.sync_engine.pool.size()} max_overflow={engine.sync_engine.pool._max_overflow}")
+    try:
+        for concurrency in (int(level) for level in args.levels.split(',')):
+            result = await run_level(engine, metrics, concurrency, args.hold, args.requests)
+            print(' | '.join(f'{key}={value:.2f}' if isinstance(value, float) else f'{key}={value}'
+                             for key, value in result.items()))
+    finally:
+        await engine.dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,88 @@
+"""
+Стоимость горячих запросов репозитория на стороне ORM: запрос, собираемый заново на каждый вызов,
+против закэшированного statement с bindparam.
+
+CPU считается по потоку event loop (time.thread_time): aiosqlite выполняет SQL в своём потоке,
+поэтому в цифры попадает только построение запроса, ключ кэша, компиляция и разбор результата.
+БД - временный файл SQLite, чтобы сеть не заглушала разницу.
+
+Запуск: python -m backend.benchmarks.statement_cache_bench [--calls 5000]
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import tempfile
+import time
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from backend.db_pool import STATEMENT_CACHE_METRICS, create_pooled_engine
+from backend.db_session import MeteredAsyncSession
+from backend.src.infrastructure.models.users import User
+from backend.src.infrastructure.pydantic_models.users import PyUserMe
+from backend.src.infrastructure.repositories.user_repository import UserRepository, UserCredentials
+
+
+def inline_cases(repository: UserRepository):
+    # так запросы строились до кэша statement: новый select()/update() на каждый вызов
+    return {
+        'get_by_id': lambda: repository._get_one(User.id == 1),
+        'get_by_id[PyUserMe]': lambda: repository._get_one(User.id == 1, result_type=PyUserMe),
+        'get_by_login[UserCredentials]': lambda: repository._get_one(User.login == 'bench', result_type=UserCredentials),
+        'update_by_id': lambda: repository.session.execute(
+            update(User).values(email='bench@example.com').where(User.id == 1)),
+    }
+
+
+def cached_cases(repository: UserRepository):
+    return {
+        'get_by_id': lambda: repository.get_by_id(1),
+        'get_by_id[PyUserMe]': lambda: repository.get_by_id(1, result_type=PyUserMe),
+        'get_by_login[UserCredentials]': lambda: repository.get_by_login('bench', result_type=UserCredentials),
+        'update_by_id': lambda: repository.update_by_id(1, {'email': 'bench@example.com'}),
+    }
+
+
+async def measure(call, calls: int) -> tuple[float, float]:
+    for _ in range(50):
+        await call()
+    cpu_started, wall_started = time.thread_time(), time.perf_counter()
+    for _ in range(calls):
+        await call()
+    return (time.thread_time() - cpu_started) / calls * 1e6, (time.perf_counter() - wall_started) / calls * 1e6
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--calls', type=int, default=5000)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    engine = create_pooled_engine(f'sqlite+aiosqlite:///{path}', name='statement_bench', pre_ping='never')
+    now = datetime.datetime.now(datetime.timezone.utc)
+    async with engine.begin() as connection:
+        await connection.run_sync(User.__table__.create)
+        await connection.execute(User.__table__.insert().values(
+            id=1, login='bench', password_hash='hash', user_type='player', updated_by='bench',
+            created_at=now, updated_at=now))
+
+    sessionmaker = async_sessionmaker(bind=engine, class_=MeteredAsyncSession, expire_on_commit=False)
+    try:
+        async with sessionmaker() as session:
+            repository = UserRepository(session)
+            inline, cached = inline_cases(repository), cached_cases(repository)
+            print(f"{'query':<32}{'inline cpu us':>16}{'cached cpu us':>16}{'inline wall us':>16}{'cached wall us':>16}")
+            for name in inline:
+                inline_cpu, inline_wall = await measure(inline[name], args.calls)
+                cached_cpu, cached_wall = await measure(cached[name], args.calls)
+                print(f'{name:<32}{inline_cpu:>16.1f}{cached_cpu:>16.1f}{inline_wall:>16.1f}{cached_wall:>16.1f}')
+            await session.rollback()
+        print(STATEMENT_CACHE_METRICS['statement_bench'].stats())
+    finally:
+        await engine.dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -16,6 +16,87 @@ CSRF_SECRET = os.getenv('CSRF_SECRET', 'secret')
 ACCESS_TOKEN_EXPIRE_SECONDS = int(os.getenv('ACCESS_TOKEN_EXPIRE_SECONDS', '10'))
 REFRESH_TOKEN_EXPIRE_SECONDS = int(os.getenv('REFRESH_TOKEN_EXPIRE_SECONDS', '1440'))
 REFRESH_TOKEN_PEPPER = os.getenv("REFRESH_TOKEN_PEPPER", "secret").encode('utf-8')
+# кодек JWT: hs256 (hmac из стандартной библиотеки) | jose
+JWT_CODEC = os.getenv('JWT_CODEC', 'hs256')
+
+# пул соединений с БД
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+# always | idle | never
+DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'idle')
+DB_POOL_PRE_PING_IDLE_SECONDS = float(os.getenv('DB_POOL_PRE_PING_IDLE_SECONDS', '60'))
+# размер compiled cache SQLAlchemy на engine
+DB_QUERY_CACHE_SIZE = int(os.getenv('DB_QUERY_CACHE_SIZE', '500'))
+
+# выбор реплики для чтений: round_robin | least_connections
+DB_REPLICA_STRATEGY = os.getenv('DB_REPLICA_STRATEGY', 'round_robin')
+
+# кэш проверенных access токенов
+ACCESS_TOKEN_CACHE_SIZE = int(os.getenv('ACCESS_TOKEN_CACHE_SIZE', '10000'))
+
+# кэш проверенных CSRF токенов (подпись itsdangerous не проверяется повторно)
+CSRF_TOKEN_CACHE_SIZE = int(os.getenv('CSRF_TOKEN_CACHE_SIZE', '10000'))
+CSRF_TOKEN_CACHE_TTL_SECONDS = float(os.getenv('CSRF_TOKEN_CACHE_TTL_SECONDS', '300'))
+
+# кэш строк пользователей
+USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', '10000'))
+USER_CACHE_TTL_SECONDS = float(os.getenv('USER_CACHE_TTL_SECONDS', '30'))
+
+# хранилище refresh сессий: resp (Redis-совместимый сервер по SESSION_STORE_URL) | memory - для одного воркера
+# и тестов: сессии не переживают перезапуск | db (users.refresh_token_hash) - одно устройство на пользователя
+SESSION_STORE = os.getenv('SESSION_STORE', 'resp')
+SESSION_STORE_URL = os.getenv('SESSION_STORE_URL', 'redis://localhost:6379/0')
+SESSION_STORE_SIZE = int(os.getenv('SESSION_STORE_SIZE', '100000'))
+# число воркеров uvicorn: по умолчанию --workers берётся из WEB_CONCURRENCY, с memory допустим только один
+WORKERS = int(os.getenv('WEB_CONCURRENCY', '1'))
+# конкурентные /auth/refresh одним токеном в этом окне получают один и тот же новый токен
+REFRESH_GRACE_SECONDS = float(os.getenv('REFRESH_GRACE_SECONDS', '5'))
+# ротаций, которые помнятся одновременно: не меньше числа /auth/refresh за REFRESH_GRACE_SECONDS
+REFRESH_GRACE_CACHE_SIZE = int(os.getenv('REFRESH_GRACE_CACHE_SIZE', '10000'))
+
+# фильтр существующих логинов (Bloom) перед запросами в users по login
+LOGIN_FILTER_ENABLED = bool(int(os.getenv('LOGIN_FILTER_ENABLED', '1')))
+LOGIN_FILTER_CAPACITY = int(os.getenv('LOGIN_FILTER_CAPACITY', '100000'))
+LOGIN_FILTER_ERROR_RATE = float(os.getenv('LOGIN_FILTER_ERROR_RATE', '0.01'))
+# логин по промаху фильтра не ищется в БД. Только для одного воркера или надёжной общей доставки user.registered:
+# memory транспорт не выходит за процесс, unix теряет датаграммы, пользователи вне /registration в фильтр не попадают
+LOGIN_FILTER_TRUST_MISSES = bool(int(os.getenv('LOGIN_FILTER_TRUST_MISSES', '0')))
+
+# ограничение частоты /auth: "запросов/секунд" на ключ, "0" - без ограничения
+RATE_LIMIT_LOGIN_IP = os.getenv('RATE_LIMIT_LOGIN_IP', '20/60')
+RATE_LIMIT_LOGIN_LOGIN = os.getenv('RATE_LIMIT_LOGIN_LOGIN', '5/60')
+RATE_LIMIT_REGISTRATION_IP = os.getenv('RATE_LIMIT_REGISTRATION_IP', '5/600')
+RATE_LIMIT_REFRESH_IP = os.getenv('RATE_LIMIT_REFRESH_IP', '60/60')
+RATE_LIMIT_REFRESH_USER = os.getenv('RATE_LIMIT_REFRESH_USER', '10/60')
+# хранилище счётчиков: memory (у каждого воркера свои) | resp (общие, сервер по RATE_LIMIT_URL)
+RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'memory')
+RATE_LIMIT_URL = os.getenv('RATE_LIMIT_URL', SESSION_STORE_URL)
+RATE_LIMIT_MAX_KEYS = int(os.getenv('RATE_LIMIT_MAX_KEYS', '100000'))
+
+# прогрев при старте: сколько соединений script_engine открыть заранее (не больше DB_POOL_SIZE)
+WARMUP_DB_CONNECTIONS = int(os.getenv('WARMUP_DB_CONNECTIONS', '2'))
+WARMUP_STEP_TIMEOUT_SECONDS = float(os.getenv('WARMUP_STEP_TIMEOUT_SECONDS', '10'))
+# /ready: проба БД не чаще раза в интервал, между пробами отдаётся последний результат
+READY_PROBE_INTERVAL_SECONDS = float(os.getenv('READY_PROBE_INTERVAL_SECONDS', '2'))
+READY_PROBE_TIMEOUT_SECONDS = float(os.getenv('READY_PROBE_TIMEOUT_SECONDS', '1'))
+
+# пул для bcrypt: thread | process
+PASSWORD_HASH_EXECUTOR = os.getenv('PASSWORD_HASH_EXECUTOR', 'thread')
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv('PASSWORD_HASH_QUEUE_LIMIT', '64'))
+
+# буферизация игровых событий
+EVENT_BATCH_WINDOW_SECONDS = float(os.getenv('EVENT_BATCH_WINDOW_SECONDS', '0.05'))
+EVENT_BATCH_MAX_SIZE = int(os.getenv('EVENT_BATCH_MAX_SIZE', '256'))
+
+# транспорт событий между воркерами: memory | unix
+EVENT_BUS_TRANSPORT = os.getenv('EVENT_BUS_TRANSPORT', 'memory')
+# каталог сокетов должен принадлежать пользователю воркеров с правами 0700, по умолчанию свой у каждого пользователя
+EVENT_BUS_SOCKET_DIR = os.getenv('EVENT_BUS_SOCKET_DIR', (
+    os.path.join(os.environ['XDG_RUNTIME_DIR'], 'battle_cards_events') if os.getenv('XDG_RUNTIME_DIR')
+    else f'/tmp/battle_cards_events-{os.getuid()}'))
 
 if PROD:
     GLOG.warning('Запуск сервера в PRODUCTION режиме.')
@@ -29,3 +29,11 @@ DB_SCRIPT_USER = quote_plus(os.getenv('DB_SCRIPT_USER', 'script'))
 DB_SCRIPT_PASSWORD = quote_plus(os.getenv('DB_SCRIPT_PASSWORD', 'pass'))
 
 SDB_URL = f"{DB_DRIVER}://{DB_SCRIPT_USER}:{DB_SCRIPT_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}?{DB_QUERY}"
+
+
+# read-only реплики для UnitOfWork: DB_REPLICA_HOSTS=host1:3306,host2:3306, пользователь и база те же, что у script
+DB_REPLICA_HOSTS = [host.strip() for host in os.getenv('DB_REPLICA_HOSTS', '').split(',') if host.strip()]
+
+SDB_REPLICA_URLS = [
+    f"{DB_DRIVER}://{DB_SCRIPT_USER}:{DB_SCRIPT_PASSWORD}@{host}/{DB_NAME}?{DB_QUERY}" for host in DB_REPLICA_HOSTS
+]
@@ -0,0 +1,245 @@
+import time
+from typing import Any, Literal
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from backend.cfg import (DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_RECYCLE, DB_POOL_TIMEOUT,
+                         DB_POOL_PRE_PING, DB_POOL_PRE_PING_IDLE_SECONDS, DB_QUERY_CACHE_SIZE)
+
+
+class PoolMetrics:
+    """
+    Статистика пула соединений одного engine.
+    Ожидание checkout и время открытия новых соединений замеряются в MeteredAsyncAdaptedQueuePool
+    раздельно: wait - очередь за свободным соединением, connect - connect/handshake, если пул
+    открыл соединение для этого checkout. Остальное - через события пула.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool: AsyncAdaptedQueuePool | None = None
+
+        self.connects = 0
+        self.closes = 0
+        self.invalidations = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.pings = 0
+        self.ping_failures = 0
+        self.timeouts = 0
+        self.overflow_max = 0
+        self.wait_count = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.connect_count = 0
+        self.connect_seconds_total = 0.0
+        self.connect_seconds_max = 0.0
+        # id записи соединения -> время открытия, для возраста соединений
+        self._connected_at: dict[int, float] = {}
+
+    def record_wait(self, seconds: float) -> None:
+        self.wait_count += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def record_connect(self, seconds: float) -> None:
+        self.connect_count += 1
+        self.connect_seconds_total += seconds
+        self.connect_seconds_max = max(self.connect_seconds_max, seconds)
+
+    def connection_ages(self) -> list[float]:
+        now = time.monotonic()
+        return [now - connected_at for connected_at in self._connected_at.values()]
+
+    def stats(self) -> dict[str, Any]:
+        ages = self.connection_ages()
+        return {
+            'name': self.name,
+            'size': self.pool.size() if self.pool else 0,
+            'checked_out': self.pool.checkedout() if self.pool else 0,
+            'checked_in': self.pool.checkedin() if self.pool else 0,
+            'overflow': self.pool.overflow() if self.pool else 0,
+            'overflow_max': self.overflow_max,
+            'connects': self.connects,
+            'closes': self.closes,
+            'invalidations': self.invalidations,
+            'checkouts': self.checkouts,
+            'checkins': self.checkins,
+            'pings': self.pings,
+            'ping_failures': self.ping_failures,
+            'timeouts': self.timeouts,
+            'wait_seconds_total': self.wait_seconds_total,
+            'wait_seconds_avg': self.wait_seconds_total / self.wait_count if self.wait_count else 0.0,
+            'wait_seconds_max': self.wait_seconds_max,
+            'connect_seconds_total': self.connect_seconds_total,
+            'connect_seconds_avg': self.connect_seconds_total / self.connect_count if self.connect_count else 0.0,
+            'connect_seconds_max': self.connect_seconds_max,
+            'connection_age_max': max(ages, default=0.0),
+            'connection_age_avg': sum(ages) / len(ages) if ages else 0.0,
+        }
+
+    def attach(self, engine: AsyncEngine, pre_ping: Literal['always', 'idle', 'never'], idle_seconds: float) -> None:
+        sync_engine = engine.sync_engine
+        self.pool = sync_engine.pool
+        self.pool.metrics = self
+
+        @event.listens_for(sync_engine, 'connect')
+        def on_connect(dbapi_connection, connection_record):
+            self.connects += 1
+            self._connected_at[id(connection_record)] = time.monotonic()
+
+        @event.listens_for(sync_engine, 'close')
+        def on_close(dbapi_connection, connection_record):
+            self.closes += 1
+            self._connected_at.pop(id(connection_record), None)
+
+        @event.listens_for(sync_engine, 'invalidate')
+        def on_invalidate(dbapi_connection, connection_record, exception):
+            self.invalidations += 1
+            self._connected_at.pop(id(connection_record), None)
+
+        @event.listens_for(sync_engine, 'checkin')
+        def on_checkin(dbapi_connection, connection_record):
+            self.checkins += 1
+            connection_record.info['checked_in_at'] = time.monotonic()
+
+        @event.listens_for(sync_engine, 'checkout')
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            self.checkouts += 1
+            self.overflow_max = max(self.overflow_max, self.pool.overflow())
+            if pre_ping != 'idle':
+                return
+            checked_in_at = connection_record.info.get('checked_in_at')
+            if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+                return
+            # пингуем только соединения, которые простаивали дольше idle_seconds
+            self.pings += 1
+            try:
+                sync_engine.dialect.do_ping(dbapi_connection)
+            except Exception:
+                self.ping_failures += 1
+                raise exc.DisconnectionError()
+
+
+class MeteredAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    metrics: PoolMetrics | None = None
+
+    def _create_connection(self):
+        started = time.perf_counter()
+        record = super()._create_connection()
+        # забирается в _do_get, чтобы вычесть connect из ожидания
+        record.info['connect_seconds'] = seconds = time.perf_counter() - started
+        if self.metrics:
+            self.metrics.record_connect(seconds)
+        return record
+
+    def _do_get(self):
+        started = time.perf_counter()
+        record = None
+        try:
+            record = super()._do_get()
+            return record
+        except exc.TimeoutError:
+            if self.metrics:
+                self.metrics.timeouts += 1
+            raise
+        finally:
+            connect_seconds = record.info.pop('connect_seconds', 0.0) if record is not None else 0.0
+            if self.metrics:
+                self.metrics.record_wait(max(0.0, time.perf_counter() - started - connect_seconds))
+
+    def recreate(self):
+        # dispose() пересоздаёт пул, метрики должны переехать в новый
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        if self.metrics:
+            self.metrics.pool = pool
+        return pool
+
+
+class StatementCacheMetrics:
+    """
+    Попадания в compiled cache SQLAlchemy: у каждого выполненного запроса execution context
+    знает, взята ли скомпилированная форма из кэша.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.engine: AsyncEngine | None = None
+        self.hits = 0
+        self.misses = 0
+        self.uncached = 0
+
+    def attach(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+
+        @event.listens_for(engine.sync_engine, 'before_cursor_execute')
+        def on_execute(connection, cursor, statement, parameters, context, executemany):
+            cache_hit = getattr(context, 'cache_hit', None)
+            if cache_hit is CACHE_HIT:
+                self.hits += 1
+            elif cache_hit is CACHE_MISS:
+                self.misses += 1
+            else:
+                # текстовый SQL, отключённое кэширование или statement без ключа кэша
+                self.uncached += 1
+
+    def stats(self) -> dict[str, Any]:
+        cached = self.hits + self.misses
+        compiled_cache = self.engine.sync_engine._compiled_cache if self.engine else None
+        return {
+            'name': self.name,
+            'hits': self.hits,
+            'misses': self.misses,
+            'uncached': self.uncached,
+            'hit_rate': self.hits / cached if cached else 0.0,
+            'size': len(compiled_cache) if compiled_cache is not None else 0,
+            'capacity': compiled_cache.capacity if compiled_cache is not None else 0,
+        }
+
+
+# имя engine -> метрики его пула
+POOL_METRICS: dict[str, PoolMetrics] = {}
+# имя engine -> попадания в compiled cache
+STATEMENT_CACHE_METRICS: dict[str, StatementCacheMetrics] = {}
+
+
+def create_pooled_engine(url: str, name: str,
+                         pool_size: int = DB_POOL_SIZE,
+                         max_overflow: int = DB_MAX_OVERFLOW,
+                         pool_recycle: int = DB_POOL_RECYCLE,
+                         pool_timeout: float = DB_POOL_TIMEOUT,
+                         pre_ping: Literal['always', 'idle', 'never'] = DB_POOL_PRE_PING,
+                         pre_ping_idle_seconds: float = DB_POOL_PRE_PING_IDLE_SECONDS,
+                         query_cache_size: int = DB_QUERY_CACHE_SIZE,
+                         **kwargs) -> AsyncEngine:
+    """
+    Engine с настраиваемым пулом и метриками в POOL_METRICS[name].
+    pre_ping: always - пинг на каждый checkout (лишний round trip), idle - только после простоя
+    дольше pre_ping_idle_seconds, never - полагаемся на pool_recycle.
+    query_cache_size - размер compiled cache, попадания в него - в STATEMENT_CACHE_METRICS[name].
+    """
+    if pre_ping not in ('always', 'idle', 'never'):
+        raise ValueError(f'Неизвестная стратегия pre-ping: {pre_ping}')
+
+    engine = create_async_engine(
+        url,
+        poolclass=MeteredAsyncAdaptedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_recycle=pool_recycle,
+        pool_timeout=pool_timeout,
+        pool_pre_ping=pre_ping == 'always',
+        query_cache_size=query_cache_size,
+        **kwargs,
+    )
+    metrics = PoolMetrics(name)
+    metrics.attach(engine, pre_ping=pre_ping, idle_seconds=pre_ping_idle_seconds)
+    POOL_METRICS[name] = metrics
+    statement_cache_metrics = StatementCacheMetrics(name)
+    statement_cache_metrics.attach(engine)
+    STATEMENT_CACHE_METRICS[name] = statement_cache_metrics
+    return engine
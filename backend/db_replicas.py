@@ -0,0 +1,76 @@
+from itertools import count
+from typing import Any, Literal
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from backend.db_pool import create_pooled_engine
+from backend.db_session import MeteredAsyncSession
+
+
+ReplicaStrategy = Literal['round_robin', 'least_connections']
+
+
+class ReplicaSet:
+    """
+    Набор read-only реплик, выдаёт сессию на выбранную реплику.
+    round_robin - по кругу, least_connections - реплика с наименьшим числом занятых соединений пула
+    (при равенстве - по кругу, чтобы не грузить всегда первую).
+    """
+
+    def __init__(self, engines: list[AsyncEngine], strategy: ReplicaStrategy = 'round_robin',
+                 names: list[str] | None = None):
+        if not engines:
+            raise ValueError('Для ReplicaSet нужна хотя бы одна реплика')
+        if strategy not in ('round_robin', 'least_connections'):
+            raise ValueError(f'Неизвестная стратегия выбора реплики: {strategy}')
+        self.engines = engines
+        self.strategy = strategy
+        self.names = names or [f'replica_{index}' for index in range(len(engines))]
+        self.sessionmakers = [
+            async_sessionmaker(bind=engine, class_=MeteredAsyncSession, expire_on_commit=False) for engine in engines
+        ]
+        self._counter = count()
+        self.chosen = [0] * len(engines)
+
+    def __len__(self) -> int:
+        return len(self.engines)
+
+    def choose(self) -> int:
+        start = next(self._counter) % len(self.engines)
+        if self.strategy == 'round_robin':
+            index = start
+        else:
+            order = [(start + offset) % len(self.engines) for offset in range(len(self.engines))]
+            index = min(order, key=lambda i: self.engines[i].sync_engine.pool.checkedout())
+        self.chosen[index] += 1
+        return index
+
+    def session(self) -> AsyncSession:
+        return self.sessionmakers[self.choose()]()
+
+    async def dispose(self) -> None:
+        for engine in self.engines:
+            await engine.dispose()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'strategy': self.strategy,
+            'replicas': [
+                {'name': name, 'chosen': chosen, 'checked_out': engine.sync_engine.pool.checkedout()}
+                for name, chosen, engine in zip(self.names, self.chosen, self.engines)
+            ],
+        }
+
+
+def create_replica_set(urls: list[str], name: str, strategy: ReplicaStrategy = 'round_robin',
+                       **engine_kwargs) -> ReplicaSet | None:
+    """
+    Реплики из списка url, пулы регистрируются в POOL_METRICS как <name>_replica_<n>.
+    Пустой список - реплик нет, все запросы идут в primary.
+    """
+    if not urls:
+        return None
+    names = [f'{name}_replica_{index}' for index in range(len(urls))]
+    engines = [create_pooled_engine(url=url, name=replica_name, **engine_kwargs)
+               for url, replica_name in zip(urls, names)]
+    return ReplicaSet(engines, strategy=strategy, names=names)
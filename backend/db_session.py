@@ -0,0 +1,70 @@
+import time
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class MeteredAsyncSession(AsyncSession):
+    """
+    AsyncSession со счётчиками: число запросов и время ожидания БД.
+    Время включает ожидание соединения из пула, сеть и драйвер; commit/rollback считаются отдельно.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.statements = 0
+        self.commits = 0
+        self.rollbacks = 0
+        self.db_seconds = 0.0
+
+    def _record(self, started: float) -> None:
+        self.db_seconds += time.perf_counter() - started
+
+    async def execute(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await super().execute(*args, **kwargs)
+        finally:
+            self.statements += 1
+            self._record(started)
+
+    async def scalar(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await super().scalar(*args, **kwargs)
+        finally:
+            self.statements += 1
+            self._record(started)
+
+    async def stream(self, *args, **kwargs):
+        # учитывается только время до первого результата, чтение курсора идёт уже у вызывающего
+        started = time.perf_counter()
+        try:
+            return await super().stream(*args, **kwargs)
+        finally:
+            self.statements += 1
+            self._record(started)
+
+    async def commit(self) -> None:
+        started = time.perf_counter()
+        try:
+            await super().commit()
+        finally:
+            self.commits += 1
+            self._record(started)
+
+    async def rollback(self) -> None:
+        started = time.perf_counter()
+        try:
+            await super().rollback()
+        finally:
+            self.rollbacks += 1
+            self._record(started)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'statements': self.statements,
+            'commits': self.commits,
+            'rollbacks': self.rollbacks,
+            'db_seconds': self.db_seconds,
+        }
@@ -2,10 +2,26 @@ from contextlib import asynccontextmanager
 
 from dependency_injector import containers, providers
 from sqlalchemy import NullPool
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from backend.db_connection import ADB_URL, SDB_URL
+from backend.cfg import EVENT_BATCH_WINDOW_SECONDS, EVENT_BATCH_MAX_SIZE, EVENT_BUS_TRANSPORT, EVENT_BUS_SOCKET_DIR
+from backend.cfg import USER_CACHE_SIZE, USER_CACHE_TTL_SECONDS, DB_REPLICA_STRATEGY
+from backend.cfg import LOGIN_FILTER_CAPACITY, LOGIN_FILTER_ERROR_RATE, LOGIN_FILTER_TRUST_MISSES
+from backend.cfg import READY_PROBE_INTERVAL_SECONDS, READY_PROBE_TIMEOUT_SECONDS
+from backend.cfg import SESSION_STORE, SESSION_STORE_URL, SESSION_STORE_SIZE, WORKERS
+from backend.db_connection import ADB_URL, SDB_URL, SDB_REPLICA_URLS
+from backend.db_pool import create_pooled_engine
+from backend.db_replicas import create_replica_set
+from backend.db_session import MeteredAsyncSession
+from backend.src.modules.event_handler.event_batcher import EventBatcher
+from backend.src.modules.event_handler.event_handler import EventHandler
+from backend.src.modules.event_handler.transports import create_event_transport
+from backend.src.modules.metrics.registry import METRICS
+from backend.src.modules.session_store.stores import create_session_store
+from backend.src.modules.shared.bloom import LoginFilter
+from backend.src.modules.shared.cache import TTLCache
 from backend.src.modules.shared.unit_of_work import UnitOfWork
+from backend.src.app.core.readiness import ReadinessProbe
 from backend.src.app.core.services.security import SecurityService
 from fastapi import Request
 
@@ -20,47 +36,107 @@ def require_auth(request: Request):
 class Container(containers.DeclarativeContainer):
 
     admin_engine = providers.Singleton(
-        create_async_engine,
+        create_pooled_engine,
         isolation_level='READ COMMITTED',
         url=ADB_URL,
+        name='admin',
         # echo=True,
-        pool_pre_ping=True,
     )
 
     script_engine = providers.Singleton(
-        create_async_engine,
+        create_pooled_engine,
         isolation_level='READ COMMITTED',
         url=SDB_URL,
+        name='script',
         # echo=True,
-        pool_pre_ping=True,
+    )
+
+    # None, если DB_REPLICA_HOSTS не задан
+    script_replicas = providers.Singleton(
+        create_replica_set,
+        urls=SDB_REPLICA_URLS,
+        name='script',
+        strategy=DB_REPLICA_STRATEGY,
+        isolation_level='READ COMMITTED',
     )
 
     admin_sessionmaker = providers.Singleton(
         async_sessionmaker,
         bind=admin_engine,
-        class_=AsyncSession,
+        class_=MeteredAsyncSession,
         expire_on_commit=False,
     )
 
     script_sessionmaker = providers.Singleton(
         async_sessionmaker,
         bind=script_engine,
-        class_=AsyncSession,
+        class_=MeteredAsyncSession,
         expire_on_commit=False,
     )
     
     admin_session = providers.Factory(admin_sessionmaker())
     script_session = providers.Factory(script_sessionmaker())
 
+    user_cache = providers.Singleton(
+        TTLCache,
+        maxsize=USER_CACHE_SIZE,
+        ttl=USER_CACHE_TTL_SECONDS,
+    )
+
+    # загружается из users.login в lifespan, до этого пропускает все запросы в БД
+    login_filter = providers.Singleton(
+        LoginFilter,
+        capacity=LOGIN_FILTER_CAPACITY,
+        error_rate=LOGIN_FILTER_ERROR_RATE,
+        trust_misses=LOGIN_FILTER_TRUST_MISSES,
+    )
+
     admin_uow = providers.Factory(
-        UnitOfWork, session=admin_session
+        UnitOfWork, sessionmaker=admin_sessionmaker, user_cache=user_cache, login_filter=login_filter
     )
     script_uow = providers.Factory(
-        UnitOfWork, session=script_session
+        UnitOfWork, sessionmaker=script_sessionmaker, user_cache=user_cache, replicas=script_replicas,
+        login_filter=login_filter,
+    )
+
+    # db работает через script_sessionmaker и общий user_cache, без отдельного пула
+    session_store = providers.Selector(
+        providers.Object(SESSION_STORE),
+        memory=providers.Singleton(create_session_store, 'memory', maxsize=SESSION_STORE_SIZE, workers=WORKERS),
+        resp=providers.Singleton(create_session_store, 'resp', url=SESSION_STORE_URL),
+        db=providers.Singleton(create_session_store, 'db', sessionmaker=script_sessionmaker, user_cache=user_cache),
     )
 
     security_service = providers.Singleton(
         SecurityService,
+        session_store=session_store.provider,
+    )
+
+    readiness_probe = providers.Singleton(
+        ReadinessProbe,
+        engine=script_engine,
+        interval=READY_PROBE_INTERVAL_SECONDS,
+        timeout=READY_PROBE_TIMEOUT_SECONDS,
+    )
+
+    event_transport = providers.Singleton(
+        create_event_transport,
+        kind=EVENT_BUS_TRANSPORT,
+        socket_dir=EVENT_BUS_SOCKET_DIR,
+    )
+
+    event_handler = providers.Singleton(
+        EventHandler,
+        tolerate_callbacks_exceptions=True,
+        transport=event_transport,
+        fire_latency=METRICS.histogram('event_fire_seconds', 'Время EventHandler.fire вместе с колбэками'),
+    )
+
+    event_batcher = providers.Singleton(
+        EventBatcher,
+        handler=event_handler,
+        window=EVENT_BATCH_WINDOW_SECONDS,
+        max_batch=EVENT_BATCH_MAX_SIZE,
     )
 
 
@@ -1,7 +1,23 @@
+import atexit
+import json
 import logging
+import os
+import queue
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
 
+import dotenv
 from colorama import Style, Fore
 
+# cfg.py сам импортирует логгер, поэтому настройки логов читаются здесь напрямую из окружения
+dotenv.load_dotenv()
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+# JSON в production, цветной текст локально; LOG_JSON=0/1 задаёт формат явно
+LOG_JSON = bool(int(os.getenv('LOG_JSON', '1' if os.getenv('PROD') else '0')))
+# доля записей ниже WARNING, которые пишутся для логгера: "battle_cards.security=0.01,battle_cards.api=0.1"
+LOG_SAMPLING = os.getenv('LOG_SAMPLING', 'battle_cards.security=0.01')
+
 
 class ColorFormatter(logging.Formatter):
     COLORS = {
@@ -18,19 +34,104 @@ class ColorFormatter(logging.Formatter):
         return f"{color}{message}{Style.RESET_ALL}"
 
 
-def create_logger():
-    
-    formatter = ColorFormatter('%(asctime)s - %(levelname)s - %(message)s')
+class JsonFormatter(logging.Formatter):
+    """Одна JSON строка на запись, поля из extra= попадают в корень объекта."""
+
+    RESERVED = frozenset(logging.LogRecord('', 0, '', 0, '', None, None).__dict__) | {'message', 'asctime'}
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            payload['exception'] = self.formatException(record.exc_info)
+        for key, value in record.__dict__.items():
+            if key not in self.RESERVED:
+                payload[key] = value
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Прореживание частых записей: для логгера с долей rate пишется каждая round(1 / rate)-я запись
+    ниже WARNING, rate 0 - не пишется ничего. WARNING и выше не прореживаются.
+    Имя логгера сравнивается точно.
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self.every = {name: round(1 / rate) if rate > 0 else 0 for name, rate in rates.items()}
+        self.counters = dict.fromkeys(self.every, 0)
+        self.dropped = 0
+
+    @staticmethod
+    def parse(value: str) -> dict[str, float]:
+        rates = {}
+        for item in value.split(','):
+            name, _, rate = item.partition('=')
+            if name.strip() and rate.strip():
+                rates[name.strip()] = float(rate)
+        return rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        every = self.every.get(record.name)
+        if every is None or record.levelno >= logging.WARNING:
+            return True
+        if every:
+            counter = self.counters[record.name] + 1
+            self.counters[record.name] = counter
+            if (counter - 1) % every == 0:
+                return True
+        self.dropped += 1
+        return False
+
+
+class LogQueueHandler(QueueHandler):
+    """
+    QueueHandler без копирования записи и форматирования в потоке вызывающего: у логгера один
+    обработчик, поэтому запись можно отдать в очередь как есть. В потоке вызывающего подставляются
+    только args, чтобы изменяемые аргументы не поменялись до записи.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+def create_logger(json_format: bool = LOG_JSON, level: str = LOG_LEVEL,
+                  sampling: str = LOG_SAMPLING) -> tuple[logging.Logger, QueueListener]:
+    """
+    В потоке вызывающего запись только попадает в очередь (форматируется лишь текст сообщения),
+    форматирование и запись в stderr выполняет поток QueueListener.
+    """
     handler = logging.StreamHandler()
-    handler.setFormatter(formatter)
-    
+    handler.setFormatter(JsonFormatter() if json_format else ColorFormatter('%(asctime)s - %(levelname)s - %(message)s'))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = LogQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(SamplingFilter.parse(sampling)))
+    listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    # при выходе дописываем всё, что осталось в очереди
+    atexit.register(listener.stop)
+
     game_logger = logging.getLogger("battle_cards")
-    game_logger.setLevel(logging.INFO)
+    # модуль может импортироваться дважды (logger и backend.logger), старый поток останавливаем
+    previous_listener = getattr(game_logger, 'queue_listener', None)
+    if previous_listener is not None:
+        previous_listener.stop()
+        # повторный stop при выходе упал бы на уже остановленном потоке
+        atexit.unregister(previous_listener.stop)
+    game_logger.queue_listener = listener
+    game_logger.setLevel(level)
     game_logger.handlers.clear()
-    game_logger.addHandler(handler)
-    
-    return game_logger
-    
-GLOG = create_logger()
+    game_logger.addHandler(queue_handler)
+
+    return game_logger, listener
 
-    
\ No newline at end of file
+GLOG, LOG_LISTENER = create_logger()
@@ -10,8 +10,11 @@ from starlette.responses import JSONResponse
 from backend.di_container import Container as c, api_script_uow, require_auth
 
 from backend.src.app.pydantic_models.auth import AuthScheme, JWTScheme
-from backend.src.infrastructure.enums.users.enums import UserTypeEnum
-from backend.src.infrastructure.pydantic_models.users import PyUser
+from backend.src.infrastructure.enums.users.enums import UserTypeEnum, UserEventEnum
+from backend.src.infrastructure.pydantic_models.users import PyUser, PyUserMe
+from backend.src.infrastructure.repositories.user_repository import UserCredentials
+from backend.src.modules.event_handler.event_handler import EventHandler
+from backend.src.modules.shared.bloom import LoginFilter
 from backend.src.modules.shared.unit_of_work import UnitOfWork
 from src.app.core.services.security import SecurityService
 
@@ -20,12 +23,14 @@ auth_router = APIRouter(prefix="/auth",)
 
 @auth_router.post('/login')
 @inject
-async def login(data: AuthScheme, 
+async def login(data: AuthScheme, request: Request,
                 uow: UnitOfWork = Depends(api_script_uow),
                 sec: SecurityService = Depends(Provide[c.security_service])):
-    user = await uow.user_repository.get_by_login(data.login)
+    # варианты регистра и диакритики - один логин в MySQL, значит и одна корзина лимита
+    await sec.throttle(('login_ip', sec.client_ip(request)), ('login', LoginFilter.normalize(data.login)))
+    user = await uow.user_repository.get_by_login(data.login, result_type=UserCredentials)
 
-    if not user or not sec.verify_password(data.password, user.password_hash):
+    if not user or not await sec.verify_password_async(data.password, user.password_hash):
         raise HTTPException(status_code=HTTPStatus.FORBIDDEN, detail='Ошибка авторизации')
 
     assert user.id
@@ -34,16 +39,21 @@ async def login(data: AuthScheme,
         status_code=HTTPStatus.OK, content={}
     )
     sec.set_access_token(response, user.id)
-    await sec.set_refresh_token(response, user.id, uow=uow)
-    await uow.commit()
+    await sec.set_refresh_token(response, user.id)
     return response
 
 @auth_router.post('/registration')
 @inject
-async def registration(data: AuthScheme, uow: UnitOfWork = Depends(api_script_uow), sec: SecurityService = Depends(Provide[c.security_service])):
+async def registration(data: AuthScheme, request: Request, uow: UnitOfWork = Depends(api_script_uow),
+                       sec: SecurityService = Depends(Provide[c.security_service]),
+                       events: EventHandler = Depends(Provide[c.event_handler])):
+    await sec.throttle(('registration_ip', sec.client_ip(request)))
+    # занятый логин отсекаем до bcrypt; для нового логина фильтр обычно отвечает без запроса в БД
+    if await uow.user_repository.login_exists(data.login):
+        raise HTTPException(status_code=HTTPStatus.CONFLICT, detail={"error": 'Пользователь с данным логином уже существует'})
     reg_model = PyUser(
         login=data.login,
-        password_hash=sec.hash_password(data.password),
+        password_hash=await sec.hash_password_async(data.password),
         user_type=UserTypeEnum.player,
         updated_by='Регистрация'
     )
@@ -54,13 +64,14 @@ async def registration(data: AuthScheme, uow: UnitOfWork = Depends(api_script_uo
         raise HTTPException(status_code=HTTPStatus.CONFLICT, detail={"error": 'Пользователь с данным логином уже существует'})
 
     await uow.commit()
-    
+    await events.fire(UserEventEnum.registered.value, data.login)
+
     return JSONResponse(status_code=HTTPStatus.OK, content={})
 
 
 @auth_router.post('/logout')
 @inject
-async def logout(request: Request, uow: UnitOfWork = Depends(api_script_uow), sec: SecurityService = Depends(Provide[c.security_service])):
+async def logout(request: Request, sec: SecurityService = Depends(Provide[c.security_service])):
     response = JSONResponse(status_code=HTTPStatus.OK, content={'request': 'success'})
     response.delete_cookie(sec.ACCESS_COOKIE)
     refresh_token = request.cookies.get(sec.REFRESH_COOKIE)
@@ -69,7 +80,7 @@ async def logout(request: Request, uow: UnitOfWork = Depends(api_script_uow), se
 
     try:
         refresh_payload = sec.decode_token(refresh_token, options={'verify_exp': False})
-        await uow.user_repository.update_by_id(id=refresh_payload.user_id, values={'refresh_token_hash': None}, commit=True)
+        await sec.revoke_refresh_token(refresh_payload.user_id, refresh_token)
     except (InvalidTokenError, JWTError, ValidationError):
         pass
 
@@ -79,11 +90,12 @@ async def logout(request: Request, uow: UnitOfWork = Depends(api_script_uow), se
 
 @auth_router.post('/refresh', dependencies=[])
 @inject
-async def refresh(request: Request, uow: UnitOfWork = Depends(api_script_uow), sec: SecurityService = Depends(Provide[c.security_service])):
+async def refresh(request: Request, sec: SecurityService = Depends(Provide[c.security_service])):
     access_token = request.cookies.get(sec.ACCESS_COOKIE)
     refresh_token = request.cookies.get(sec.REFRESH_COOKIE)
     if not access_token or not refresh_token:
         raise HTTPException(status_code=HTTPStatus.FORBIDDEN, detail={"error": "not auth"})
+    await sec.throttle(('refresh_ip', sec.client_ip(request)))
 
     access_payload = sec.decode_token(access_token, options={'verify_exp': False})
     refresh_payload = sec.decode_token(refresh_token, options={'verify_exp': False})
@@ -92,14 +104,11 @@ async def refresh(request: Request, uow: UnitOfWork = Depends(api_script_uow), s
         raise HTTPException(status_code=HTTPStatus.FORBIDDEN, detail={"error": "not auth"})
 
     user_id = refresh_payload.user_id
-    user = await uow.user_repository.get_by_id(user_id)
-    if not user or user.refresh_token_hash != sec.hash_refresh_token_for_db(refresh_token):
-        raise HTTPException(status_code=HTTPStatus.FORBIDDEN, detail={"error": "not auth"})
-
+    await sec.throttle(('refresh_user', user_id))
     response = JSONResponse(status_code=HTTPStatus.OK, content={})
+    if not await sec.rotate_refresh_token(response, user_id, refresh_token):
+        raise HTTPException(status_code=HTTPStatus.FORBIDDEN, detail={"error": "not auth"})
     sec.set_access_token(response, user_id)
-    await sec.set_refresh_token(response, user_id, uow=uow)
-    await uow.commit()
 
     return response
 
@@ -116,7 +125,7 @@ async def csrf(sec: SecurityService = Depends(Provide[c.security_service])):
 @inject
 async def me(uow: UnitOfWork = Depends(api_script_uow),
              user_payload: JWTScheme = Depends(require_auth)):
-    user = await uow.user_repository.get_by_id(user_payload.user_id)
+    user = await uow.user_repository.get_by_id_cached(user_payload.user_id, result_type=PyUserMe)
     if user is None:
         raise HTTPException(
         status_code=HTTPStatus.FORBIDDEN,
@@ -0,0 +1,36 @@
+from fastapi import APIRouter
+from starlette.responses import Response
+
+from backend.db_pool import POOL_METRICS, STATEMENT_CACHE_METRICS
+from backend.src.modules.metrics.registry import CONTENT_TYPE, METRICS, MetricFamily, stats_collector
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get('/metrics', include_in_schema=False)
+async def metrics():
+    return Response(METRICS.render(), media_type=CONTENT_TYPE)
+
+
+def register_collectors(container) -> None:
+    """Пулы, compiled cache, кэши, пул bcrypt, лимиты и фильтр логинов - собираются при каждом /metrics."""
+    security = container.security_service()
+
+    def rate_limit_requests() -> list[MetricFamily]:
+        samples = [({'rule': rule, 'outcome': outcome}, value)
+                   for rule, counters in security.RATE_LIMITER.counters.items()
+                   for outcome, value in counters.items()]
+        return [('rate_limit_requests_total', 'counter', 'Проверки лимитов /auth по правилам', samples)]
+
+    METRICS.add_collector(stats_collector('db_pool', 'Пул соединений',
+                                          lambda: [pool.stats() for pool in POOL_METRICS.values()]))
+    METRICS.add_collector(stats_collector('db_statement_cache', 'Compiled cache SQLAlchemy',
+                                          lambda: [cache.stats() for cache in STATEMENT_CACHE_METRICS.values()]))
+    METRICS.add_collector(stats_collector('cache', 'Кэши процесса', lambda: [
+        {'name': 'user', **container.user_cache().stats()},
+        {'name': 'access_token', **security.ACCESS_TOKEN_CACHE.stats()},
+        {'name': 'csrf_token', **security.CSRF_TOKEN_CACHE.stats()},
+    ]))
+    METRICS.add_collector(stats_collector('password_hash_pool', 'Пул bcrypt', lambda: [security.HASH_POOL.stats()]))
+    METRICS.add_collector(stats_collector('login_filter', 'Фильтр логинов', lambda: [container.login_filter().stats()]))
+    METRICS.add_collector(rate_limit_requests)
@@ -0,0 +1,46 @@
+from fastapi import HTTPException
+from starlette.requests import cookie_parser
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from backend.logger import GLOG
+
+
+class CSRFMiddleware:
+    """
+    CSRF проверка на уровне ASGI: безопасные методы уходят в приложение без разбора запроса,
+    для изменяющих cookie и X-CSRF-Token читаются прямо из заголовков scope.
+    security - класс/экземпляр SecurityService, берётся один раз при создании, а не из контейнера на запрос.
+    """
+
+    PROTECTED_METHODS = frozenset(("POST", "DELETE", "PUT", "PATCH"))
+
+    def __init__(self, app: ASGIApp, security):
+        self.app = app
+        self.security = security
+        self.cookie_name = security.CSRF_COOKIE
+        self.header_name = security.CSRF_HEADER.lower().encode('latin-1')
+        self.rejected = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or scope['method'] not in self.PROTECTED_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        cookie_token = header_token = None
+        for name, value in scope['headers']:
+            if name == b'cookie':
+                cookie_token = cookie_parser(value.decode('latin-1')).get(self.cookie_name, cookie_token)
+            elif name == self.header_name:
+                header_token = value.decode('latin-1')
+
+        try:
+            self.security.verify_csrf(cookie_token, header_token)
+        except HTTPException as e:
+            self.rejected += 1
+            GLOG.warning(f"CSRF validation failed for {scope['method']} {scope['path']}: {e.detail}")
+            response = JSONResponse(status_code=e.status_code, content={"detail": e.detail})
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
@@ -0,0 +1,41 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.src.modules.metrics.registry import METRICS, Histogram
+
+
+class MetricsMiddleware:
+    """
+    Время обработки HTTP запросов по шаблону маршрута (/auth/login, а не путь с параметрами).
+    Маршрут FastAPI кладёт в scope['route'] при сопоставлении, поэтому он известен после ответа.
+    Запросы мимо маршрутов собираются под route="unmatched", чтобы не плодить метки.
+    """
+
+    def __init__(self, app: ASGIApp, histogram: Histogram | None = None):
+        self.app = app
+        self.histogram = histogram or METRICS.histogram(
+            'http_request_duration_seconds', 'Время обработки HTTP запроса', ('method', 'route', 'status'),
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get('route')
+            self.histogram.labels(scope['method'], getattr(route, 'path', 'unmatched'), str(status)).observe(
+                time.perf_counter() - started
+            )
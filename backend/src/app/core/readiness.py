@@ -0,0 +1,62 @@
+import asyncio
+import time
+from typing import Any, Callable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from backend.logger import GLOG
+
+
+class ReadinessProbe:
+    """
+    Готовность к трафику: прогрев завершён и БД отвечает на SELECT 1.
+    Проба выполняется не чаще раза в interval секунд, между пробами отдаётся последний результат,
+    конкурентные /ready ждут одну и ту же пробу - частые опросы балансировщика не нагружают БД.
+    """
+
+    def __init__(self, engine: AsyncEngine, interval: float = 2.0, timeout: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.engine = engine
+        self.interval = interval
+        self.timeout = timeout
+        self.clock = clock
+
+        self.warmed_up = False
+        self.warm_up: dict[str, Any] = {}
+        self.ok = False
+        self.error: str | None = None
+        self.checked_at: float | None = None
+        self.probes = 0
+        self._probe: asyncio.Future | None = None
+
+    async def check(self) -> dict[str, Any]:
+        if not self.warmed_up:
+            return {'status': 'starting'}
+        if self.checked_at is None or self.clock() - self.checked_at >= self.interval:
+            if self._probe is None:
+                self._probe = asyncio.ensure_future(self._run())
+            # отмена одного ожидающего запроса не должна отменять пробу для остальных
+            await asyncio.shield(self._probe)
+        return {
+            'status': 'ready' if self.ok else 'unavailable',
+            'checked_seconds_ago': round(self.clock() - self.checked_at, 3),
+            'error': self.error,
+            'warm_up': self.warm_up,
+        }
+
+    async def _run(self) -> None:
+        self.probes += 1
+        try:
+            async with asyncio.timeout(self.timeout):
+                async with self.engine.connect() as connection:
+                    await connection.execute(text('SELECT 1'))
+            self.ok, self.error = True, None
+        except Exception as e:
+            if self.ok or self.error is None:
+                GLOG.error(f'БД не отвечает на проверку готовности: {e!r}')
+            # наружу только тип ошибки, без адресов и текста драйвера
+            self.ok, self.error = False, type(e).__name__
+        finally:
+            self.checked_at = self.clock()
+            self._probe = None
@@ -0,0 +1,136 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Literal
+
+from passlib.context import CryptContext
+
+from backend.src.modules.shared.exceptions import HashPoolOverloaded
+
+
+PWD_CONTEXT = CryptContext(schemes=['bcrypt'],
+                           bcrypt__default_rounds=12,
+                           bcrypt__ident='2b'
+                           )
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return PWD_CONTEXT.verify(plain_password, hashed_password)
+
+
+def hash_password(password: str) -> str:
+    return PWD_CONTEXT.hash(password)
+
+
+def _timed_call(func: Callable[..., Any], *args) -> tuple[Any, float]:
+    # выполняется внутри воркера, поэтому должна быть функцией модуля (pickle для process пула)
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+class PasswordHashPool:
+    """
+    Ограниченный пул для bcrypt, чтобы хеширование не блокировало event loop.
+    Одновременно принимается не больше workers + queue_limit задач, остальные отбрасываются сразу.
+    """
+
+    # bcrypt с 4 раундами: проверка занимает доли миллисекунды, но загружает backend passlib в воркере
+    WARMUP_HASH = '$2b$04$2t5NMLmFOFHmAjIbqW3RnuwEE4MeREHCddYjKU8x2eM4E/tpCSFJi'
+
+    def __init__(self, workers: int, queue_limit: int,
+                 executor_type: Literal['thread', 'process'] = 'thread'):
+        if executor_type not in ('thread', 'process'):
+            raise ValueError(f'Неизвестный тип пула для хеширования: {executor_type}')
+        self.workers = max(1, workers)
+        self.queue_limit = max(0, queue_limit)
+        self.executor_type = executor_type
+        self._executor: Executor | None = None
+
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.hash_seconds_total = 0.0
+        self.hash_seconds_max = 0.0
+        self.wait_seconds_total = 0.0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == 'process':
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='pwd-hash')
+        return self._executor
+
+    @property
+    def in_flight(self) -> int:
+        return self._pending
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self._pending - self.workers)
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.queue_limit
+
+    async def run(self, func: Callable[..., Any], *args) -> Any:
+        if self._pending >= self.capacity:
+            self.rejected += 1
+            raise HashPoolOverloaded(f'Очередь хеширования переполнена ({self._pending}/{self.capacity})')
+
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        future = self.executor.submit(_timed_call, func, *args)
+        self._pending += 1
+        # слот освобождается, когда воркер закончил: отмена ожидающего запроса не прерывает bcrypt
+        future.add_done_callback(lambda _: self._release_soon(loop))
+        result, hash_seconds = await asyncio.wrap_future(future, loop=loop)
+
+        self.completed += 1
+        self.hash_seconds_total += hash_seconds
+        self.hash_seconds_max = max(self.hash_seconds_max, hash_seconds)
+        self.wait_seconds_total += max(0.0, time.perf_counter() - started - hash_seconds)
+        return result
+
+    def _release(self) -> None:
+        self._pending -= 1
+
+    def _release_soon(self, loop: asyncio.AbstractEventLoop) -> None:
+        # вызывается из потока воркера (или менеджера процессов), счётчик меняется только в event loop
+        try:
+            loop.call_soon_threadsafe(self._release)
+        except RuntimeError:
+            # loop уже закрыт, счётчик больше никто не читает
+            pass
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.run(verify_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self.run(hash_password, password)
+
+    async def warm_up(self) -> None:
+        """Запустить все воркеры (потоки или процессы) до первых логинов."""
+        await asyncio.gather(*(self.verify('warmup', self.WARMUP_HASH) for _ in range(self.workers)))
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'executor': self.executor_type,
+            'workers': self.workers,
+            'queue_limit': self.queue_limit,
+            'in_flight': self.in_flight,
+            'queue_depth': self.queue_depth,
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'hash_seconds_total': self.hash_seconds_total,
+            'hash_seconds_avg': self.hash_seconds_total / self.completed if self.completed else 0.0,
+            'hash_seconds_max': self.hash_seconds_max,
+            'wait_seconds_total': self.wait_seconds_total,
+        }
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
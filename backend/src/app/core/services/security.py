@@ -1,35 +1,175 @@
+import asyncio
+import base64
+import binascii
+import calendar
 import hashlib
 import hmac
+import json
+import math
 import secrets
+import time
+from abc import ABC, abstractmethod
 from datetime import datetime, timedelta, timezone
 from http import HTTPStatus
-from typing import Any
+from typing import Any, Callable
 
 import itsdangerous
 from fastapi import HTTPException, Request
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt, ExpiredSignatureError
-from passlib.context import CryptContext
 from passlib.exc import InvalidTokenError
 from pydantic import ValidationError
 from starlette.responses import Response
 
 from backend.cfg import JWT_SECRET, ACCESS_TOKEN_EXPIRE_SECONDS, REFRESH_TOKEN_EXPIRE_SECONDS, CSRF_SECRET
+from backend.cfg import PASSWORD_HASH_EXECUTOR, PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_LIMIT
+from backend.cfg import ACCESS_TOKEN_CACHE_SIZE, JWT_CODEC, CSRF_TOKEN_CACHE_SIZE, CSRF_TOKEN_CACHE_TTL_SECONDS
+from backend.cfg import REFRESH_GRACE_SECONDS, REFRESH_GRACE_CACHE_SIZE
+from backend.cfg import RATE_LIMIT_LOGIN_IP, RATE_LIMIT_LOGIN_LOGIN, RATE_LIMIT_REGISTRATION_IP, RATE_LIMIT_REFRESH_IP
+from backend.cfg import RATE_LIMIT_REFRESH_USER, RATE_LIMIT_BACKEND, RATE_LIMIT_URL, RATE_LIMIT_MAX_KEYS
+from backend.src.app.core.services.password_hashing import PWD_CONTEXT, PasswordHashPool
 from backend.src.app.pydantic_models.auth import JWTScheme
-from backend.src.modules.shared.unit_of_work import UnitOfWork
+from backend.src.modules.shared.cache import TTLCache
+from backend.src.modules.session_store.stores import SessionStore
+from backend.src.modules.rate_limit.limiter import create_rate_limiter
+from backend.src.modules.shared.exceptions import HashPoolOverloaded, TokenInvalidError, TokenExpiredError, SessionStoreError
+from backend.src.modules.shared.exceptions import RateLimitExceeded
+from backend.src.modules.metrics.registry import METRICS
 from backend.cfg import REFRESH_TOKEN_PEPPER
 from backend.logger import GLOG
 
+# логи каждого запроса, прореживаются через LOG_SAMPLING
+SECURITY_LOG = GLOG.getChild('security')
+# время bcrypt вместе с ожиданием в очереди HASH_POOL
+PASSWORD_HASH_SECONDS = METRICS.histogram('password_hash_seconds', 'Время хеширования/проверки пароля',
+                                          ('operation',), buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
 
 
+class JWTCodec(ABC):
+    """
+    Кодирование/декодирование JWT.
+    decode поднимает TokenExpiredError для истёкших токенов и TokenInvalidError для остальных ошибок.
+    """
+    name: str = NotImplemented
+
+    def __init__(self, secret: str):
+        self.secret = secret
+
+    @abstractmethod
+    def encode(self, payload: dict[str, Any]) -> str:
+        ...
+
+    @abstractmethod
+    def decode(self, token: str, options: dict[str, Any] | None = None) -> dict[str, Any]:
+        ...
+
+
+class JoseJWTCodec(JWTCodec):
+    name = 'jose'
+
+    def encode(self, payload: dict[str, Any]) -> str:
+        return jwt.encode(payload, self.secret)
+
+    def decode(self, token: str, options: dict[str, Any] | None = None) -> dict[str, Any]:
+        try:
+            return jwt.decode(token, self.secret, algorithms=["HS256"], options=options)
+        except ExpiredSignatureError as e:
+            raise TokenExpiredError(str(e))
+        except (InvalidTokenError, JWTError) as e:
+            raise TokenInvalidError(str(e))
+
+
+class HS256JWTCodec(JWTCodec):
+    """
+    Минимальный HS256 на hmac из стандартной библиотеки.
+    Проверяются только подпись, alg и exp/nbf - других claims в наших токенах нет.
+    """
+    name = 'hs256'
+
+    HEADER = {"alg": "HS256", "typ": "JWT"}
+
+    def __init__(self, secret: str):
+        super().__init__(secret)
+        self._key = secret.encode('utf-8')
+        self._header_segment = self._b64encode(json.dumps(self.HEADER, separators=(',', ':')).encode('utf-8'))
+
+    @staticmethod
+    def _b64encode(data: bytes) -> bytes:
+        return base64.urlsafe_b64encode(data).rstrip(b'=')
+
+    @staticmethod
+    def _b64decode(data: bytes) -> bytes:
+        return base64.urlsafe_b64decode(data + b'=' * (-len(data) % 4))
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        return self._b64encode(hmac.new(self._key, signing_input, hashlib.sha256).digest())
+
+    def encode(self, payload: dict[str, Any]) -> str:
+        exp = payload.get('exp')
+        if isinstance(exp, datetime):
+            payload = {**payload, 'exp': calendar.timegm(exp.utctimetuple())}
+        payload_segment = self._b64encode(json.dumps(payload, separators=(',', ':')).encode('utf-8'))
+        signing_input = self._header_segment + b'.' + payload_segment
+        return (signing_input + b'.' + self._sign(signing_input)).decode('ascii')
+
+    def decode(self, token: str, options: dict[str, Any] | None = None) -> dict[str, Any]:
+        options = options or {}
+        if not isinstance(token, str):
+            raise TokenInvalidError('Invalid token type')
+        try:
+            raw = token.encode('ascii')
+            signing_input, signature = raw.rsplit(b'.', 1)
+            header_segment, payload_segment = signing_input.split(b'.')
+        except (UnicodeEncodeError, ValueError):
+            raise TokenInvalidError('Not enough segments')
+
+        if not hmac.compare_digest(self._sign(signing_input), signature):
+            raise TokenInvalidError('Signature verification failed')
+
+        try:
+            if header_segment != self._header_segment:
+                header = json.loads(self._b64decode(header_segment))
+                if not isinstance(header, dict) or header.get('alg') != 'HS256':
+                    raise TokenInvalidError('The specified alg value is not allowed')
+            payload = json.loads(self._b64decode(payload_segment))
+        except (binascii.Error, ValueError):
+            raise TokenInvalidError('Invalid token encoding')
+        if not isinstance(payload, dict):
+            raise TokenInvalidError('Invalid payload')
+
+        now = int(time.time())
+        if options.get('verify_exp', True) and 'exp' in payload:
+            if not isinstance(payload['exp'], int):
+                raise TokenInvalidError('Expiration Time claim (exp) must be an integer.')
+            if payload['exp'] < now:
+                raise TokenExpiredError('Signature has expired.')
+        if options.get('verify_nbf', True) and 'nbf' in payload:
+            if not isinstance(payload['nbf'], int):
+                raise TokenInvalidError('Not Before claim (nbf) must be an integer.')
+            if payload['nbf'] > now:
+                raise TokenInvalidError('The token is not yet valid (nbf)')
+        return payload
+
+
+JWT_CODECS: dict[str, type[JWTCodec]] = {
+    JoseJWTCodec.name: JoseJWTCodec,
+    HS256JWTCodec.name: HS256JWTCodec,
+}
+
+
+def create_jwt_codec(name: str, secret: str) -> JWTCodec:
+    if name not in JWT_CODECS:
+        raise ValueError(f'Неизвестный JWT кодек: {name}')
+    return JWT_CODECS[name](secret)
 
 
 class SecurityService:
 
-    PWD_CONTEXT = CryptContext(schemes=['bcrypt'],
-                               bcrypt__default_rounds=12,
-                               bcrypt__ident='2b'
-                               )
+    PWD_CONTEXT = PWD_CONTEXT
+    HASH_POOL = PasswordHashPool(workers=PASSWORD_HASH_WORKERS,
+                                 queue_limit=PASSWORD_HASH_QUEUE_LIMIT,
+                                 executor_type=PASSWORD_HASH_EXECUTOR,
+                                 )
     OAUTH2_SCHEME = OAuth2PasswordBearer(tokenUrl='auth/login')
 
     CSRF_COOKIE = "csrf_token"
@@ -37,6 +177,39 @@ class SecurityService:
     REFRESH_COOKIE = "refresh_token"
     CSRF_HEADER = "X-CSRF-Token"
     CSRF_SERIALIZER = itsdangerous.URLSafeTimedSerializer(CSRF_SECRET)
+    JWT_CODEC = create_jwt_codec(JWT_CODEC, JWT_SECRET)
+    # ключ - дайджест токена, запись живёт не дольше exp токена
+    ACCESS_TOKEN_CACHE = TTLCache(maxsize=ACCESS_TOKEN_CACHE_SIZE, ttl=ACCESS_TOKEN_EXPIRE_SECONDS)
+    # CSRF токены с уже проверенной подписью
+    CSRF_TOKEN_CACHE = TTLCache(maxsize=CSRF_TOKEN_CACHE_SIZE, ttl=CSRF_TOKEN_CACHE_TTL_SECONDS)
+    # refresh сессии живут вне таблицы users, у пользователя может быть несколько устройств.
+    # Хранилище приходит из контейнера и создаётся при первом обращении; SESSION_STORE подменяет его в тестах
+    SESSION_STORE: SessionStore | None = None
+    SESSION_STORE_PROVIDER: Callable[[], SessionStore] | None = None
+    # дайджест старого refresh токена -> выданный вместо него, для повторов в окне REFRESH_GRACE_SECONDS
+    REFRESH_GRACE = TTLCache(maxsize=REFRESH_GRACE_CACHE_SIZE, ttl=REFRESH_GRACE_SECONDS)
+    # дайджест -> задача ротации, которая сейчас выполняется
+    _REFRESH_IN_FLIGHT: dict[bytes, asyncio.Future] = {}
+    # лимиты /auth проверяются до обращений к БД и bcrypt
+    RATE_LIMITER = create_rate_limiter({
+        'login_ip': RATE_LIMIT_LOGIN_IP,
+        'login': RATE_LIMIT_LOGIN_LOGIN,
+        'registration_ip': RATE_LIMIT_REGISTRATION_IP,
+        'refresh_ip': RATE_LIMIT_REFRESH_IP,
+        'refresh_user': RATE_LIMIT_REFRESH_USER,
+    }, kind=RATE_LIMIT_BACKEND, url=RATE_LIMIT_URL, max_keys=RATE_LIMIT_MAX_KEYS)
+
+    def __init__(self, session_store: Callable[[], SessionStore] | None = None):
+        if session_store is not None:
+            type(self).SESSION_STORE_PROVIDER = session_store
+
+    @classmethod
+    def session_store(cls) -> SessionStore:
+        if cls.SESSION_STORE is not None:
+            return cls.SESSION_STORE
+        if cls.SESSION_STORE_PROVIDER is None:
+            raise RuntimeError('Хранилище сессий не подключено к SecurityService')
+        return cls.SESSION_STORE_PROVIDER()
 
     @classmethod
     def verify_password(cls, plain_password: str, hashed_password: str) -> bool:
@@ -47,10 +220,65 @@ class SecurityService:
         return cls.PWD_CONTEXT.hash(password)
 
     @classmethod
-    def _create_token(cls, user_id: int, expires_delta: int) -> str:
+    async def verify_password_async(cls, plain_password: str, hashed_password: str) -> bool:
+        started = time.perf_counter()
+        try:
+            result = await cls.HASH_POOL.verify(plain_password, hashed_password)
+        except HashPoolOverloaded as e:
+            # отказ переполненного пула не попадает в гистограмму времени хеширования
+            GLOG.warning(str(e))
+            raise HTTPException(status_code=HTTPStatus.SERVICE_UNAVAILABLE, detail={"error": "server busy"})
+        PASSWORD_HASH_SECONDS.labels('verify').observe(time.perf_counter() - started)
+        return result
+
+    @classmethod
+    async def hash_password_async(cls, password: str) -> str:
+        started = time.perf_counter()
+        try:
+            result = await cls.HASH_POOL.hash(password)
+        except HashPoolOverloaded as e:
+            # отказ переполненного пула не попадает в гистограмму времени хеширования
+            GLOG.warning(str(e))
+            raise HTTPException(status_code=HTTPStatus.SERVICE_UNAVAILABLE, detail={"error": "server busy"})
+        PASSWORD_HASH_SECONDS.labels('hash').observe(time.perf_counter() - started)
+        return result
+
+    @classmethod
+    async def warm_up(cls):
+        """
+        Первые вызовы bcrypt и проверок JWT/CSRF до приёма запросов. Токены проходят тот же путь через
+        ACCESS_TOKEN_CACHE и CSRF_TOKEN_CACHE, что и в запросе; служебные записи затем удаляются из кэшей.
+        """
+        await cls.HASH_POOL.warm_up()
+        access_token = cls.create_access_token(0)
+        cls.authenticate_access_token(access_token)
+        cls.ACCESS_TOKEN_CACHE.pop(cls.token_digest(access_token))
+        csrf_token = cls.create_csrf_token()
+        cls.verify_csrf(csrf_token, csrf_token)
+        cls.CSRF_TOKEN_CACHE.pop(csrf_token)
+        cls.hash_refresh_token_for_db(cls.create_refresh_token(0))
+
+    @staticmethod
+    def client_ip(request: Request) -> str:
+        # за прокси uvicorn подставляет адрес из X-Forwarded-For при --proxy-headers
+        return request.client.host if request.client else 'unknown'
+
+    @classmethod
+    async def throttle(cls, *checks: tuple[str, str | int]):
+        """checks - пары (правило, ключ), проверяются по порядку до первого превышения."""
+        try:
+            for rule, key in checks:
+                await cls.RATE_LIMITER.check(rule, key)
+        except RateLimitExceeded as e:
+            SECURITY_LOG.warning(str(e))
+            raise HTTPException(status_code=HTTPStatus.TOO_MANY_REQUESTS, detail={"error": "too many requests"},
+                                headers={'Retry-After': str(math.ceil(e.retry_after))})
+
+    @classmethod
+    def _create_token(cls, user_id: int, expires_delta: int, **claims: Any) -> str:
         expire = datetime.now(timezone.utc) + timedelta(seconds=expires_delta)
-        payload = {'user_id': user_id, 'exp': expire}
-        return jwt.encode(payload, JWT_SECRET)
+        payload = {'user_id': user_id, 'exp': expire, **claims}
+        return cls.JWT_CODEC.encode(payload)
 
     @classmethod
     def create_access_token(cls, user_id: int) -> str:
@@ -58,7 +286,7 @@ class SecurityService:
 
     @classmethod
     def create_refresh_token(cls, user_id: int) -> str:
-        return cls._create_token(user_id, REFRESH_TOKEN_EXPIRE_SECONDS)
+        return cls._create_token(user_id, REFRESH_TOKEN_EXPIRE_SECONDS, jti=secrets.token_urlsafe(12))
 
     @classmethod
     def hash_refresh_token_for_db(cls, token: str):
@@ -72,39 +300,57 @@ class SecurityService:
     @classmethod
     def decode_token(cls, token, options: dict[str, Any] = None) -> JWTScheme:
         try:
-            payload = jwt.decode(token, JWT_SECRET, algorithms=["HS256"], options=options)
+            payload = cls.JWT_CODEC.decode(token, options=options)
             return JWTScheme(**payload)
-        except ExpiredSignatureError:
+        except TokenExpiredError:
             raise HTTPException(status_code=HTTPStatus.UNAUTHORIZED, detail={"error": "token expired"})
-        except (InvalidTokenError, JWTError):
+        except TokenInvalidError:
             raise HTTPException(status_code=HTTPStatus.FORBIDDEN, detail={"error": "token invalid"})
         except ValidationError:
             raise HTTPException(status_code=HTTPStatus.FORBIDDEN, detail={"error": "token invalid"})
 
     @classmethod
     def require_auth(cls, request: Request) -> JWTScheme:
-        GLOG.info('Проверяем аутентификацию')
+        SECURITY_LOG.info('Проверяем аутентификацию')
         access_token = request.cookies.get(cls.ACCESS_COOKIE)
         if not access_token:
             raise HTTPException(status_code=HTTPStatus.FORBIDDEN, detail='Not authorized')
+        return cls.authenticate_access_token(access_token)
+
+    @classmethod
+    def authenticate_access_token(cls, access_token: str) -> JWTScheme:
+        cache_key = cls.token_digest(access_token)
+        user_payload = cls.ACCESS_TOKEN_CACHE.get(cache_key)
+        if user_payload is not None:
+            return user_payload
 
         user_payload = cls.decode_token(access_token)
+        cls.ACCESS_TOKEN_CACHE.set(cache_key, user_payload, expires_at=user_payload.exp.timestamp())
         return user_payload
 
+    @classmethod
+    def token_digest(cls, token: str) -> bytes:
+        return hashlib.blake2b(token.encode('utf-8'), digest_size=16).digest()
+
 
     @classmethod
     def require_csrf(cls, request: Request) -> None:
-        GLOG.info('Проверяем csrf') # TODO надо вынести логгер в DI
-        cookie_token = request.cookies.get(cls.CSRF_COOKIE)
-        header_token = request.headers.get(cls.CSRF_HEADER)
+        SECURITY_LOG.info('Проверяем csrf') # TODO надо вынести логгер в DI
+        cls.verify_csrf(request.cookies.get(cls.CSRF_COOKIE), request.headers.get(cls.CSRF_HEADER))
+
+    @classmethod
+    def verify_csrf(cls, cookie_token: str | None, header_token: str | None) -> None:
         if not cookie_token or not header_token:
             raise HTTPException(status_code=HTTPStatus.FORBIDDEN, detail="CSRF token required")
         if not secrets.compare_digest(cookie_token, header_token):
             raise HTTPException(status_code=HTTPStatus.FORBIDDEN, detail="CSRF token mismatch")
+        if cls.CSRF_TOKEN_CACHE.get(cookie_token):
+            return
         try:
             cls.CSRF_SERIALIZER.loads(cookie_token)
         except itsdangerous.BadSignature:
             raise HTTPException(status_code=HTTPStatus.FORBIDDEN, detail="CSRF token invalid")
+        cls.CSRF_TOKEN_CACHE.set(cookie_token, True)
 
     @classmethod
     def set_access_token(cls, response: Response, user_id: int):
@@ -118,9 +364,7 @@ class SecurityService:
         return token
 
     @classmethod
-    async def set_refresh_token(cls, response: Response, user_id: int, uow: UnitOfWork):
-        token = cls.create_refresh_token(user_id)
-        await uow.user_repository.update_by_id(id=user_id, values={'refresh_token_hash': cls.hash_refresh_token_for_db(token)})
+    def _set_refresh_cookie(cls, response: Response, token: str):
         response.set_cookie(
             key=cls.REFRESH_COOKIE,
             value=token,
@@ -128,8 +372,60 @@ class SecurityService:
             httponly=True,
             path="/auth"
         )
+
+    @classmethod
+    async def _call_session_store(cls, method: str, *args):
+        try:
+            return await getattr(cls.session_store(), method)(*args)
+        except SessionStoreError as e:
+            GLOG.error(f'Хранилище сессий недоступно: {e}')
+            raise HTTPException(status_code=HTTPStatus.SERVICE_UNAVAILABLE, detail={"error": "server busy"})
+
+    @classmethod
+    async def set_refresh_token(cls, response: Response, user_id: int):
+        """Новая refresh сессия (логин с ещё одного устройства не завершает остальные)."""
+        token = cls.create_refresh_token(user_id)
+        await cls._call_session_store('add', cls.hash_refresh_token_for_db(token), user_id, REFRESH_TOKEN_EXPIRE_SECONDS)
+        cls._set_refresh_cookie(response, token)
+        return token
+
+    @classmethod
+    async def _rotate_in_store(cls, user_id: int, old_token: str) -> str | None:
+        token = cls.create_refresh_token(user_id)
+        rotated = await cls._call_session_store(
+            'rotate', cls.hash_refresh_token_for_db(old_token), cls.hash_refresh_token_for_db(token),
+            user_id, REFRESH_TOKEN_EXPIRE_SECONDS,
+        )
+        return token if rotated else None
+
+    @classmethod
+    async def rotate_refresh_token(cls, response: Response, user_id: int, old_token: str) -> str | None:
+        """
+        Обмен refresh токена на новый. None - токен неизвестен или уже использован.
+        Конкурентные обмены одного токена (несколько вкладок после истечения access токена) в процессе
+        выполняются одной ротацией, а повтор в течение REFRESH_GRACE_SECONDS получает тот же новый токен.
+        """
+        key = cls.token_digest(old_token)
+        token = cls.REFRESH_GRACE.get(key)
+        if token is None:
+            rotation = cls._REFRESH_IN_FLIGHT.get(key)
+            if rotation is None:
+                rotation = asyncio.ensure_future(cls._rotate_in_store(user_id, old_token))
+                cls._REFRESH_IN_FLIGHT[key] = rotation
+                rotation.add_done_callback(lambda _: cls._REFRESH_IN_FLIGHT.pop(key, None))
+            # отмена одного запроса не должна отменять ротацию для остальных
+            token = await asyncio.shield(rotation)
+            if token is None:
+                return None
+            cls.REFRESH_GRACE.set(key, token)
+
+        cls._set_refresh_cookie(response, token)
         return token
 
+    @classmethod
+    async def revoke_refresh_token(cls, user_id: int, token: str):
+        await cls._call_session_store('revoke', cls.hash_refresh_token_for_db(token), user_id)
+
     @classmethod
     def create_csrf_token(cls) -> str:
         token = cls.CSRF_SERIALIZER.dumps({
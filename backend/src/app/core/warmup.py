@@ -0,0 +1,76 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from backend.cfg import LOGIN_FILTER_ENABLED, WARMUP_DB_CONNECTIONS, WARMUP_STEP_TIMEOUT_SECONDS
+from backend.logger import GLOG
+
+
+async def open_pool_connections(engine: AsyncEngine, count: int) -> int:
+    """
+    Открыть count соединений одновременно и вернуть их в пул: первые запросы не ждут connect,
+    TLS и handshake. Соединения сверх pool_size пул закрыл бы при возврате, поэтому count ограничен им.
+    """
+    count = min(count, engine.pool.size())
+    if count <= 0:
+        return 0
+    opened = await asyncio.gather(*(engine.connect().start() for _ in range(count)), return_exceptions=True)
+    connections = [connection for connection in opened if not isinstance(connection, BaseException)]
+    try:
+        if len(connections) < count:
+            raise next(error for error in opened if isinstance(error, BaseException))
+        await asyncio.gather(*(connection.execute(text('SELECT 1')) for connection in connections))
+    finally:
+        for connection in connections:
+            await connection.close()
+    return count
+
+
+async def warm_up_statements(container) -> int:
+    """Горячие statement'ы /auth в compiled cache primary и, если есть, реплик."""
+    statements = 0
+    for primary_only in (False, True) if container.script_replicas() is not None else (True,):
+        async with container.script_uow() as uow:
+            if primary_only:
+                uow.use_primary()
+            statements += await uow.user_repository.warm_up_statements()
+    return statements
+
+
+async def load_login_filter(container) -> dict:
+    async with container.script_uow() as uow:
+        # реплика может не успеть получить последние регистрации
+        uow.use_primary()
+        login_filter = await uow.user_repository.load_login_filter()
+    return login_filter.stats()
+
+
+async def warm_up(container, db_connections: int = WARMUP_DB_CONNECTIONS,
+                  step_timeout: float = WARMUP_STEP_TIMEOUT_SECONDS) -> dict[str, Any]:
+    """
+    Прогрев перед приёмом трафика, шаги по порядку. Ошибка или таймаут шага логируется и не
+    останавливает старт: недоступную БД покажет /ready. Возвращает время и результат каждого шага.
+    """
+    steps: dict[str, Callable[[], Awaitable[Any]]] = {
+        'db_connections': lambda: open_pool_connections(container.script_engine(), db_connections),
+        'statements': lambda: warm_up_statements(container),
+        'security': container.security_service().warm_up,
+    }
+    if LOGIN_FILTER_ENABLED:
+        steps['login_filter'] = lambda: load_login_filter(container)
+
+    report = {}
+    for name, step in steps.items():
+        started = time.perf_counter()
+        try:
+            async with asyncio.timeout(step_timeout):
+                result = await step()
+            report[name] = {'ok': True, 'seconds': round(time.perf_counter() - started, 3), 'result': result}
+        except Exception as e:
+            GLOG.error(f'Прогрев {name} не выполнен: {e!r}')
+            report[name] = {'ok': False, 'seconds': round(time.perf_counter() - started, 3), 'error': type(e).__name__}
+    GLOG.info(f'Прогрев завершён: {report}')
+    return report
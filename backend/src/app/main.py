@@ -1,4 +1,5 @@
 from contextlib import asynccontextmanager
+from http import HTTPStatus
 
 from dependency_injector.wiring import Provide
 from fastapi import FastAPI, Response, Request, HTTPException, Depends
@@ -7,17 +8,43 @@ from starlette.responses import JSONResponse
 
 from backend.di_container import container as c
 from backend.src.app.api.auth import auth_router
+from backend.src.app.api.metrics import metrics_router, register_collectors
+from backend.src.app.core.middlewares.csrf import CSRFMiddleware
+from backend.src.app.core.middlewares.metrics import MetricsMiddleware
+from backend.src.app.core.warmup import warm_up
+from backend.src.infrastructure.enums.users.enums import UserEventEnum
 from logger import GLOG
 from src.app.core.services.security import SecurityService
 
 
+def link_login_filter():
+    # логины, зарегистрированные в других воркерах, приходят событием; подписка до загрузки, чтобы не потерять их
+    c.event_handler().register_event(UserEventEnum.registered.value)
+    c.event_handler().link(c.login_filter().add, UserEventEnum.registered.value)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     c.wire(modules=["backend.src.app.api.auth"])
     GLOG.info("Контейнер настроен (wire)")
+    # неподходящее хранилище сессий (memory при нескольких воркерах) останавливает запуск
+    c.session_store()
+    await c.event_handler().start_transport()
+    link_login_filter()
+    readiness = c.readiness_probe()
+    readiness.warm_up = await warm_up(c)
+    readiness.warmed_up = True
     yield
+    readiness.warmed_up = False
+    await c.event_batcher().aclose()
+    await c.event_handler().close_transport()
     await c.script_engine().dispose()
+    if c.script_replicas() is not None:
+        await c.script_replicas().dispose()
     await c.admin_engine().dispose()
+    c.security_service().HASH_POOL.shutdown()
+    await c.session_store().close()
+    await c.security_service().RATE_LIMITER.close()
     c.unwire()
 
 
@@ -32,7 +59,13 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# после CORS, чтобы быть внешним слоем, как прежний @app.middleware("http")
+app.add_middleware(CSRFMiddleware, security=c.security_service())
+# внешний слой: время запроса включает CORS и CSRF, отклонённые ими запросы тоже учитываются
+app.add_middleware(MetricsMiddleware)
 app.include_router(auth_router)
+app.include_router(metrics_router)
+register_collectors(c)
 
 
 @app.get("/health", tags=["health"])
@@ -40,19 +73,9 @@ async def health_check():
     return {"status": "ok"}
 
 
-@app.middleware("http")
-async def csrf_middleware(request: Request, call_next) -> Response:
-    # Проверяем, является ли запрос POST
-    if request.method in ("POST", "DELETE", "PUT", "PATCH", ):
-        try:
-            c.security_service().require_csrf(request)
-        except HTTPException as e:
-            GLOG.warning(f"CSRF validation failed for {request.url}: {e.detail}")
-            return JSONResponse(
-                status_code=e.status_code,
-                content={"detail": e.detail}
-            )
-
-    response = await call_next(request)
-
-    return response
\ No newline at end of file
+@app.get("/ready", tags=["health"])
+async def readiness_check():
+    # /health - процесс жив, /ready - прогрев завершён и БД доступна
+    result = await c.readiness_probe().check()
+    status_code = HTTPStatus.OK if result['status'] == 'ready' else HTTPStatus.SERVICE_UNAVAILABLE
+    return JSONResponse(status_code=status_code, content=result)
@@ -11,4 +11,6 @@ class JWTScheme(BaseModel):
     model_config = ConfigDict(extra='forbid')
     
     user_id: int
-    exp: datetime.datetime
\ No newline at end of file
+    exp: datetime.datetime
+    # только у refresh токена: делает токены разных сессий уникальными
+    jti: str | None = None
\ No newline at end of file
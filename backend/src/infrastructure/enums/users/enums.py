@@ -6,4 +6,9 @@ class UserLanguageEnum(str, Enum):
     
 class UserTypeEnum(str, Enum):
     admin = 'admin'
-    player = 'player'
\ No newline at end of file
+    player = 'player'
+
+
+class UserEventEnum(str, Enum):
+    # login нового пользователя, рассылается всем воркерам через EventHandler
+    registered = 'user.registered'
\ No newline at end of file
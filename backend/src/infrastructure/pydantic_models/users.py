@@ -26,4 +26,11 @@ class PyUser(BaseModel):
     #         return value
     #     if not 0 < value < 100:
     #         raise ValueError("Возраст должен быть между 1 и 99")
-    #     return value
\ No newline at end of file
+    #     return value
+
+
+class PyUserMe(BaseModel):
+    """Проекция для /auth/me"""
+    id: int
+    login: str
+    email: str | None = None
@@ -1,27 +1,140 @@
+import asyncio
+import time
 from abc import ABC
-from typing import Any, Type, Literal
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Type, Literal, Callable, Sequence, AsyncIterator
 
 from pydantic import BaseModel
-from sqlalchemy import select, Row, delete, update
+from sqlalchemy import select, Row, delete, update, tuple_, bindparam, event
 from sqlalchemy.dialects.mysql import insert
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import InstrumentedAttribute, Session, SessionTransaction
+from sqlalchemy.orm.util import identity_key
 
 from backend.db_mixins import BaseSQLModel
+from backend.src.modules.shared.cache import TTLCache
 from backend.src.modules.shared.exceptions import RepositoryModelIsNotDefined, PydanticModelIsNotImplemented
 
 
+class Record:
+    """
+    Лёгкая запись для частичных выборок.
+    Колонки объявляются через __slots__, значения присваиваются позиционно в порядке __slots__.
+    """
+    __slots__ = ()
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    def model_dump(self) -> dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other) -> bool:
+        return type(self) is type(other) and self.model_dump() == other.model_dump()
+
+    def __repr__(self) -> str:
+        values = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'{self.__class__.__name__}({values})'
+
+
+ResultType = Type[Record] | Type[BaseModel]
+
+# session.info: сбросы кэша, отложенные до конца транзакции
+PENDING_INVALIDATIONS = 'pending_cache_invalidations'
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _run_pending_invalidations(session: Session, transaction: SessionTransaction) -> None:
+    # внешняя транзакция закончилась commit, rollback или close - изменения видны всем или отменены
+    if transaction.parent is not None:
+        return
+    for invalidate in session.info.pop(PENDING_INVALIDATIONS, ()):
+        invalidate()
+
+
+@dataclass
+class BulkChunkReport:
+    index: int
+    rows: int
+    estimated_bytes: int
+    seconds: float = 0.0
+    rowcount: int = 0
+    # lastrowid пачки, только для последовательной вставки в одной сессии
+    first_id: int | None = None
+
+    @property
+    def id_range(self) -> tuple[int, int] | None:
+        """
+        Диапазон вставленных id. В MySQL lastrowid многострочного INSERT - id первой строки.
+        Что остальные id идут подряд, рассчитываем только для последовательных пачек одной сессии
+        и обычной вставки (rowcount == rows): при параллельных пачках и innodb_autoinc_lock_mode=2
+        вставки других сессий перемежаются, поэтому first_id там не заполняется и диапазона нет.
+        """
+        if not self.first_id or self.rowcount != self.rows:
+            return None
+        return self.first_id, self.first_id + self.rows - 1
+
+
+@dataclass
+class BulkInsertReport:
+    mode: str
+    chunks: list[BulkChunkReport] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def rows(self) -> int:
+        return sum(chunk.rows for chunk in self.chunks)
+
+    @property
+    def rowcount(self) -> int:
+        return sum(chunk.rowcount for chunk in self.chunks)
+
+    @property
+    def id_ranges(self) -> list[tuple[int, int]]:
+        return [chunk.id_range for chunk in self.chunks if chunk.id_range]
+
+
 class SqlAlchemyRepository(ABC):
     
     model = NotImplemented
     pydantic_model = NotImplemented
+    # ограничения одного INSERT в bulk_insert, байты должны быть меньше max_allowed_packet
+    BULK_MAX_ROWS = 1000
+    BULK_MAX_BYTES = 1024 * 1024
+    # проекции, которые когда-либо попадали в кэш - нужны для инвалидации всех вариантов строки
+    _cached_projections: set[Any] = {None}
+    # (model, result_type) -> (колонки для SELECT, маппер строки)
+    _compiled_projections: dict[tuple[Any, ResultType], tuple[tuple, Callable[[Row], Any]]] = {}
+    # (model, вид запроса, ключ) -> statement с bindparam: собирается один раз, ключ compiled cache
+    # SQLAlchemy мемоизируется на объекте, поэтому повторные вызовы не строят и не компилируют запрос заново
+    _statements: dict[tuple, Any] = {}
 
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession | None, cache: TTLCache | None = None, router: Any = None):
         
-        self.session = session
+        self._session = session
+        # общий для процесса read-through кэш строк по id, сбрасывается в update_by_id/delete_by_id и после их commit
+        self.cache = cache
+        # сессии от UnitOfWork: атрибуты session (ленивая) и read_session, метод use_primary()
+        self.router = router
         if not hasattr(self, 'model'):
             raise RepositoryModelIsNotDefined(f'Модель для репозитория {self.__class__.__name__} не определена')
 
+    @property
+    def session(self) -> AsyncSession:
+        return self.router.session if self.router is not None else self._session
+
+    @property
+    def read_session(self) -> AsyncSession:
+        """Сессия для чтения: реплика от router, если он есть, иначе primary."""
+        return self.router.read_session if self.router is not None else self.session
+
+    def _mark_write(self) -> None:
+        # после записи чтения в этой единице работы должны видеть её результат - только primary
+        if self.router is not None:
+            self.router.use_primary()
+
     def to_pydantic(self, instance: Row, 
                                     pydantic_not_implemented: Literal['exception', 'return_instance'] = 'return_instance'):
         if self.pydantic_model:
@@ -31,19 +144,256 @@ class SqlAlchemyRepository(ABC):
         else:
             raise PydanticModelIsNotImplemented()
 
-    async def get_by_id(self, id: int, select_fields: list[InstrumentedAttribute[Any]] | None = None):
-        
-        model_fields = select_fields if select_fields else (self.model,)
-        query = select(*model_fields).where(self.model.id == id) # type: ignore
-        executed_query = await self.session.execute(query)
-        result = executed_query.first() if select_fields else executed_query.scalars().first()
+    @classmethod
+    def compile_projection(cls, result_type: ResultType) -> tuple[tuple, Callable[[Row], Any]]:
+        """
+        Колонки и маппер для result_type, строятся один раз на пару (модель, result_type).
+        Pydantic модели собираются через model_construct без валидации - данные уже из БД.
+        """
+        key = (cls.model, result_type)
+        compiled = cls._compiled_projections.get(key)
+        if compiled is not None:
+            return compiled
+
+        if isinstance(result_type, type) and issubclass(result_type, Record):
+            names: Sequence[str] = result_type.__slots__
+            mapper = lambda row: result_type(*row)
+        elif isinstance(result_type, type) and issubclass(result_type, BaseModel):
+            names = tuple(result_type.model_fields)
+            # позиционно: к строке могут быть дописаны служебные колонки (ключ пагинации)
+            mapper = lambda row: result_type.model_construct(**dict(zip(names, row)))
+        else:
+            raise TypeError(f'Проекция {result_type} должна быть Record или pydantic моделью')
+
+        missing = [name for name in names if not hasattr(cls.model, name)]
+        if missing:
+            raise ValueError(f'В модели {cls.model.__name__} нет колонок {missing} для проекции {result_type.__name__}')
+
+        compiled = cls._compiled_projections[key] = (tuple(getattr(cls.model, name) for name in names), mapper)
+        return compiled
+
+    @classmethod
+    def _statement(cls, kind: str, key: Any, build: Callable[[], Any]):
+        cache_key = (cls.model, kind, key)
+        statement = cls._statements.get(cache_key)
+        if statement is None:
+            statement = cls._statements[cache_key] = build()
+        return statement
+
+    def _columns(self, select_fields: list[InstrumentedAttribute[Any]] | None,
+                 result_type: ResultType | None) -> tuple:
+        if result_type is not None:
+            return self.compile_projection(result_type)[0]
+        if select_fields:
+            return tuple(select_fields)
+        return (self.model,)
+
+    async def _fetch_one(self, query, params: dict[str, Any] | None,
+                         select_fields: list[InstrumentedAttribute[Any]] | None,
+                         result_type: ResultType | None):
+        executed_query = await self.read_session.execute(query, params)
+        if result_type is not None:
+            row = executed_query.first()
+            return self.compile_projection(result_type)[1](row) if row else None
+
+        if select_fields:
+            # частичная строка не проходит валидацию полной pydantic модели, отдаём Row как есть
+            return executed_query.first()
+
+        result = executed_query.scalars().first()
         return self.to_pydantic(result) if result else None
 
+    async def _get_one(self, where, select_fields: list[InstrumentedAttribute[Any]] | None = None,
+                       result_type: ResultType | None = None):
+        query = select(*self._columns(select_fields, result_type)).where(where)
+        return await self._fetch_one(query, None, select_fields, result_type)
+
+    async def _get_one_by(self, column: InstrumentedAttribute[Any], value: Any,
+                          select_fields: list[InstrumentedAttribute[Any]] | None = None,
+                          result_type: ResultType | None = None):
+        """_get_one по равенству колонки через закэшированный statement."""
+        query = self._statement(
+            f'get_one_by:{column.key}', self._projection_key(select_fields, result_type),
+            lambda: select(*self._columns(select_fields, result_type)).where(column == bindparam('value')),
+        )
+        return await self._fetch_one(query, {'value': value}, select_fields, result_type)
+
+    async def get_by_id(self, id: int, select_fields: list[InstrumentedAttribute[Any]] | None = None,
+                        result_type: ResultType | None = None):
+        """
+        result_type - Record или pydantic модель: выбираются только её поля, валидация не выполняется.
+        select_fields без result_type возвращает Row.
+        """
+        return await self._get_one_by(self.model.id, id, select_fields=select_fields, result_type=result_type)  # type: ignore
+
+    # максимум значений в одном IN (...)
+    MANY_MAX_KEYS = 1000
+
+    async def _get_many(self, key_column: InstrumentedAttribute[Any], keys, result_type: ResultType | None = None) -> dict:
+        unique_keys = list(dict.fromkeys(keys))
+        if not unique_keys:
+            return {}
+
+        columns, mapper, is_entity = self._selection(result_type)
+        # ключ дописывается последней колонкой, маппер проекции его не видит
+        selected = columns if is_entity else (*columns, key_column)
+        query = self._statement(
+            f'get_many:{key_column.key}', result_type,
+            lambda: select(*selected).where(key_column.in_(bindparam('keys', expanding=True))),
+        )
+        session = self.read_session
+        found = {}
+        for start in range(0, len(unique_keys), self.MANY_MAX_KEYS):
+            chunk = unique_keys[start:start + self.MANY_MAX_KEYS]
+            executed_query = await session.execute(query, {'keys': chunk})
+            if is_entity:
+                for row in executed_query.scalars():
+                    found[getattr(row, key_column.key)] = mapper(row)
+            else:
+                for row in executed_query:
+                    found[row[-1]] = mapper(row)
+        return found
+
+    async def get_many_by_ids(self, ids, result_type: ResultType | None = None) -> dict[int, Any]:
+        """
+        Пачка строк одним запросом WHERE id IN (...).
+        Возвращает словарь id -> запись, отсутствующих id в словаре нет.
+        """
+        return await self._get_many(self.model.id, ids, result_type=result_type)  # type: ignore
+
+    @staticmethod
+    def _projection_key(select_fields: list[InstrumentedAttribute[Any]] | None,
+                        result_type: ResultType | None = None) -> Any:
+        if result_type is not None:
+            return result_type
+        return tuple(field.key for field in select_fields) if select_fields else None
+
+    def _cache_key(self, id: int, projection: Any) -> tuple:
+        return self.model.__tablename__, id, projection
+
+    async def get_by_id_cached(self, id: int, select_fields: list[InstrumentedAttribute[Any]] | None = None,
+                               result_type: ResultType | None = None):
+        """
+        get_by_id через кэш.
+        С select_fields/result_type работает в режиме проекции: выбираются и кэшируются только нужные колонки.
+        """
+        if self.cache is None:
+            return await self.get_by_id(id, select_fields=select_fields, result_type=result_type)
+
+        projection = self._projection_key(select_fields, result_type)
+        key = self._cache_key(id, projection)
+        result = self.cache.get(key)
+        if result is not None:
+            return result
+
+        result = await self.get_by_id(id, select_fields=select_fields, result_type=result_type)
+        if result is not None:
+            self._cached_projections.add(projection)
+            self.cache.set(key, result)
+        return result
+
+    def invalidate_cache(self, id: int) -> None:
+        if self.cache is None:
+            return
+        for projection in self._cached_projections:
+            self.cache.pop(self._cache_key(id, projection))
+
+    def _invalidate_after_write(self, id: int) -> None:
+        """
+        Сброс кэша после UPDATE/DELETE строки. Сразу - чтобы эта же транзакция не читала старую строку
+        из кэша, и ещё раз после конца транзакции: до commit конкурентный get_by_id_cached читает из БД
+        старую строку и кладёт её в кэш. После rollback сбрасывается прочитанная в транзакции версия.
+        """
+        if self.cache is None:
+            return
+        self.invalidate_cache(id)
+        self.session.info.setdefault(PENDING_INVALIDATIONS, []).append(partial(self.invalidate_cache, id))
+
+    def _selection(self, result_type: ResultType | None) -> tuple[tuple, Callable[[Any], Any], bool]:
+        """(колонки, маппер, выбирается ли ORM сущность целиком)"""
+        if result_type is not None:
+            columns, mapper = self.compile_projection(result_type)
+            return columns, mapper, False
+        return (self.model,), self.to_pydantic, True
+
+    async def stream(self, where=None, result_type: ResultType | None = None,
+                     order_by: InstrumentedAttribute[Any] | None = None,
+                     batch_size: int = 1000) -> AsyncIterator[list]:
+        """
+        Потоковое чтение через серверный курсор (session.stream), отдаёт списки по batch_size записей.
+        Вся выборка - один запрос, поэтому сессию нельзя использовать для других запросов до конца итерации.
+        """
+        columns, mapper, is_entity = self._selection(result_type)
+        query = select(*columns).execution_options(yield_per=batch_size)
+        if where is not None:
+            query = query.where(where)
+        if order_by is not None:
+            query = query.order_by(order_by)
+
+        result = await self.read_session.stream(query)
+        if is_entity:
+            result = result.scalars()
+        async for partition in result.partitions(batch_size):
+            yield [mapper(row) for row in partition]
+
+    async def get_page(self, after: Any = None, limit: int = 100, where=None,
+                       result_type: ResultType | None = None,
+                       order_by: InstrumentedAttribute[Any] | None = None,
+                       descending: bool = False) -> tuple[list, Any]:
+        """
+        Keyset пагинация: WHERE (order_by, id) > (after) ORDER BY order_by, id LIMIT limit.
+        Стоимость страницы не зависит от глубины, в отличие от OFFSET.
+        after - курсор предыдущей страницы, возвращается вторым элементом (None, если страниц больше нет).
+        Для order_by не по id курсор - кортеж (значение, id), колонка должна быть проиндексирована.
+        """
+        id_column = self.model.id
+        order_column = order_by if order_by is not None else id_column
+        by_id = order_column is id_column
+        key_columns = (id_column,) if by_id else (order_column, id_column)
+
+        columns, mapper, is_entity = self._selection(result_type)
+        query = select(*columns) if is_entity else select(*columns, *key_columns)
+        if where is not None:
+            query = query.where(where)
+        if after is not None:
+            key = key_columns[0] if by_id else tuple_(*key_columns)
+            bound = after if by_id else tuple_(*after)
+            query = query.where(key < bound if descending else key > bound)
+        query = query.order_by(*(column.desc() if descending else column for column in key_columns)).limit(limit)
+
+        executed_query = await self.read_session.execute(query)
+        if is_entity:
+            rows = executed_query.scalars().all()
+            cursor_of = lambda row: tuple(getattr(row, column.key) for column in key_columns)
+        else:
+            rows = executed_query.all()
+            cursor_of = lambda row: tuple(row[-len(key_columns):])
+
+        items = [mapper(row) for row in rows]
+        next_after = None
+        if len(rows) == limit:
+            last_key = cursor_of(rows[-1])
+            next_after = last_key[0] if by_id else last_key
+        return items, next_after
+
+    async def iter_pages(self, limit: int = 1000, where=None, result_type: ResultType | None = None,
+                         order_by: InstrumentedAttribute[Any] | None = None,
+                         descending: bool = False, after: Any = None) -> AsyncIterator[list]:
+        """Обход всей выборки keyset страницами, каждая страница - отдельный короткий запрос."""
+        while True:
+            items, after = await self.get_page(after=after, limit=limit, where=where, result_type=result_type,
+                                               order_by=order_by, descending=descending)
+            if items:
+                yield items
+            if after is None:
+                return
+
     async def add(self, value: dict[str, Any],
                        commit: bool = False):
         if not value:
             return
 
+        self._mark_write()
         query = insert(self.model).values(**value)
         executed_query = await self.session.execute(query)
         if commit:
@@ -56,6 +406,7 @@ class SqlAlchemyRepository(ABC):
         if not values:
             return
         
+        self._mark_write()
         query = insert(self.model).values(values)
         executed_query = await self.session.execute(query)
         result = executed_query.lastrowid
@@ -66,6 +417,96 @@ class SqlAlchemyRepository(ABC):
             
     
 
+    @staticmethod
+    def _estimate_row_bytes(row: dict[str, Any]) -> int:
+        # грубая оценка размера строки в тексте запроса: значения в utf-8 + кавычки/запятые
+        return sum(
+            len(value) if isinstance(value, bytes) else len(str(value).encode('utf-8')) for value in row.values()
+        ) + 4 * len(row)
+
+    @classmethod
+    def split_chunks(cls, values: list[dict], max_rows: int, max_bytes: int) -> list[tuple[list[dict], int]]:
+        """Разбивка строк на пачки, ограниченные и количеством строк, и оценкой размера в байтах."""
+        chunks = []
+        current: list[dict] = []
+        current_bytes = 0
+        for row in values:
+            row_bytes = cls._estimate_row_bytes(row)
+            if current and (len(current) >= max_rows or current_bytes + row_bytes > max_bytes):
+                chunks.append((current, current_bytes))
+                current, current_bytes = [], 0
+            current.append(row)
+            current_bytes += row_bytes
+        if current:
+            chunks.append((current, current_bytes))
+        return chunks
+
+    def _bulk_query(self, rows: list[dict], mode: Literal['insert', 'ignore', 'upsert'],
+                    update_fields: Sequence[str] | None):
+        query = insert(self.model).values(rows)
+        if mode == 'ignore':
+            return query.prefix_with('IGNORE')
+        if mode == 'upsert':
+            fields = update_fields if update_fields else [key for key in rows[0] if key != 'id']
+            return query.on_duplicate_key_update({name: query.inserted[name] for name in fields})
+        return query
+
+    async def bulk_insert(self, values: list[dict],
+                          mode: Literal['insert', 'ignore', 'upsert'] = 'insert',
+                          update_fields: Sequence[str] | None = None,
+                          max_rows: int | None = None,
+                          max_bytes: int | None = None,
+                          sessionmaker: async_sessionmaker | None = None,
+                          concurrency: int = 1,
+                          commit: bool = False) -> BulkInsertReport:
+        """
+        Массовая вставка пачками.
+        mode: insert - обычный INSERT, ignore - INSERT IGNORE, upsert - ON DUPLICATE KEY UPDATE update_fields
+        (по умолчанию все поля кроме id).
+        Без sessionmaker пачки выполняются по очереди в текущей сессии (одна транзакция, commit по флагу).
+        С sessionmaker пачки идут параллельно (до concurrency) в отдельных сессиях из пула,
+        каждая коммитится сама - вставка целиком уже не атомарна, а id_ranges в отчёте пуст.
+        """
+        report = BulkInsertReport(mode=mode)
+        if not values:
+            return report
+
+        chunks = self.split_chunks(values, max_rows or self.BULK_MAX_ROWS, max_bytes or self.BULK_MAX_BYTES)
+        report.chunks = [BulkChunkReport(index=index, rows=len(rows), estimated_bytes=size)
+                         for index, (rows, size) in enumerate(chunks)]
+        started = time.perf_counter()
+
+        async def run_chunk(session: AsyncSession, rows: list[dict], chunk: BulkChunkReport, sequential: bool):
+            chunk_started = time.perf_counter()
+            executed_query = await session.execute(self._bulk_query(rows, mode, update_fields))
+            chunk.rowcount = executed_query.rowcount
+            if sequential:
+                chunk.first_id = executed_query.lastrowid
+            chunk.seconds = time.perf_counter() - chunk_started
+
+        if sessionmaker is None:
+            self._mark_write()
+            for (rows, _), chunk in zip(chunks, report.chunks):
+                await run_chunk(self.session, rows, chunk, sequential=True)
+            if commit:
+                await self.session.commit()
+        else:
+            semaphore = asyncio.Semaphore(max(1, concurrency))
+
+            async def run_in_own_session(rows: list[dict], chunk: BulkChunkReport):
+                async with semaphore, sessionmaker() as session:
+                    await run_chunk(session, rows, chunk, sequential=False)
+                    await session.commit()
+
+            await asyncio.gather(*(run_in_own_session(rows, chunk) for (rows, _), chunk in zip(chunks, report.chunks)))
+
+        if mode == 'upsert' and self.cache is not None:
+            # обновлённые строки известны только по уникальному ключу, поэтому сбрасываем кэш целиком
+            self.cache.clear()
+
+        report.seconds = time.perf_counter() - started
+        return report
+
     async def add_with_ignore_conflict(self,
                                             value: dict,
                                             commit: bool = False,
@@ -74,6 +515,7 @@ class SqlAlchemyRepository(ABC):
         Метод INSERT IGNORE
         """
         if value:
+            self._mark_write()
             query_insert = insert(self.model).values(**value).prefix_with('IGNORE')
             executed_query = await self.session.execute(query_insert)
             if commit:
@@ -82,16 +524,44 @@ class SqlAlchemyRepository(ABC):
             return executed_query.lastrowid
 
 
+    def _expire_identity(self, id: int, expunge: bool = False) -> None:
+        # закэшированные UPDATE/DELETE не синхронизируют identity map, загруженный объект сбрасываем вручную
+        instance = self.session.identity_map.get(identity_key(self.model, id))
+        if instance is None:
+            return
+        if expunge:
+            self.session.expunge(instance)
+        else:
+            self.session.expire(instance)
+
     async def update_by_id(self, id: int, values: dict[str, Any], commit: bool = False):
-        query_update = update(self.model).values(**values).where(self.model.id == id)
-        executed_query = await self.session.execute(query_update)
+        self._mark_write()
+        fields = tuple(values)
+        query_update = self._statement(
+            'update_by_id', fields,
+            lambda: update(self.model)
+            .where(self.model.id == bindparam('pk'))
+            .values({name: bindparam(f'v_{name}') for name in fields})
+            .execution_options(synchronize_session=False),
+        )
+        executed_query = await self.session.execute(
+            query_update, {'pk': id, **{f'v_{name}': value for name, value in values.items()}}
+        )
+        self._expire_identity(id)
+        self._invalidate_after_write(id)
         if commit:
             await self.session.commit()
         return executed_query.lastrowid
     
     async def delete_by_id(self, id: int, commit: bool = False):
-        query = delete(self.model).where(self.model.id == id)
-        await self.session.execute(query)
+        self._mark_write()
+        query = self._statement(
+            'delete_by_id', None,
+            lambda: delete(self.model).where(self.model.id == bindparam('pk')).execution_options(synchronize_session=False),
+        )
+        await self.session.execute(query, {'pk': id})
+        self._expire_identity(id, expunge=True)
+        self._invalidate_after_write(id)
         if commit:
             await self.session.commit()
         return None
\ No newline at end of file
@@ -1,23 +1,125 @@
 from typing import Any
 
-from sqlalchemy import select
+from sqlalchemy import update, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import InstrumentedAttribute
 
 from backend.src.infrastructure.models.users import User
-from backend.src.infrastructure.pydantic_models.users import PyUser
-from backend.src.infrastructure.repositories._base_repository import SqlAlchemyRepository
+from backend.src.infrastructure.pydantic_models.users import PyUser, PyUserMe
+from backend.src.infrastructure.repositories._base_repository import SqlAlchemyRepository, Record, ResultType
+from backend.src.modules.shared.bloom import LoginFilter
+from backend.src.modules.shared.cache import TTLCache
+
+
+class UserCredentials(Record):
+    """Минимум для проверки пароля при логине."""
+    __slots__ = ('id', 'password_hash')
+
+
+class UserLogin(Record):
+    __slots__ = ('login',)
 
 
 class UserRepository(SqlAlchemyRepository):
     model = User
     pydantic_model = PyUser
 
-    async def get_by_login(self, login: str, select_fields: list[InstrumentedAttribute[Any]] | None = None) -> PyUser | None:
-        model_fields = select_fields if select_fields else (self.model,)
-        query = select(*model_fields).where(self.model.login == login)
-        executed_query = await self.session.execute(query)
-        result = executed_query.first() if select_fields else executed_query.scalars().first()
-        return PyUser.model_validate(result) if result else None
+    def __init__(self, session: AsyncSession | None, cache: TTLCache | None = None, router: Any = None,
+                 login_filter: LoginFilter | None = None):
+        super().__init__(session, cache=cache, router=router)
+        # общий для процесса фильтр существующих логинов, отсекает запросы по заведомо несуществующим
+        self.login_filter = login_filter
+
+    async def get_by_id(self, id: int, select_fields: list[InstrumentedAttribute[Any]] | None = None,
+                        result_type: ResultType | None = None) -> PyUser | Any | None:
+        # полные строки - через загрузчик единицы работы: конкурентные чтения собираются в один SELECT ... IN
+        loader = getattr(self.router, 'user_loader', None)
+        if loader is None or select_fields is not None or result_type is not None:
+            return await super().get_by_id(id, select_fields=select_fields, result_type=result_type)
+        return await loader.load(id)
+
+    async def get_by_login(self, login: str, select_fields: list[InstrumentedAttribute[Any]] | None = None,
+                           result_type: ResultType | None = None) -> PyUser | Any | None:
+        login_filter = self.login_filter
+        if login_filter is None:
+            return await self._get_one_by(self.model.login, login, select_fields=select_fields, result_type=result_type)
+
+        might_exist = login_filter.might_exist(login)
+        if not might_exist and login_filter.trust_misses:
+            return None
+        user = await self._get_one_by(self.model.login, login, select_fields=select_fields, result_type=result_type)
+        if user is None and might_exist:
+            login_filter.record_false_positive()
+        elif user is not None and not might_exist:
+            login_filter.record_false_negative(login)
+        return user
+
+    async def login_exists(self, login: str) -> bool:
+        """
+        Предварительная проверка занятости логина при регистрации, до хеширования пароля.
+        Промаху фильтра здесь можно верить всегда: если логин всё же занят, его отсечёт INSERT IGNORE,
+        ошибка стоит только лишнего bcrypt.
+        """
+        if self.login_filter is None:
+            return await self.get_by_login(login, select_fields=[self.model.id]) is not None
+        if not self.login_filter.might_exist(login):
+            return False
+        user = await self._get_one_by(self.model.login, login, select_fields=[self.model.id])
+        if user is None:
+            self.login_filter.record_false_positive()
+        return user is not None
+
+    async def add_with_ignore_conflict(self, value: dict, commit: bool = False):
+        user_id = await super().add_with_ignore_conflict(value, commit=commit)
+        if user_id and self.login_filter is not None and value.get('login'):
+            self.login_filter.add(value['login'])
+        return user_id
+
+    async def warm_up_statements(self) -> int:
+        """
+        Горячие чтения /auth по несуществующим ключам: statement'ы и проекции собираются,
+        скомпилированный SQL попадает в compiled cache engine. Возвращает число запросов.
+        """
+        await self.get_by_login('', result_type=UserCredentials)
+        await self.login_exists('')
+        await self.get_by_id(0, result_type=PyUserMe)
+        await self.get_by_id(0, select_fields=[self.model.refresh_token_hash])
+        await self.get_many_by_ids([0])
+        return 5
+
+    async def load_login_filter(self, batch_size: int = 10_000) -> LoginFilter:
+        """Заполнить login_filter из users.login одним потоковым запросом и включить его."""
+        async for batch in self.stream(result_type=UserLogin, batch_size=batch_size):
+            self.login_filter.load(user.login for user in batch)
+        self.login_filter.loaded = True
+        return self.login_filter
+
+    async def get_many_by_logins(self, logins, result_type: ResultType | None = None) -> dict[str, Any]:
+        """Пачка пользователей одним запросом, словарь login -> запись."""
+        return await self._get_many(self.model.login, logins, result_type=result_type)
+
+    async def swap_refresh_token_hash(self, id: int, old_hash: str, new_hash: str | None,
+                                      commit: bool = False) -> bool:
+        """
+        Compare-and-swap за один запрос: UPDATE users SET refresh_token_hash = new
+        WHERE id = :id AND refresh_token_hash = old. True - обновлена ровно одна строка.
+        """
+        self._mark_write()
+        query = self._statement(
+            'swap_refresh_token_hash', None,
+            lambda: update(self.model)
+            .where(self.model.id == bindparam('pk'), self.model.refresh_token_hash == bindparam('old_hash'))
+            .values(refresh_token_hash=bindparam('new_hash'))
+            .execution_options(synchronize_session=False),
+        )
+        executed_query = await self.session.execute(query, {'pk': id, 'old_hash': old_hash, 'new_hash': new_hash})
+        swapped = executed_query.rowcount == 1
+        if swapped:
+            self._expire_identity(id)
+            self._invalidate_after_write(id)
+        if commit:
+            await self.session.commit()
+        return swapped
         #
     #
     # async def add(self, value: PyUser,
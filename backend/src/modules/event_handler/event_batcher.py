@@ -0,0 +1,112 @@
+import asyncio
+import logging
+
+from backend.src.modules.event_handler.event_handler import EventHandler
+
+logger = logging.getLogger(__name__)
+
+
+class EventBatcher:
+    """Buffered publishing on top of EventHandler.
+
+    Events are collected per event name during ``window`` seconds or until ``max_batch``
+    items are buffered, then delivered with a single ``handler.fire(event_name, batch)`` call,
+    where ``batch`` is a list of payloads in arrival order. Payloads published with the same
+    ``key`` are coalesced: only the last value is delivered, at the position of the first one.
+    """
+
+    def __init__(self, handler: EventHandler, window: float = 0.05, max_batch: int = 256):
+        """EventBatcher initialization.
+
+        Args:
+            handler (EventHandler): Handler used to deliver batches.
+            window (float): Max seconds an event waits in the buffer.
+            max_batch (int): Buffered items per event that trigger an immediate flush.
+        """
+        self.handler = handler
+        self.window = window
+        self.max_batch = max(1, max_batch)
+        self._buffers = {}
+        self._timer = None
+        self._tasks = set()
+        self._closed = False
+
+        self.published = 0
+        self.coalesced = 0
+        self.delivered_batches = 0
+
+    @property
+    def pending(self) -> int:
+        """Return number of buffered items."""
+        return sum(len(buffer) for buffer in self._buffers.values())
+
+    def publish(self, event_name: str, payload: any, key: any = None) -> None:
+        """Buffer an event payload.
+
+        Args:
+            event_name (str): The event to fire.
+            payload (any): Value delivered to subscribers inside the batch.
+            key (any): Coalescing key, a newer payload with the same key replaces the buffered one.
+        """
+        if self._closed:
+            raise RuntimeError('EventBatcher is closed')
+
+        self.published += 1
+        buffer = self._buffers.setdefault(event_name, {})
+        if key is None:
+            key = object()
+        elif key in buffer:
+            self.coalesced += 1
+        buffer[key] = payload
+
+        if len(buffer) >= self.max_batch:
+            # detach the buffer right away so new events go to the next batch
+            self._spawn(self._deliver(event_name, self._take(event_name)))
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._on_window)
+
+    async def flush(self) -> None:
+        """Deliver every buffered event right now."""
+        self._cancel_timer()
+        for event_name in list(self._buffers):
+            await self._flush_event(event_name)
+
+    async def aclose(self) -> None:
+        """Stop accepting events, flush the buffers and wait for in-flight deliveries."""
+        self._closed = True
+        await self.flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _on_window(self) -> None:
+        self._timer = None
+        self._spawn(self.flush())
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _spawn(self, coroutine) -> None:
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _take(self, event_name: str) -> list:
+        buffer = self._buffers.pop(event_name, None)
+        if not self._buffers:
+            self._cancel_timer()
+        return list(buffer.values()) if buffer else []
+
+    async def _flush_event(self, event_name: str) -> None:
+        await self._deliver(event_name, self._take(event_name))
+
+    async def _deliver(self, event_name: str, batch: list) -> None:
+        if not batch:
+            return
+
+        self.delivered_batches += 1
+        try:
+            await self.handler.fire(event_name, batch)
+        except Exception as e:
+            logger.exception(f'Batch delivery for {event_name} failed: {e}')
@@ -1,9 +1,211 @@
+import asyncio
+import functools
 import inspect
 import logging
+import time
 import types
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+
+from backend.src.modules.event_handler.transports import EventTransport, InMemoryTransport
 
 logger = logging.getLogger(__name__)
 
+
+@dataclass
+class CallbackOutcome:
+    """Outcome of a single callback execution inside a concurrent fire."""
+
+    callback: callable
+    ok: bool = False
+    result: any = None
+    exception: BaseException | None = None
+    timed_out: bool = False
+    elapsed: float = 0.0
+
+
+@dataclass
+class FireResult:
+    """Aggregated result of EventHandler.fire_concurrent."""
+
+    event_name: str
+    outcomes: list[CallbackOutcome] = field(default_factory=list)
+    timed_out: bool = False
+    elapsed: float = 0.0
+
+    @property
+    def all_ok(self) -> bool:
+        """Return True if every callback finished without errors or timeouts."""
+        return not self.timed_out and all(outcome.ok for outcome in self.outcomes)
+
+    @property
+    def failed(self) -> list[CallbackOutcome]:
+        """Return outcomes of callbacks that raised or timed out."""
+        return [outcome for outcome in self.outcomes if not outcome.ok]
+
+    def __bool__(self) -> bool:
+        return self.all_ok
+
+
+class TopicRouter:
+    """Wildcard topic subscriptions stored in a segment trie.
+
+    Topics are dot separated (``battle.42.card_played``). In patterns ``*`` matches exactly
+    one segment and ``#`` matches zero or more segments (``battle.*.card_played``, ``battle.#``).
+    Resolving a topic walks only the trie branches that can match it, and the resolved
+    subscribers are cached per concrete topic until the next subscribe/unsubscribe.
+    """
+
+    SEPARATOR = '.'
+    SINGLE = '*'
+    MULTI = '#'
+
+    class _Node:
+        __slots__ = ('children', 'subscribers')
+
+        def __init__(self):
+            self.children = {}
+            # callback -> (link sequence, is_coroutine)
+            self.subscribers = {}
+
+    def __init__(self, max_cache_size: int = 4096):
+        """TopicRouter initialization.
+
+        Args:
+            max_cache_size (int): Max number of concrete topics kept in the resolve cache.
+        """
+        self._root = self._Node()
+        self._patterns = {}
+        self._sequence = 0
+        self._cache = {}
+        self.max_cache_size = max_cache_size
+
+    @classmethod
+    def is_pattern(cls, topic: str) -> bool:
+        """Return True if topic contains wildcard segments.
+
+        Args:
+            topic (str): Topic or pattern.
+        """
+        if cls.SINGLE not in topic and cls.MULTI not in topic:
+            return False
+        return any(segment in (cls.SINGLE, cls.MULTI) for segment in topic.split(cls.SEPARATOR))
+
+    @property
+    def patterns(self) -> dict:
+        """Return subscribed patterns as dict of pattern -> tuple of callbacks."""
+        return {pattern: tuple(callbacks) for pattern, callbacks in self._patterns.items()}
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def subscribe(self, pattern: str, callback: callable, is_coroutine: bool) -> bool:
+        """Subscribe a callback to a pattern.
+
+        Args:
+            pattern (str): Topic pattern.
+            callback (callable): Callback to link.
+            is_coroutine (bool): Precomputed callback kind.
+        """
+        node = self._root
+        for segment in pattern.split(self.SEPARATOR):
+            node = node.children.setdefault(segment, self._Node())
+        if callback in node.subscribers:
+            return False
+
+        self._sequence += 1
+        node.subscribers[callback] = (self._sequence, is_coroutine)
+        self._patterns.setdefault(pattern, {})[callback] = node
+        self._cache.clear()
+        return True
+
+    def unsubscribe(self, pattern: str, callback: callable) -> bool:
+        """Unsubscribe a callback from a pattern.
+
+        Args:
+            pattern (str): Topic pattern.
+            callback (callable): Callback to unlink.
+        """
+        callbacks = self._patterns.get(pattern)
+        if not callbacks or callback not in callbacks:
+            return False
+
+        del callbacks.pop(callback).subscribers[callback]
+        if not callbacks:
+            del self._patterns[pattern]
+            self._prune(pattern)
+        self._cache.clear()
+        return True
+
+    def clear(self) -> None:
+        """Remove every subscription."""
+        self._root = self._Node()
+        self._patterns = {}
+        self._cache = {}
+
+    def resolve(self, topic: str) -> tuple:
+        """Return (callback, is_coroutine) pairs matching a concrete topic in link order.
+
+        Args:
+            topic (str): Concrete topic name.
+        """
+        if not self._patterns:
+            return ()
+
+        dispatch = self._cache.get(topic)
+        if dispatch is not None:
+            return dispatch
+
+        matched = {}
+        for node in self._match(topic.split(self.SEPARATOR)):
+            for callback, subscription in node.subscribers.items():
+                if callback not in matched or subscription[0] < matched[callback][0]:
+                    matched[callback] = subscription
+
+        dispatch = tuple(
+            (callback, is_coroutine)
+            for callback, (_, is_coroutine) in sorted(matched.items(), key=lambda item: item[1][0])
+        )
+        if len(self._cache) >= self.max_cache_size:
+            del self._cache[next(iter(self._cache))]
+        self._cache[topic] = dispatch
+        return dispatch
+
+    def _match(self, segments: list[str]) -> list:
+        found = []
+        size = len(segments)
+        stack = [(self._root, 0)]
+        while stack:
+            node, index = stack.pop()
+            multi = node.children.get(self.MULTI)
+            if multi is not None:
+                stack.extend((multi, position) for position in range(index, size + 1))
+            if index == size:
+                if node.subscribers:
+                    found.append(node)
+                continue
+            exact = node.children.get(segments[index])
+            if exact is not None:
+                stack.append((exact, index + 1))
+            single = node.children.get(self.SINGLE)
+            if single is not None:
+                stack.append((single, index + 1))
+        return found
+
+    def _prune(self, pattern: str) -> None:
+        path = [self._root]
+        segments = pattern.split(self.SEPARATOR)
+        for segment in segments:
+            node = path[-1].children.get(segment)
+            if node is None:
+                return
+            path.append(node)
+        for segment, parent, node in zip(reversed(segments), reversed(path[:-1]), reversed(path[1:])):
+            if node.children or node.subscribers:
+                return
+            del parent.children[segment]
+
+
 class EventHandler:
 
     class Exceptions:
@@ -13,7 +215,8 @@ class EventHandler:
             """Will raise when tries to link a callback to unexistent event."""
             pass
 
-    def __init__(self, *event_names, verbose=False, tolerate_callbacks_exceptions=False):
+    def __init__(self, *event_names, verbose=False, tolerate_callbacks_exceptions=False,
+                 transport: EventTransport | None = None, fire_latency=None):
         """EventHandler initiazition recibes a list of allowed event names as arguments.
 
         Args:
@@ -23,10 +226,23 @@ class EventHandler:
             tolerate_callbacks_exceptions (bool):
                 False will raise any callback exception, stopping the execution.
                 True will ignore any callbacks exceptions.
+            transport (EventTransport): Carries fired events to handlers in other workers,
+                InMemoryTransport (local only) by default. Call start_transport inside the loop.
+            fire_latency: Optional histogram (anything with ``observe(seconds)``) that
+                receives the duration of every fire and fire_concurrent call, callbacks included.
         """
+        # event -> ordered set of callbacks (dict keeps insertion order), value is "is coroutine"
         self.__events = {}
+        # event -> immutable tuple of (callback, is_coroutine), dropped on link/unlink and rebuilt on next fire
+        self.__dispatch = {}
+        # wildcard subscriptions (battle.*.card_played, battle.#), don't need event registration
+        self.__topics = TopicRouter()
+        self.transport = transport if transport is not None else InMemoryTransport()
+        # publish to the transport only after start_transport, keeps local-only fire cheap
+        self.__remote = False
         self.verbose = verbose
         self.tolerate_exceptions = tolerate_callbacks_exceptions
+        self.fire_latency = fire_latency
 
         if event_names:
             for event in event_names:
@@ -36,14 +252,21 @@ class EventHandler:
 
     @property
     def events(self) -> dict:
-        """Return events as dict."""
-        return self.__events
+        """Return events as dict of event name -> tuple of linked callbacks."""
+        return {event_name: tuple(callbacks) for event_name, callbacks in self.__events.items()}
 
     def clear_events(self) -> bool:
         """Clear all events."""
         self.__events = {}
+        self.__dispatch = {}
+        self.__topics.clear()
         return True
 
+    @property
+    def patterns(self) -> dict:
+        """Return wildcard subscriptions as dict of pattern -> tuple of linked callbacks."""
+        return self.__topics.patterns
+
     @property
     def event_list(self) -> set[str]:
         """Retun  list of regitered events."""
@@ -73,7 +296,7 @@ class EventHandler:
             logger.info(f'Omiting event {event_name} registration, already implemented') if self.verbose else None
             return False
 
-        self.__events[event_name] = []
+        self.__events[event_name] = {}
         return True
 
     def unregister_event(self, event_name: str) -> bool:
@@ -84,6 +307,7 @@ class EventHandler:
         """
         if event_name in self.__events:
             del self.__events[event_name]
+            self.__dispatch.pop(event_name, None)
             return True
         logger.info(f'Omiting unregister_event. {event_name} is not implemented.') if self.verbose else None
         return False
@@ -107,25 +331,55 @@ class EventHandler:
         """
         return callback in self.__events[event_name]
 
+    def dispatch_table(self, event_name: str) -> tuple:
+        """Return the precompiled (callback, is_coroutine) tuple for an event.
+
+        Exact subscribers go first, then wildcard subscribers matching the event name.
+
+        Args:
+            event_name (str): The event name.
+        """
+        dispatch = self.__dispatch.get(event_name)
+        if dispatch is None:
+            callbacks = self.__events.get(event_name)
+            if callbacks is None:
+                # unregistered topics are resolved only through the router and its bounded cache
+                return self.__topics.resolve(event_name)
+            dispatch = tuple(callbacks.items())
+            if self.__topics:
+                dispatch += tuple(item for item in self.__topics.resolve(event_name) if item[0] not in callbacks)
+            self.__dispatch[event_name] = dispatch
+        return dispatch
+
     def link(self, callback: callable, event_name: str) -> bool:
         """Link a callback to be executed on fired event..
 
         Args:
             callback (callable): function to link.
             event_name (str): The event that will trigger the callback execution.
+                Patterns with ``*`` (one segment) or ``#`` (any segments) don't need registration.
         """
 
         if not self.is_callable(callback):
             logger.info(f'Callback not registered. Type {type(callback)} is not a callable function.') if self.verbose else None
             return False
 
+        if TopicRouter.is_pattern(event_name):
+            if self.__topics.subscribe(event_name, callback, inspect.iscoroutinefunction(callback)):
+                self.__dispatch.clear()
+                return True
+            logger.info(f'Can not link callback {str(callback.__name__)}, already registered in {event_name} pattern.') if self.verbose else None
+            return False
+
         if not self.is_event_registered(event_name):
-            raise CustomEventHandler.Exceptions.EventNotAllowedError(
+            raise EventHandler.Exceptions.EventNotAllowedError(
                 f'Can not link event {event_name}, not registered. Registered events are:'
                 f' {", ".join(self.__events.keys())}. Please register event {event_name} before link callbacks.')
 
-        if callback not in self.__events[event_name]:
-            self.__events[event_name].append(callback)
+        callbacks = self.__events[event_name]
+        if callback not in callbacks:
+            callbacks[callback] = inspect.iscoroutinefunction(callback)
+            self.__dispatch.pop(event_name, None)
             return True
 
         logger.info(f'Can not link callback {str(callback.__name__)}, already registered in {event_name} event.') if self.verbose else None
@@ -138,14 +392,24 @@ class EventHandler:
             callback (callable): function to link.
             event_name (str): The event that will trigger the callback execution.
         """
+        if TopicRouter.is_pattern(event_name):
+            if self.__topics.unsubscribe(event_name, callback):
+                self.__dispatch.clear()
+                return True
+            logger.info(f'Can not unlink callback {str(callback.__name__)}, is not registered in '
+                        f'{event_name} pattern.') if self.verbose else None
+            return False
+
         if not self.is_event_registered(event_name):
             logger.info(f'Can not unlink event {event_name}, not registered. Registered events '
                   f'are: {", ".join(self.__events.keys())}. '
                   f'Please register event {event_name} before unlink callbacks.')
             return False
 
-        if callback in self.__events[event_name]:
-            self.__events[event_name].remove(callback)
+        callbacks = self.__events[event_name]
+        if callback in callbacks:
+            del callbacks[callback]
+            self.__dispatch.pop(event_name, None)
             return True
 
         logger.info(f'Can not unlink callback {str(callback.__name__)}, is not registered in '
@@ -170,15 +434,62 @@ class EventHandler:
         """Return python object representation."""
         return self.__str__()
 
+    async def start_transport(self) -> None:
+        """Start receiving events fired by peers of the transport."""
+        await self.transport.start(self.__on_remote_event)
+        self.__remote = True
+
+    async def close_transport(self) -> None:
+        """Flush pending outgoing events and stop the transport."""
+        self.__remote = False
+        await self.transport.close()
+
+    async def __on_remote_event(self, event_name: str, args: tuple, kwargs: dict) -> None:
+        try:
+            await self.fire_local(event_name, *args, **kwargs)
+        except Exception as e:
+            logger.exception(f'Remote event {event_name} callback failed: {e}')
+
     async def fire(self, event_name: str, *args, **kwargs) -> bool:
-        """Triggers all callbacks executions linked to given event."""
+        """Triggers all callbacks executions linked to given event, here and in transport peers."""
+        if self.fire_latency is None:
+            return await self.__fire(event_name, args, kwargs)
+        started = time.perf_counter()
+        try:
+            return await self.__fire(event_name, args, kwargs)
+        finally:
+            self.fire_latency.observe(time.perf_counter() - started)
+
+    async def __fire(self, event_name: str, args: tuple, kwargs: dict) -> bool:
+        # local callbacks go first, an event the transport can't carry is dropped only for peers
+        try:
+            dispatch = self.__dispatch.get(event_name)
+            if dispatch is None:
+                dispatch = self.dispatch_table(event_name)
+            if not dispatch:
+                return True
+            return await self.__run_dispatch(dispatch, args, kwargs)
+        finally:
+            if self.__remote:
+                self.transport.publish(event_name, args, kwargs)
+
+    async def fire_local(self, event_name: str, *args, **kwargs) -> bool:
+        """Triggers callbacks linked to given event in this handler only."""
+        dispatch = self.__dispatch.get(event_name)
+        if dispatch is None:
+            dispatch = self.dispatch_table(event_name)
+        if not dispatch:
+            return True
+        return await self.__run_dispatch(dispatch, args, kwargs)
+
+    async def __run_dispatch(self, dispatch: tuple, args: tuple, kwargs: dict) -> bool:
         all_ok = True
-        for callback in self.__events.get(event_name, []):
+        for callback, is_coroutine in dispatch:
             try:
-                if inspect.iscoroutinefunction(callback):
+                if is_coroutine:
                     await callback(*args, **kwargs)
                 else:
-                    callable(callback(*args, **kwargs))
+                    callback(*args, **kwargs)
             except Exception as e:
                 if not self.tolerate_exceptions:
                     raise e
@@ -191,3 +502,90 @@ class EventHandler:
                     continue
 
         return all_ok
+
+    async def fire_concurrent(self, event_name: str, *args,
+                              callback_timeout: float | None = None,
+                              event_timeout: float | None = None,
+                              executor: Executor | None = None,
+                              **kwargs) -> FireResult:
+        """Triggers all callbacks linked to given event concurrently.
+
+        Coroutine callbacks are scheduled together in a TaskGroup, sync callbacks are pushed
+        to an executor so they don't block the loop. Event latency is the slowest callback
+        instead of the sum of all of them.
+
+        Args:
+            event_name (str): The event to fire.
+            callback_timeout (float): Max seconds for every single callback, None to disable.
+            event_timeout (float): Max seconds for the whole event, None to disable.
+            executor (Executor): Executor for sync callbacks, None uses the loop default one.
+
+        Returns:
+            FireResult with an outcome per callback. With tolerate_callbacks_exceptions=False the
+            first callback exception (or TimeoutError) is raised and pending callbacks are cancelled.
+
+        Note:
+            Sync callbacks that exceed the timeout keep running in their worker thread,
+            only waiting for them is cancelled.
+        """
+        started = time.perf_counter()
+        try:
+            return await self.__fire_concurrent(event_name, args, kwargs, callback_timeout, event_timeout, executor)
+        finally:
+            if self.__remote:
+                self.transport.publish(event_name, args, kwargs)
+            if self.fire_latency is not None:
+                self.fire_latency.observe(time.perf_counter() - started)
+
+    async def __fire_concurrent(self, event_name: str, args: tuple, kwargs: dict, callback_timeout: float | None,
+                                event_timeout: float | None, executor: Executor | None) -> FireResult:
+        started = time.perf_counter()
+        dispatch = self.dispatch_table(event_name)
+        result = FireResult(event_name=event_name)
+        if not dispatch:
+            return result
+        result.outcomes = [CallbackOutcome(callback=callback) for callback, _ in dispatch]
+
+        loop = asyncio.get_running_loop()
+
+        async def run_callback(outcome: CallbackOutcome, is_coroutine: bool):
+            callback = outcome.callback
+            callback_started = time.perf_counter()
+            try:
+                if is_coroutine:
+                    awaitable = callback(*args, **kwargs)
+                else:
+                    awaitable = loop.run_in_executor(executor, functools.partial(callback, *args, **kwargs))
+                outcome.result = await asyncio.wait_for(awaitable, timeout=callback_timeout)
+                outcome.ok = True
+            except Exception as e:
+                outcome.exception = e
+                outcome.timed_out = isinstance(e, TimeoutError)
+                if not self.tolerate_exceptions:
+                    raise
+                if self.verbose:
+                    logger.info(f'WARNING: {str(callback.__name__)} produces an exception error.')
+                    logger.info('Arguments')
+                    logger.info(e)
+            finally:
+                outcome.elapsed = time.perf_counter() - callback_started
+
+        try:
+            async with asyncio.timeout(event_timeout):
+                async with asyncio.TaskGroup() as task_group:
+                    for outcome, (_, is_coroutine) in zip(result.outcomes, dispatch):
+                        task_group.create_task(run_callback(outcome, is_coroutine))
+        except TimeoutError:
+            result.timed_out = True
+            for outcome in result.outcomes:
+                if not outcome.ok and outcome.exception is None:
+                    outcome.timed_out = True
+                    outcome.exception = TimeoutError(f'Event {event_name} timed out')
+            if not self.tolerate_exceptions:
+                raise
+        except BaseExceptionGroup as group:
+            raise group.exceptions[0]
+        finally:
+            result.elapsed = time.perf_counter() - started
+
+        return result
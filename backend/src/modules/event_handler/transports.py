@@ -0,0 +1,298 @@
+import asyncio
+import logging
+import marshal
+import os
+import socket
+import stat
+import struct
+import time
+from abc import ABC, abstractmethod
+from itertools import count
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+OnMessage = Callable[[str, tuple, dict], Awaitable[None]]
+
+
+class EventTransport(ABC):
+    """Delivers fired events to EventHandler instances living in other workers.
+
+    The local handler always dispatches its own callbacks, a transport only carries
+    events to peers, and calls ``on_message`` for events received from them.
+    """
+
+    def __init__(self):
+        self._on_message: OnMessage | None = None
+        # strong references to delivery tasks, the loop keeps only weak ones
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def started(self) -> bool:
+        return self._on_message is not None
+
+    async def start(self, on_message: OnMessage) -> None:
+        """Start receiving events from peers.
+
+        Args:
+            on_message (callable): Coroutine called with (event_name, args, kwargs) for every remote event.
+        """
+        self._on_message = on_message
+
+    @abstractmethod
+    def publish(self, event_name: str, args: tuple, kwargs: dict) -> None:
+        """Queue an event for delivery to peers, must not block the loop."""
+
+    async def flush(self) -> None:
+        """Send queued events right now."""
+
+    async def close(self) -> None:
+        """Flush queued events, stop receiving and wait for in-flight deliveries."""
+        await self.flush()
+        self._on_message = None
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _spawn(self, coroutine) -> None:
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+class InMemoryTransport(EventTransport):
+    """In-process transport, default one.
+
+    Transports created with the same ``hub`` list deliver events to each other,
+    a transport without peers does nothing.
+    """
+
+    def __init__(self, hub: list | None = None):
+        super().__init__()
+        self.hub = hub if hub is not None else []
+
+    async def start(self, on_message: OnMessage) -> None:
+        await super().start(on_message)
+        if self not in self.hub:
+            self.hub.append(self)
+
+    def publish(self, event_name: str, args: tuple, kwargs: dict) -> None:
+        for peer in self.hub:
+            if peer is not self and peer._on_message is not None:
+                self._spawn(peer._on_message(event_name, args, kwargs))
+
+    async def close(self) -> None:
+        if self in self.hub:
+            self.hub.remove(self)
+        await super().close()
+
+
+class UnixSocketTransport(EventTransport):
+    """Cross-process transport over Unix datagram sockets, for workers on one host.
+
+    Every worker binds ``<socket_dir>/<pid>-<n>.sock`` and sends to all other sockets in the
+    directory. Events fired during one loop iteration are packed into as few datagrams as
+    possible. Payloads are serialized with ``marshal``: only builtin types (str, int, float,
+    bytes, bool, None, list, tuple, dict, set) are supported. Delivery is at most once,
+    datagrams for a peer with a full receive buffer are dropped and counted. A socket file
+    nobody listens on (left by a crashed worker) is unlinked on the first refused send.
+    Any process able to write to the directory can inject events, so ``socket_dir`` must be
+    owned by the current user and closed to everyone else (mode 0o700).
+    """
+
+    FRAME_HEADER = struct.Struct('>I')
+    MARSHAL_VERSION = 4
+    _counter = count()
+
+    def __init__(self, socket_dir: str, max_datagram_size: int = 64 * 1024, peers_ttl: float = 1.0):
+        """UnixSocketTransport initialization.
+
+        Args:
+            socket_dir (str): Directory shared by all workers.
+            max_datagram_size (int): Max bytes in one datagram, several events are packed per datagram.
+            peers_ttl (float): Seconds between rescans of the socket directory.
+        """
+        super().__init__()
+        self.socket_dir = socket_dir
+        self.max_datagram_size = max_datagram_size
+        self.peers_ttl = peers_ttl
+        self.path = os.path.join(socket_dir, f'{os.getpid()}-{next(self._counter)}.sock')
+
+        self._socket: socket.socket | None = None
+        self._pending: list[bytes] = []
+        self._flush_scheduled = False
+        self._peers: list[str] = []
+        self._peers_scanned_at = 0.0
+        # stale sockets that could not be unlinked, skipped on rescans
+        self._ignored_peers: set[str] = set()
+
+        self.sent_events = 0
+        self.sent_datagrams = 0
+        self.received_events = 0
+        self.dropped_datagrams = 0
+        # events that can't be encoded or don't fit in one datagram, never sent
+        self.dropped_events = 0
+        self.stale_peers = 0
+        self.decode_errors = 0
+
+    @classmethod
+    def encode(cls, event_name: str, args: tuple, kwargs: dict) -> bytes:
+        body = marshal.dumps((event_name, args, kwargs), cls.MARSHAL_VERSION)
+        return cls.FRAME_HEADER.pack(len(body)) + body
+
+    @classmethod
+    def decode(cls, datagram: bytes) -> list[tuple[str, tuple, dict]]:
+        messages = []
+        offset = 0
+        header_size = cls.FRAME_HEADER.size
+        while offset < len(datagram):
+            (size,) = cls.FRAME_HEADER.unpack_from(datagram, offset)
+            offset += header_size
+            messages.append(marshal.loads(datagram[offset:offset + size]))
+            offset += size
+        return messages
+
+    def _check_socket_dir(self) -> None:
+        info = os.lstat(self.socket_dir)
+        if not stat.S_ISDIR(info.st_mode):
+            raise PermissionError(f'Event socket dir {self.socket_dir} is not a directory')
+        if info.st_uid != os.getuid() or stat.S_IMODE(info.st_mode) != 0o700:
+            raise PermissionError(
+                f'Event socket dir {self.socket_dir} must be owned by uid {os.getuid()} with mode 0o700, '
+                f'got uid {info.st_uid} and mode {oct(stat.S_IMODE(info.st_mode))}'
+            )
+
+    async def start(self, on_message: OnMessage) -> None:
+        os.makedirs(self.socket_dir, mode=0o700, exist_ok=True)
+        # an existing directory keeps its owner and mode, makedirs doesn't touch them
+        self._check_socket_dir()
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.setblocking(False)
+        sock.bind(self.path)
+        self._socket = sock
+        await super().start(on_message)
+        asyncio.get_running_loop().add_reader(sock.fileno(), self._on_readable)
+
+    def publish(self, event_name: str, args: tuple, kwargs: dict) -> None:
+        if self._socket is None:
+            return
+
+        try:
+            frame = self.encode(event_name, args, kwargs)
+        except ValueError as e:
+            self.dropped_events += 1
+            logger.warning(f'Event {event_name} is not sent to peers, payload is not serializable: {e}')
+            return
+        if len(frame) > self.max_datagram_size:
+            self.dropped_events += 1
+            logger.warning(f'Event {event_name} is not sent to peers, it is too big for transport: {len(frame)} bytes')
+            return
+
+        self._pending.append(frame)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush_pending)
+
+    async def flush(self) -> None:
+        self._flush_pending()
+
+    async def close(self) -> None:
+        await super().close()
+        if self._socket is not None:
+            asyncio.get_running_loop().remove_reader(self._socket.fileno())
+            self._socket.close()
+            self._socket = None
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def peers(self) -> list[str]:
+        now = time.monotonic()
+        if now - self._peers_scanned_at >= self.peers_ttl:
+            self._peers = [
+                entry.path for entry in os.scandir(self.socket_dir)
+                if entry.name.endswith('.sock') and entry.path != self.path
+                and entry.path not in self._ignored_peers
+            ]
+            self._peers_scanned_at = now
+        return self._peers
+
+    def _flush_pending(self) -> None:
+        self._flush_scheduled = False
+        if not self._pending or self._socket is None:
+            self._pending = []
+            return
+
+        frames, self._pending = self._pending, []
+        self.sent_events += len(frames)
+        peers = self.peers()
+        if not peers:
+            return
+
+        stale = set()
+        for datagram in self._pack(frames):
+            for peer in peers:
+                if peer in stale:
+                    continue
+                try:
+                    self._socket.sendto(datagram, peer)
+                    self.sent_datagrams += 1
+                except BlockingIOError:
+                    self.dropped_datagrams += 1
+                except (ConnectionRefusedError, FileNotFoundError):
+                    # nobody is bound to the socket: the worker is gone
+                    stale.add(peer)
+        if stale:
+            self._remove_stale_peers(stale)
+
+    def _remove_stale_peers(self, paths: set[str]) -> None:
+        self._peers = [peer for peer in self._peers if peer not in paths]
+        for path in paths:
+            self.stale_peers += 1
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f'Cannot remove stale event socket {path}: {e!r}')
+                self._ignored_peers.add(path)
+
+    def _pack(self, frames: list[bytes]) -> list[bytes]:
+        datagrams = []
+        current = []
+        current_size = 0
+        for frame in frames:
+            if current and current_size + len(frame) > self.max_datagram_size:
+                datagrams.append(b''.join(current))
+                current, current_size = [], 0
+            current.append(frame)
+            current_size += len(frame)
+        if current:
+            datagrams.append(b''.join(current))
+        return datagrams
+
+    def _on_readable(self) -> None:
+        while self._socket is not None:
+            try:
+                datagram = self._socket.recv(self.max_datagram_size)
+            except BlockingIOError:
+                return
+            try:
+                messages = self.decode(datagram)
+            except (ValueError, EOFError, TypeError, struct.error):
+                self.decode_errors += 1
+                continue
+            for event_name, args, kwargs in messages:
+                self.received_events += 1
+                self._spawn(self._on_message(event_name, tuple(args), kwargs))
+
+
+def create_event_transport(kind: str, socket_dir: str | None = None) -> EventTransport:
+    """Build a transport by name from config: ``memory`` or ``unix``."""
+    if kind == 'memory':
+        return InMemoryTransport()
+    if kind == 'unix':
+        if not socket_dir:
+            raise ValueError('socket_dir is required for unix event transport')
+        return UnixSocketTransport(socket_dir=socket_dir)
+    raise ValueError(f'Unknown event transport: {kind}')
@@ -0,0 +1,199 @@
+import math
+from bisect import bisect_left
+from typing import Callable, Iterable
+
+# (имя метрики, тип, описание, [(метки, значение)])
+MetricFamily = tuple[str, str, str, list[tuple[dict[str, str], float]]]
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + '}'
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if isinstance(value, bool):
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class CounterValue:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+
+class HistogramValue:
+    __slots__ = ('upper_bounds', 'counts', 'sum')
+
+    def __init__(self, upper_bounds: tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        # counts[i] - наблюдения в (upper_bounds[i - 1], upper_bounds[i]], последний - выше всех границ
+        self.counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.upper_bounds, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+
+class Metric:
+    """
+    Метрика с набором меток. Значение для каждой комбинации меток создаётся при первом labels(...)
+    и дальше берётся из словаря. Без блокировок: все записи идут из потока event loop,
+    накопительные суммы для гистограмм считаются только при выдаче /metrics.
+    """
+
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.children: dict[tuple, CounterValue | HistogramValue] = {}
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values) -> CounterValue | HistogramValue:
+        child = self.children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f'{self.name}: ожидались метки {self.labelnames}, получено {values}')
+            child = self.children[values] = self._new_child()
+        return child
+
+    def collect(self) -> MetricFamily:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def _new_child(self) -> CounterValue:
+        return CounterValue()
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+    def collect(self) -> MetricFamily:
+        samples = [(dict(zip(self.labelnames, values)), child.value) for values, child in self.children.items()]
+        return self.name, self.kind, self.documentation, samples
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.upper_bounds = tuple(sorted(buckets))
+
+    def _new_child(self) -> HistogramValue:
+        return HistogramValue(self.upper_bounds)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def collect(self) -> MetricFamily:
+        samples = []
+        for values, child in self.children.items():
+            labels = dict(zip(self.labelnames, values))
+            cumulative = 0
+            for upper_bound, count in zip((*self.upper_bounds, math.inf), child.counts):
+                cumulative += count
+                samples.append(({**labels, 'le': _format_value(float(upper_bound))}, cumulative))
+            samples.append(({**labels, '__suffix__': '_sum'}, child.sum))
+            samples.append(({**labels, '__suffix__': '_count'}, cumulative))
+        return self.name, self.kind, self.documentation, samples
+
+
+class MetricsRegistry:
+    """
+    Метрики процесса в текстовом формате Prometheus. Повторная регистрация имени возвращает
+    уже созданную метрику: модули, импортированные дважды под разными путями, пишут в одну.
+    Коллекторы вызываются только при выдаче и превращают готовые stats() в gauge.
+    """
+
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+        self.collectors: list[Callable[[], Iterable[MetricFamily]]] = []
+
+    def _register(self, metric_class: type[Metric], name: str, *args, **kwargs) -> Metric:
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = metric_class(name, *args, **kwargs)
+        elif not isinstance(metric, metric_class):
+            raise ValueError(f'Метрика {name} уже зарегистрирована как {metric.kind}')
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def add_collector(self, collector: Callable[[], Iterable[MetricFamily]]) -> None:
+        if collector not in self.collectors:
+            self.collectors.append(collector)
+
+    def collect(self) -> Iterable[MetricFamily]:
+        for metric in self.metrics.values():
+            yield metric.collect()
+        for collector in self.collectors:
+            yield from collector()
+
+    def render(self) -> str:
+        lines = []
+        for name, kind, documentation, samples in self.collect():
+            lines.append(f'# HELP {name} {documentation}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, value in samples:
+                suffix = labels.pop('__suffix__', '_bucket' if 'le' in labels else '')
+                lines.append(f'{name}{suffix}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+def stats_collector(prefix: str, documentation: str,
+                    sources: Callable[[], Iterable[dict]], label: str = 'name') -> Callable[[], list[MetricFamily]]:
+    """
+    Коллектор для объектов со stats(): каждое числовое поле словаря - gauge <prefix>_<поле>,
+    строковое поле label - метка. sources возвращает словари stats() на момент выдачи.
+    """
+    def collect() -> list[MetricFamily]:
+        families: dict[str, MetricFamily] = {}
+        for stats in sources():
+            labels = {label: str(stats[label])} if label in stats else {}
+            for key, value in stats.items():
+                if isinstance(value, (int, float)):
+                    name = f'{prefix}_{key}'
+                    family = families.get(name)
+                    if family is None:
+                        family = families[name] = (name, 'gauge', f'{documentation}: {key}', [])
+                    family[3].append((dict(labels), value))
+        return list(families.values())
+
+    return collect
+
+
+METRICS = MetricsRegistry()
@@ -0,0 +1,185 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import islice
+from typing import Callable
+
+from backend.logger import GLOG
+from backend.src.modules.session_store.resp import RespClient
+from backend.src.modules.shared.exceptions import RateLimitExceeded, SessionStoreError
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitRule:
+    """limit запросов за period секунд на один ключ. limit 0 - правило выключено."""
+
+    name: str
+    limit: int
+    period: float
+
+    @property
+    def rate(self) -> float:
+        return self.limit / self.period
+
+    @classmethod
+    def parse(cls, name: str, value: str) -> 'RateLimitRule':
+        """'10/60' - 10 запросов за 60 секунд, '0' или пустая строка - без ограничения."""
+        limit, _, period = value.partition('/')
+        return cls(name=name, limit=int(limit or 0), period=float(period or 1))
+
+
+class RateLimitBackend(ABC):
+
+    @abstractmethod
+    async def hit(self, key: str, rule: RateLimitRule) -> float:
+        """Учесть запрос. 0 - пропустить, иначе через сколько секунд можно повторить."""
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    Token bucket на ключ в памяти процесса: ёмкость limit, пополнение limit / period в секунду.
+    Проверка - O(1): словарь упорядочен по последнему обращению, при переполнении max_keys
+    вытесняется самый давний ключ. Раз в sweep_every проверок среди sweep_every самых давних
+    ключей удаляются те, чьи корзины уже снова полны - они ничем не отличаются от отсутствующих.
+    Лимиты у каждого воркера свои.
+    """
+
+    def __init__(self, max_keys: int = 100_000, sweep_every: int = 1024,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self.sweep_every = sweep_every
+        self.clock = clock
+        # key -> [токены, время обновления, время, когда корзина снова полна]
+        self.buckets: OrderedDict[str, list[float]] = OrderedDict()
+        self.checks = 0
+        self.evicted = 0
+
+    async def hit(self, key: str, rule: RateLimitRule) -> float:
+        return self.hit_now(key, rule)
+
+    def hit_now(self, key: str, rule: RateLimitRule) -> float:
+        now = self.clock()
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            tokens = float(rule.limit)
+        else:
+            tokens = min(rule.limit, bucket[0] + (now - bucket[1]) * rule.rate)
+            self.buckets.move_to_end(key)
+
+        retry_after = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / rule.rate
+        self.buckets[key] = [tokens, now, now + (rule.limit - tokens) / rule.rate]
+
+        self.checks += 1
+        if len(self.buckets) > self.max_keys:
+            self.buckets.popitem(last=False)
+            self.evicted += 1
+        if self.checks % self.sweep_every == 0:
+            self.sweep(now)
+        return retry_after
+
+    def sweep(self, now: float | None = None, limit: int | None = None) -> int:
+        """
+        Удалить полные корзины среди limit (по умолчанию sweep_every) самых давних ключей.
+        Непополненные пропускаются, а не останавливают обход: корзина правила с долгим периодом
+        в начале словаря не мешает чистить короткие. Возвращает число удалённых ключей.
+        """
+        now = self.clock() if now is None else now
+        limit = self.sweep_every if limit is None else limit
+        full = [key for key, bucket in islice(self.buckets.items(), limit) if bucket[2] <= now]
+        for key in full:
+            del self.buckets[key]
+        self.evicted += len(full)
+        return len(full)
+
+
+class RespRateLimitBackend(RateLimitBackend):
+    """
+    Общие для всех воркеров лимиты в Redis-совместимом сервере: счётчик в фиксированном окне
+    period секунд, один пайплайн SET NX EX + INCR + TTL на проверку.
+    """
+
+    def __init__(self, client: RespClient, prefix: str = 'ratelimit:'):
+        self.client = client
+        self.prefix = prefix
+
+    async def hit(self, key: str, rule: RateLimitRule) -> float:
+        key = self.prefix + key
+        period = max(1, round(rule.period))
+        _, count, ttl = await self.client.pipeline([
+            ('SET', key, 0, 'EX', period, 'NX'),
+            ('INCR', key),
+            ('TTL', key),
+        ])
+        if ttl < 0:
+            # ключ истёк между SET и INCR и создан заново без TTL
+            await self.client.execute('EXPIRE', key, period)
+            ttl = period
+        if count <= rule.limit:
+            return 0.0
+        return float(max(ttl, 1))
+
+    async def close(self) -> None:
+        await self.client.close()
+
+
+class RateLimiter:
+    """
+    Проверка именованных правил. Ключ правила - строка, которую выбирает вызывающий (IP, логин, user_id).
+    Недоступный общий backend не блокирует вход: запрос пропускается, ошибка считается в backend_errors.
+    """
+
+    def __init__(self, rules: list[RateLimitRule], backend: RateLimitBackend):
+        self.rules = {rule.name: rule for rule in rules}
+        self.backend = backend
+        self.counters = {rule.name: {'allowed': 0, 'rejected': 0} for rule in rules}
+        self.backend_errors = 0
+
+    async def check(self, rule_name: str, key: str | int) -> None:
+        """RateLimitExceeded, если лимит rule_name для key исчерпан."""
+        rule = self.rules[rule_name]
+        if rule.limit <= 0:
+            return
+        try:
+            retry_after = await self.backend.hit(f'{rule_name}:{key}', rule)
+        except SessionStoreError as e:
+            self.backend_errors += 1
+            GLOG.error(f'Хранилище лимитов недоступно, {rule_name} не проверяется: {e}')
+            return
+        counters = self.counters[rule_name]
+        if retry_after:
+            counters['rejected'] += 1
+            raise RateLimitExceeded(rule_name, retry_after)
+        counters['allowed'] += 1
+
+    def stats(self) -> dict:
+        stats = {'rules': {name: dict(counters) for name, counters in self.counters.items()},
+                 'backend_errors': self.backend_errors}
+        if isinstance(self.backend, MemoryRateLimitBackend):
+            stats['keys'] = len(self.backend.buckets)
+            stats['evicted'] = self.backend.evicted
+        return stats
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+
+def create_rate_limiter(rules: dict[str, str], kind: str = 'memory', url: str | None = None,
+                        max_keys: int = 100_000) -> RateLimiter:
+    """rules - имя правила -> 'limit/period', kind - memory или resp (url сервера)."""
+    if kind == 'memory':
+        backend = MemoryRateLimitBackend(max_keys=max_keys)
+    elif kind == 'resp':
+        if not url:
+            raise ValueError('Для общего хранилища лимитов нужен url')
+        backend = RespRateLimitBackend(RespClient.from_url(url))
+    else:
+        raise ValueError(f'Неизвестное хранилище лимитов: {kind}')
+    return RateLimiter([RateLimitRule.parse(name, value) for name, value in rules.items()], backend)
@@ -0,0 +1,149 @@
+import asyncio
+from collections import deque
+from typing import Any, Sequence
+from urllib.parse import urlparse
+
+from backend.src.modules.shared.exceptions import RespConnectionError, RespError
+
+
+class RespClient:
+    """
+    Минимальный асинхронный клиент RESP2 (Redis/Valkey/KeyDB) на одном соединении.
+    Запросы конкурентных корутин пайплайнятся: команды пишутся в сокет сразу, ответы
+    разбираются фоновой задачей и раздаются ожидающим по порядку отправки.
+    """
+
+    def __init__(self, host: str = 'localhost', port: int = 6379, db: int = 0,
+                 password: str | None = None, timeout: float = 1.0):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+
+        self._writer: asyncio.StreamWriter | None = None
+        self._read_task: asyncio.Task | None = None
+        self._pending: deque[asyncio.Future] = deque()
+        self._connect_lock = asyncio.Lock()
+
+        self.commands = 0
+        self.connects = 0
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> 'RespClient':
+        """redis://[:password@]host[:port][/db]"""
+        parsed = urlparse(url)
+        db = parsed.path.strip('/')
+        return cls(host=parsed.hostname or 'localhost', port=parsed.port or 6379,
+                   db=int(db) if db else 0, password=parsed.password, **kwargs)
+
+    @staticmethod
+    def encode(*args: Any) -> bytes:
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode('utf-8')
+            parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        return b''.join(parts)
+
+    @classmethod
+    async def read_reply(cls, reader: asyncio.StreamReader) -> Any:
+        line = await reader.readline()
+        if not line.endswith(b'\r\n'):
+            raise ConnectionError('connection closed')
+        prefix, payload = line[:1], line[1:-2]
+        if prefix == b'+':
+            return payload.decode('utf-8')
+        if prefix == b'-':
+            # ошибка команды не рвёт соединение, отдаём её ожидающему как значение
+            return RespError(payload.decode('utf-8'))
+        if prefix == b':':
+            return int(payload)
+        if prefix == b'$':
+            size = int(payload)
+            if size < 0:
+                return None
+            return (await reader.readexactly(size + 2))[:-2]
+        if prefix == b'*':
+            size = int(payload)
+            if size < 0:
+                return None
+            return [await cls.read_reply(reader) for _ in range(size)]
+        raise ValueError(f'Неизвестный тип ответа RESP: {prefix!r}')
+
+    async def execute(self, *args: Any) -> Any:
+        return (await self.pipeline([args]))[0]
+
+    async def pipeline(self, commands: Sequence[Sequence[Any]]) -> list[Any]:
+        """Все команды уходят одной записью в сокет, ответы возвращаются списком в том же порядке."""
+        await self._ensure_connected()
+        return await self._send(commands)
+
+    async def close(self) -> None:
+        self._reset(RespConnectionError('Клиент закрыт'))
+
+    async def _ensure_connected(self) -> None:
+        if self._writer is not None:
+            return
+        async with self._connect_lock:
+            if self._writer is not None:
+                return
+            try:
+                reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
+            except (OSError, asyncio.TimeoutError) as e:
+                raise RespConnectionError(f'Нет соединения с {self.host}:{self.port}: {e}')
+            self.connects += 1
+            self._writer = writer
+            self._read_task = asyncio.get_running_loop().create_task(self._read_loop(reader))
+
+            setup = []
+            if self.password:
+                setup.append(('AUTH', self.password))
+            if self.db:
+                setup.append(('SELECT', self.db))
+            if setup:
+                await self._send(setup)
+
+    async def _send(self, commands: Sequence[Sequence[Any]]) -> list[Any]:
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in commands]
+        self._pending.extend(futures)
+        self.commands += len(commands)
+        try:
+            self._writer.write(b''.join(self.encode(*command) for command in commands))
+            await self._writer.drain()
+            replies = await asyncio.wait_for(asyncio.gather(*futures), self.timeout)
+        except asyncio.TimeoutError:
+            # ответы на соединении больше не совпадут с очередью ожидающих
+            self._reset(RespConnectionError('Таймаут ответа'))
+            raise RespConnectionError(f'Таймаут ответа от {self.host}:{self.port}')
+        except (OSError, AttributeError) as e:
+            self._reset(RespConnectionError(str(e)))
+            raise RespConnectionError(f'Соединение с {self.host}:{self.port} потеряно: {e}')
+
+        for reply in replies:
+            if isinstance(reply, RespError):
+                raise reply
+        return replies
+
+    async def _read_loop(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while True:
+                reply = await self.read_reply(reader)
+                future = self._pending.popleft()
+                if not future.done():
+                    future.set_result(reply)
+        except (ConnectionError, asyncio.IncompleteReadError, IndexError, ValueError) as e:
+            self._reset(RespConnectionError(str(e) or 'Соединение закрыто'))
+
+    def _reset(self, error: Exception) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._read_task is not None and self._read_task is not asyncio.current_task():
+            self._read_task.cancel()
+        self._read_task = None
+        while self._pending:
+            future = self._pending.popleft()
+            if not future.done():
+                future.set_exception(error)
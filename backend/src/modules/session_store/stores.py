@@ -0,0 +1,207 @@
+import time
+from abc import ABC, abstractmethod
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from backend.logger import GLOG
+from backend.src.modules.session_store.resp import RespClient
+from backend.src.modules.shared.cache import TTLCache
+from backend.src.modules.shared.unit_of_work import UnitOfWork
+
+
+class SessionStore(ABC):
+    """
+    Хранилище refresh сессий. Сессия - хеш refresh токена -> user_id, у пользователя может быть
+    несколько сессий (по одной на устройство). Токен одноразовый: rotate атомарно забирает старый
+    хеш, поэтому из двух конкурентных ротаций одного токена успешна только одна.
+    """
+
+    @abstractmethod
+    async def add(self, token_hash: str, user_id: int, ttl: int) -> None:
+        ...
+
+    @abstractmethod
+    async def rotate(self, old_hash: str, new_hash: str, user_id: int, ttl: int) -> bool:
+        """Заменить сессию old_hash на new_hash. False - старого токена нет, он уже использован или чужой."""
+
+    @abstractmethod
+    async def revoke(self, token_hash: str, user_id: int) -> None:
+        ...
+
+    @abstractmethod
+    async def revoke_user(self, user_id: int) -> None:
+        """Выход со всех устройств."""
+
+    @abstractmethod
+    async def active_sessions(self, user_id: int) -> int:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+
+class InMemorySessionStore(SessionStore):
+    """
+    Сессии в памяти процесса. Подходит для одного воркера и тестов:
+    другие воркеры и перезапуск сессий не видят. При переполнении вытесняются самые старые.
+    """
+
+    def __init__(self, maxsize: int = 100_000):
+        self.tokens = TTLCache(maxsize=maxsize, ttl=float('inf'))
+        self.users: dict[int, set[str]] = {}
+
+    def _link(self, token_hash: str, user_id: int, ttl: int) -> None:
+        self.tokens.set(token_hash, user_id, expires_at=time.time() + ttl)
+        hashes = self.users.setdefault(user_id, set())
+        # заодно чистим хеши истёкших и вытесненных сессий
+        hashes.difference_update([known for known in hashes if known not in self.tokens])
+        hashes.add(token_hash)
+
+    def _unlink(self, token_hash: str, user_id: int) -> None:
+        self.tokens.pop(token_hash)
+        hashes = self.users.get(user_id)
+        if hashes is not None:
+            hashes.discard(token_hash)
+            if not hashes:
+                del self.users[user_id]
+
+    async def add(self, token_hash: str, user_id: int, ttl: int) -> None:
+        self._link(token_hash, user_id, ttl)
+
+    async def rotate(self, old_hash: str, new_hash: str, user_id: int, ttl: int) -> bool:
+        # между проверкой и удалением нет await - для event loop это атомарно
+        owner = self.tokens.get(old_hash)
+        self.tokens.pop(old_hash)
+        if owner != user_id:
+            return False
+        self._unlink(old_hash, user_id)
+        self._link(new_hash, user_id, ttl)
+        return True
+
+    async def revoke(self, token_hash: str, user_id: int) -> None:
+        if self.tokens.get(token_hash) == user_id:
+            self._unlink(token_hash, user_id)
+
+    async def revoke_user(self, user_id: int) -> None:
+        for token_hash in self.users.pop(user_id, ()):
+            self.tokens.pop(token_hash)
+
+    async def active_sessions(self, user_id: int) -> int:
+        return sum(token_hash in self.tokens for token_hash in self.users.get(user_id, ()))
+
+
+class RespSessionStore(SessionStore):
+    """
+    Сессии в Redis-совместимом сервере, общие для всех воркеров.
+    <prefix>rt:<hash> -> user_id с TTL токена, <prefix>user:<id> - множество хешей пользователя.
+    Ротация: GETDEL старого ключа (Redis >= 6.2) решает, кто выиграл, затем один пайплайн на запись нового.
+    """
+
+    def __init__(self, client: RespClient, prefix: str = 'session:'):
+        self.client = client
+        self.prefix = prefix
+
+    def _token_key(self, token_hash: str) -> str:
+        return f'{self.prefix}rt:{token_hash}'
+
+    def _user_key(self, user_id: int) -> str:
+        return f'{self.prefix}user:{user_id}'
+
+    def _link_commands(self, token_hash: str, user_id: int, ttl: int) -> list[tuple]:
+        user_key = self._user_key(user_id)
+        return [
+            ('SET', self._token_key(token_hash), user_id, 'EX', ttl),
+            ('SADD', user_key, token_hash),
+            ('EXPIRE', user_key, ttl),
+        ]
+
+    async def add(self, token_hash: str, user_id: int, ttl: int) -> None:
+        await self.client.pipeline(self._link_commands(token_hash, user_id, ttl))
+
+    async def rotate(self, old_hash: str, new_hash: str, user_id: int, ttl: int) -> bool:
+        owner = await self.client.execute('GETDEL', self._token_key(old_hash))
+        if owner is None or int(owner) != user_id:
+            return False
+        await self.client.pipeline([
+            ('SREM', self._user_key(user_id), old_hash),
+            *self._link_commands(new_hash, user_id, ttl),
+        ])
+        return True
+
+    async def revoke(self, token_hash: str, user_id: int) -> None:
+        await self.client.pipeline([
+            ('DEL', self._token_key(token_hash)),
+            ('SREM', self._user_key(user_id), token_hash),
+        ])
+
+    async def revoke_user(self, user_id: int) -> None:
+        user_key = self._user_key(user_id)
+        hashes = await self.client.execute('SMEMBERS', user_key)
+        await self.client.execute('DEL', user_key, *(self._token_key(token_hash.decode()) for token_hash in hashes))
+
+    async def active_sessions(self, user_id: int) -> int:
+        hashes = await self.client.execute('SMEMBERS', self._user_key(user_id))
+        if not hashes:
+            return 0
+        owners = await self.client.execute('MGET', *(self._token_key(token_hash.decode()) for token_hash in hashes))
+        return sum(owner is not None for owner in owners)
+
+    async def close(self) -> None:
+        await self.client.close()
+
+
+class UserTableSessionStore(SessionStore):
+    """
+    Сессия в колонке users.refresh_token_hash - одно устройство на пользователя, новый логин
+    вытесняет предыдущий. Ротация - один UPDATE ... WHERE id = ? AND refresh_token_hash = ?
+    с проверкой числа изменённых строк, без предварительного SELECT. ttl проверяет exp токена.
+    Работает через общий sessionmaker приложения и сбрасывает строки пользователя в общем user_cache.
+    """
+
+    def __init__(self, sessionmaker: async_sessionmaker, user_cache: TTLCache | None = None):
+        self.sessionmaker = sessionmaker
+        self.user_cache = user_cache
+
+    async def add(self, token_hash: str, user_id: int, ttl: int) -> None:
+        async with UnitOfWork(self.sessionmaker, user_cache=self.user_cache) as uow:
+            await uow.user_repository.update_by_id(user_id, {'refresh_token_hash': token_hash}, commit=True)
+
+    async def rotate(self, old_hash: str, new_hash: str, user_id: int, ttl: int) -> bool:
+        async with UnitOfWork(self.sessionmaker, user_cache=self.user_cache) as uow:
+            return await uow.user_repository.swap_refresh_token_hash(user_id, old_hash, new_hash, commit=True)
+
+    async def revoke(self, token_hash: str, user_id: int) -> None:
+        async with UnitOfWork(self.sessionmaker, user_cache=self.user_cache) as uow:
+            await uow.user_repository.swap_refresh_token_hash(user_id, token_hash, None, commit=True)
+
+    async def revoke_user(self, user_id: int) -> None:
+        async with UnitOfWork(self.sessionmaker, user_cache=self.user_cache) as uow:
+            await uow.user_repository.update_by_id(user_id, {'refresh_token_hash': None}, commit=True)
+
+    async def active_sessions(self, user_id: int) -> int:
+        async with UnitOfWork(self.sessionmaker, user_cache=self.user_cache) as uow:
+            user = await uow.user_repository.get_by_id(user_id, select_fields=[uow.user_repository.model.refresh_token_hash])
+            return int(bool(user and user.refresh_token_hash))
+
+
+def create_session_store(kind: str, url: str | None = None, maxsize: int = 100_000, workers: int = 1,
+                         sessionmaker: async_sessionmaker | None = None,
+                         user_cache: TTLCache | None = None) -> SessionStore:
+    """
+    Хранилище по имени из конфига: memory, resp (url сервера) или db (sessionmaker приложения).
+    memory при нескольких воркерах не создаётся: сессия, выданная одним воркером, не видна остальным.
+    """
+    if kind == 'memory':
+        if workers > 1:
+            raise ValueError(f'Хранилище сессий memory не работает с {workers} воркерами, нужен resp')
+        GLOG.warning('Сессии хранятся в памяти процесса: только для одного воркера, перезапуск завершает все сессии')
+        return InMemorySessionStore(maxsize=maxsize)
+    if kind == 'resp':
+        if not url:
+            raise ValueError('Для хранилища сессий resp нужен url')
+        return RespSessionStore(RespClient.from_url(url))
+    if kind == 'db':
+        if sessionmaker is None:
+            raise ValueError('Для хранилища сессий db нужен sessionmaker')
+        return UserTableSessionStore(sessionmaker, user_cache=user_cache)
+    raise ValueError(f'Неизвестное хранилище сессий: {kind}')
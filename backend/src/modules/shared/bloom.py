@@ -0,0 +1,143 @@
+import hashlib
+import math
+import unicodedata
+from typing import Iterable
+
+
+class BloomFilter:
+    """
+    Битовый массив на capacity ключей с долей ложных срабатываний error_rate.
+    Позиции битов - двойное хеширование (h1 + i * h2) по 128-битному blake2b ключа.
+    "Нет" - ключа точно нет, "да" - ключ, возможно, есть.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.size = max(64, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str) -> list[int]:
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        step = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + index * step) % self.size for index in range(self.hashes)]
+
+    def add(self, key: str) -> bool:
+        """True, если ключ новый (был сброшен хотя бы один бит)."""
+        added = False
+        for position in self._positions(key):
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not self.bits[byte] & mask:
+                self.bits[byte] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.bits)
+
+    def false_positive_rate(self) -> float:
+        """Оценка по текущему заполнению: доля установленных битов в степени числа хешей."""
+        filled = int.from_bytes(self.bits, 'little').bit_count() / self.size
+        return filled ** self.hashes
+
+
+class LoginFilter:
+    """
+    Фильтр логинов перед UserRepository. Заполняется из users.login при старте и при регистрации
+    в этом процессе или по событию user.registered от других воркеров.
+    Фильтр процесса может не знать логин, созданный в другом воркере (событие не дошло) или мимо
+    /registration, поэтому "нет" - окончательный ответ только при trust_misses: один воркер или
+    надёжная общая доставка событий. Иначе промах лишь подсказка, а источник истины - БД.
+    Переполненный слой не пересобирается: добавляется новый вдвое больше со вдвое меньшей долей
+    ложных срабатываний, так что общая доля остаётся около 2 * error_rate.
+    Пока фильтр не загружен (loaded = False), might_exist всегда True.
+    """
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.01, trust_misses: bool = False):
+        self.layers = [BloomFilter(capacity, error_rate)]
+        self.trust_misses = trust_misses
+        self.loaded = False
+        self.checks = 0
+        self.misses = 0
+        self.false_positives = 0
+        self.false_negatives = 0
+
+    @staticmethod
+    def normalize(login: str) -> str:
+        # сравнение в MySQL без учёта регистра и диакритики (utf8mb4_*_ci): лишнее совпадение
+        # в фильтре безопасно, а пропущенное - нет, поэтому нормализуем с запасом
+        decomposed = unicodedata.normalize('NFKD', login)
+        return ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold().rstrip()
+
+    def add(self, login: str) -> None:
+        key = self.normalize(login)
+        if any(key in layer for layer in self.layers):
+            return
+        layer = self.layers[-1]
+        if layer.count >= layer.capacity:
+            layer = BloomFilter(layer.capacity * 2, layer.error_rate / 2)
+            self.layers.append(layer)
+        layer.add(key)
+
+    def load(self, logins: Iterable[str]) -> None:
+        for login in logins:
+            self.add(login)
+
+    def might_exist(self, login: str) -> bool:
+        if not self.loaded:
+            return True
+        self.checks += 1
+        key = self.normalize(login)
+        if any(key in layer for layer in self.layers):
+            return True
+        self.misses += 1
+        return False
+
+    def record_false_positive(self) -> None:
+        """Фильтр ответил "возможно", а в БД логина нет."""
+        if self.loaded:
+            self.false_positives += 1
+
+    def record_false_negative(self, login: str) -> None:
+        """Фильтр не знал логин, который есть в БД: запоминаем его."""
+        self.false_negatives += 1
+        self.add(login)
+
+    def __len__(self) -> int:
+        return sum(layer.count for layer in self.layers)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(layer.nbytes for layer in self.layers)
+
+    def false_positive_rate(self) -> float:
+        miss_all = 1.0
+        for layer in self.layers:
+            miss_all *= 1 - layer.false_positive_rate()
+        return 1 - miss_all
+
+    def stats(self) -> dict:
+        positives = self.checks - self.misses
+        return {
+            'loaded': self.loaded,
+            'trust_misses': self.trust_misses,
+            'logins': len(self),
+            'layers': len(self.layers),
+            'bytes': self.nbytes,
+            'estimated_false_positive_rate': self.false_positive_rate(),
+            'checks': self.checks,
+            'misses': self.misses,
+            'false_positives': self.false_positives,
+            'false_negatives': self.false_negatives,
+            'observed_false_positive_rate': self.false_positives / positives if positives else 0.0,
+        }
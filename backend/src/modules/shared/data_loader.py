@@ -0,0 +1,69 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, Iterable
+
+
+class DataLoader:
+    """
+    Батчер запросов в стиле DataLoader в рамках одного запроса/UnitOfWork.
+    Все load(), вызванные за один проход event loop, собираются в один вызов batch_load,
+    одинаковые ключи дедуплицируются. Результаты не кэшируются дольше пачки,
+    поэтому после записи в БД следующий load прочитает свежие данные.
+    Пачки выполняются по очереди - сессия SQLAlchemy не допускает параллельных запросов.
+    """
+
+    def __init__(self, batch_load: Callable[[list], Awaitable[dict]], max_batch_size: int = 1000):
+        self.batch_load = batch_load
+        self.max_batch_size = max_batch_size
+        self._pending: dict[Hashable, asyncio.Future] = {}
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self._lock = asyncio.Lock()
+        self._scheduled = False
+        # сильные ссылки на задачи пачек: loop хранит только слабые
+        self._tasks: set[asyncio.Task] = set()
+
+        self.loads = 0
+        self.batches = 0
+
+    async def load(self, key: Hashable) -> Any:
+        self.loads += 1
+        future = self._pending.get(key) or self._inflight.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._pending[key] = loop.create_future()
+            if len(self._pending) >= self.max_batch_size:
+                self._dispatch()
+            elif not self._scheduled:
+                self._scheduled = True
+                loop.call_soon(self._dispatch)
+        return await future
+
+    async def load_many(self, keys: Iterable[Hashable]) -> list[Any]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def _dispatch(self) -> None:
+        self._scheduled = False
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        self._inflight.update(batch)
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: dict[Hashable, asyncio.Future]) -> None:
+        try:
+            async with self._lock:
+                self.batches += 1
+                results = await self.batch_load(list(batch))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for key, future in batch.items():
+                if not future.done():
+                    future.set_result(results.get(key))
+        finally:
+            for key, future in batch.items():
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
@@ -4,4 +4,29 @@ class RepositoryModelIsNotDefined(Exception):
     pass
 
 class PydanticModelIsNotImplemented(Exception):
-    pass
\ No newline at end of file
+    pass
+
+class HashPoolOverloaded(Exception):
+    pass
+
+class TokenInvalidError(Exception):
+    pass
+
+class TokenExpiredError(TokenInvalidError):
+    pass
+
+class SessionStoreError(Exception):
+    pass
+
+class RespError(SessionStoreError):
+    pass
+
+class RespConnectionError(SessionStoreError):
+    pass
+
+class RateLimitExceeded(Exception):
+
+    def __init__(self, rule: str, retry_after: float):
+        super().__init__(f'Превышен лимит {rule}, повтор через {retry_after:.1f} с')
+        self.rule = rule
+        self.retry_after = retry_after
@@ -1,20 +1,110 @@
+from typing import Any
+
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from backend.db_replicas import ReplicaSet
 from backend.src.infrastructure.repositories.user_repository import UserRepository
+from backend.src.modules.shared.bloom import LoginFilter
+from backend.src.modules.shared.cache import TTLCache
+from backend.src.modules.shared.data_loader import DataLoader
+from backend.src.modules.metrics.registry import METRICS
+
+UOW_DB_SECONDS = METRICS.histogram('uow_db_seconds', 'Время в БД за единицу работы (только открывшие сессию)')
+UOW_STATEMENTS = METRICS.histogram('uow_statements', 'Запросов к БД за единицу работы (только открывшие сессию)',
+                                   buckets=(1, 2, 3, 5, 10, 20, 50, 100))
 
 
 class UnitOfWork:
-    def __init__(self, session: AsyncSession):
-        self.session = session
-        self.user_repository = UserRepository(self.session)
+    """
+    Сессия и репозитории создаются при первом обращении: запрос, который не дошёл до БД,
+    не берёт соединение и не делает rollback/close.
+    """
+
+    def __init__(self, sessionmaker: async_sessionmaker, user_cache: TTLCache | None = None,
+                 replicas: ReplicaSet | None = None, login_filter: LoginFilter | None = None):
+        self.sessionmaker = sessionmaker
+        self.user_cache = user_cache
+        self.login_filter = login_filter
+        self._session: AsyncSession | None = None
+        self._user_repository: UserRepository | None = None
+        self._user_loader: DataLoader | None = None
+        # чтения идут в реплику, пока в этой единице работы не было записи
+        self.replicas = replicas
+        self.replica_session: AsyncSession | None = None
+        self.primary_only = replicas is None
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = self.sessionmaker()
+        return self._session
+
+    @property
+    def user_repository(self) -> UserRepository:
+        if self._user_repository is None:
+            self._user_repository = UserRepository(None, cache=self.user_cache, router=self,
+                                                   login_filter=self.login_filter)
+        return self._user_repository
+
+    @property
+    def user_loader(self) -> DataLoader:
+        # конкурентные загрузки пользователей по id в одном запросе собираются в один SELECT ... IN
+        if self._user_loader is None:
+            self._user_loader = DataLoader(self.user_repository.get_many_by_ids)
+        return self._user_loader
+
+    @property
+    def read_session(self) -> AsyncSession:
+        if self.primary_only:
+            return self.session
+        if self.replica_session is None:
+            self.replica_session = self.replicas.session()
+        return self.replica_session
+
+    def use_primary(self) -> None:
+        """
+        Все следующие чтения - из primary. Вызывается репозиториями при записи,
+        вручную - для чтений, которым нельзя отставание реплики (загрузка фильтра логинов при старте).
+        """
+        self.primary_only = True
+
+    def _sessions(self) -> list[AsyncSession]:
+        return [session for session in (self._session, self.replica_session) if session is not None]
+
+    @property
+    def statements(self) -> int:
+        return sum(getattr(session, 'statements', 0) for session in self._sessions())
+
+    @property
+    def db_seconds(self) -> float:
+        return sum(getattr(session, 'db_seconds', 0.0) for session in self._sessions())
+
+    def stats(self) -> dict[str, Any]:
+        """Счётчики этой единицы работы (обычно - одного запроса) по primary и реплике."""
+        return {
+            'session_opened': self._session is not None,
+            'replica_session_opened': self.replica_session is not None,
+            'statements': self.statements,
+            'db_seconds': self.db_seconds,
+        }
 
     async def __aenter__(self):
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if exc_type:
-            await self.session.rollback()
-        return await self.session.__aexit__(exc_type, exc_val, exc_tb)
-    
+        try:
+            if self._session is not None:
+                if exc_type and self._session.in_transaction():
+                    await self._session.rollback()
+                await self._session.__aexit__(exc_type, exc_val, exc_tb)
+        finally:
+            if self.replica_session is not None:
+                await self.replica_session.close()
+            if self._session is not None or self.replica_session is not None:
+                UOW_DB_SECONDS.observe(self.db_seconds)
+                UOW_STATEMENTS.observe(self.statements)
+
     async def commit(self):
-        await self.session.commit()
\ No newline at end of file
+        if self._session is None or not self._session.in_transaction():
+            return
+        await self._session.commit()
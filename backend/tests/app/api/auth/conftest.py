@@ -1,7 +1,10 @@
+import pytest
 import pytest_asyncio
 
 from src.app.core.services.security import hash_password
+from backend.src.app.core.services.security import SecurityService
 from backend.src.infrastructure.enums.users.enums import UserTypeEnum
+from backend.src.modules.session_store.stores import InMemorySessionStore
 
 
 class PreparedData:
@@ -13,6 +16,14 @@ class PreparedData:
         self.user_updated_by = 'test'
 
 
+@pytest.fixture(autouse=True)
+def session_store(monkeypatch):
+    # тесты не зависят от SESSION_STORE окружения и не требуют RESP сервера
+    store = InMemorySessionStore()
+    monkeypatch.setattr(SecurityService, 'SESSION_STORE', store)
+    return store
+
+
 @pytest_asyncio.fixture(scope='function', loop_scope='function')
 async def prepared_data(test_uow):
 
@@ -3,9 +3,11 @@ from unittest.mock import AsyncMock
 
 import pytest
 
+from backend.src.app.core.services.security import SecurityService
 from backend.src.app.pydantic_models.auth import AuthScheme
 from backend.src.infrastructure.pydantic_models.users import PyUser
 from backend.src.infrastructure.repositories.user_repository import UserRepository
+from backend.src.modules.rate_limit.limiter import MemoryRateLimitBackend, RateLimiter, RateLimitRule
 
 
 @pytest.mark.asyncio
@@ -84,22 +86,25 @@ async def test_refresh_right_path(client, test_uow, prepared_data, monkeypatch):
 
     password = 'password'
     user_in_db = await test_uow.user_repository.get_by_id(prepared_data.user_id)
-    assert user_in_db and not user_in_db.refresh_token_hash
+    assert user_in_db
 
     data = AuthScheme(login=user_in_db.login, password=password)
 
     response = await client.post(f"/auth/login", json=data.model_dump(mode='json'))
     assert response.status_code == HTTPStatus.OK
-    await test_uow.session.rollback()
-    user_in_db = await test_uow.user_repository.get_by_id(prepared_data.user_id)
-    assert user_in_db.refresh_token_hash
+    assert await SecurityService.session_store().active_sessions(prepared_data.user_id) == 1
+    old_refresh_token = response.cookies.get(SecurityService.REFRESH_COOKIE)
+
+    # сессии в хранилище (conftest закрепляет memory), ротация не пишет в таблицу users
     mock_update = AsyncMock(return_value=None)
+    mock_swap = AsyncMock(return_value=True)
     monkeypatch.setattr(UserRepository, "update_by_id", mock_update)
+    monkeypatch.setattr(UserRepository, "swap_refresh_token_hash", mock_swap)
     refresh_response = await client.post(f"/auth/refresh")
     assert refresh_response.status_code == HTTPStatus.OK
-    assert mock_update.call_count == 1
-    kwargs = mock_update.call_args.kwargs
-    assert 'refresh_token_hash' in kwargs['values']
+    assert mock_update.call_count == 0 and mock_swap.call_count == 0
+    assert refresh_response.cookies.get(SecurityService.REFRESH_COOKIE) != old_refresh_token
+    assert await SecurityService.session_store().active_sessions(prepared_data.user_id) == 1
 
 
 @pytest.mark.asyncio
@@ -107,21 +112,39 @@ async def test_logout_right_path(client, test_uow, prepared_data):
 
     password = 'password'
     user_in_db = await test_uow.user_repository.get_by_id(prepared_data.user_id)
-    assert user_in_db and not user_in_db.refresh_token_hash
+    assert user_in_db
 
     data = AuthScheme(login=user_in_db.login, password=password)
 
     response = await client.post(f"/auth/login", json=data.model_dump(mode='json'))
     assert response.status_code == HTTPStatus.OK
-    await test_uow.session.rollback()
-    user_in_db = await test_uow.user_repository.get_by_id(prepared_data.user_id)
-    assert user_in_db.refresh_token_hash
+    assert await SecurityService.session_store().active_sessions(prepared_data.user_id) == 1
 
     refresh_response = await client.post(f"/auth/logout")
     assert refresh_response.status_code == HTTPStatus.OK
-
-    await test_uow.session.rollback()
-    user_in_db = await test_uow.user_repository.get_by_id(prepared_data.user_id)
-    assert not user_in_db.refresh_token_hash
+    assert await SecurityService.session_store().active_sessions(prepared_data.user_id) == 0
 
 #
+@pytest.mark.asyncio
+async def test_login_rate_limited_before_db(client, monkeypatch):
+    """
+    Тест для ограничения частоты логина - превышение лимита отвечает 429 без запроса в БД и bcrypt,
+    варианты регистра логина считаются в одной корзине
+    """
+    limiter = RateLimiter([RateLimitRule('login_ip', 10, 60), RateLimitRule('login', 2, 60)], MemoryRateLimitBackend())
+    monkeypatch.setattr(SecurityService, 'RATE_LIMITER', limiter)
+    mock_get = AsyncMock(return_value=None)
+    monkeypatch.setattr(UserRepository, 'get_by_login', mock_get)
+    mock_verify = AsyncMock(return_value=False)
+    monkeypatch.setattr(SecurityService, 'verify_password_async', mock_verify)
+
+    data = AuthScheme(login='brute_forced_login', password='password')
+    statuses = [(await client.post("/auth/login", json=data.model_dump(mode='json'))).status_code for _ in range(2)]
+    assert statuses == [HTTPStatus.FORBIDDEN, HTTPStatus.FORBIDDEN]
+
+    data = AuthScheme(login='Brute_Forced_Login', password='password')
+    response = await client.post("/auth/login", json=data.model_dump(mode='json'))
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert int(response.headers['Retry-After']) > 0
+    assert mock_get.call_count == 2
+    assert limiter.stats()['rules']['login'] == {'allowed': 2, 'rejected': 1}
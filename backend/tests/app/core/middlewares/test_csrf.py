@@ -0,0 +1,51 @@
+from http import HTTPStatus
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from backend.src.app.core.middlewares.csrf import CSRFMiddleware
+from backend.src.app.core.services.security import SecurityService
+from backend.src.modules.shared.cache import TTLCache
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CSRFMiddleware, security=SecurityService)
+
+    @app.get('/items')
+    async def items():
+        return {'ok': True}
+
+    @app.post('/items')
+    async def create_item():
+        return {'ok': True}
+
+    return app
+
+
+@pytest.mark.asyncio
+async def test_csrf_middleware(monkeypatch):
+    """
+    Тест для CSRFMiddleware - GET без проверки, POST без токена отклоняется, проверенный токен берётся из кэша
+    """
+    monkeypatch.setattr(SecurityService, 'CSRF_TOKEN_CACHE', TTLCache(maxsize=10, ttl=60))
+    token = SecurityService.create_csrf_token()
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=make_app()), base_url='http://test') as client:
+        assert (await client.get('/items')).status_code == HTTPStatus.OK
+
+        response = await client.post('/items')
+        assert response.status_code == HTTPStatus.FORBIDDEN
+        assert response.json() == {'detail': 'CSRF token required'}
+
+        response = await client.post('/items', headers={SecurityService.CSRF_HEADER: 'forged'},
+                                     cookies={SecurityService.CSRF_COOKIE: 'forged'})
+        assert response.json() == {'detail': 'CSRF token invalid'}
+
+        for _ in range(2):
+            response = await client.post('/items', headers={SecurityService.CSRF_HEADER: token},
+                                         cookies={SecurityService.CSRF_COOKIE: token})
+            assert response.status_code == HTTPStatus.OK
+
+    assert SecurityService.CSRF_TOKEN_CACHE.hits == 1
@@ -0,0 +1,36 @@
+from http import HTTPStatus
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+
+from backend.src.app.core.middlewares.metrics import MetricsMiddleware
+from backend.src.modules.metrics.registry import MetricsRegistry
+
+
+@pytest.mark.asyncio
+async def test_metrics_middleware_labels_by_route_template():
+    """
+    Тест для MetricsMiddleware - метка route - шаблон маршрута, статус из ответа, неизвестные пути в unmatched
+    """
+    histogram = MetricsRegistry().histogram('http_request_duration_seconds', 'Время', ('method', 'route', 'status'))
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, histogram=histogram)
+
+    @app.get('/users/{user_id}')
+    async def user(user_id: int):
+        if user_id == 0:
+            raise HTTPException(status_code=HTTPStatus.NOT_FOUND)
+        return {'id': user_id}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test') as client:
+        for user_id in (1, 2, 0):
+            await client.get(f'/users/{user_id}')
+        await client.get('/missing')
+
+    counts = {labels: child.count for labels, child in histogram.children.items()}
+    assert counts == {
+        ('GET', '/users/{user_id}', '200'): 2,
+        ('GET', '/users/{user_id}', '404'): 1,
+        ('GET', 'unmatched', '404'): 1,
+    }
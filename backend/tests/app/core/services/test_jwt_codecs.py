@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta, timezone
+from http import HTTPStatus
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi import HTTPException
+
+from backend.src.app.core.services.security import JWT_CODECS, SecurityService, create_jwt_codec
+from backend.src.modules.shared.cache import TTLCache
+from backend.src.modules.shared.exceptions import TokenExpiredError, TokenInvalidError
+
+SECRET = 'secret'
+CODEC_NAMES = sorted(JWT_CODECS)
+
+
+def make_payload(seconds: int = 60) -> dict:
+    return {'user_id': 1, 'exp': datetime.now(timezone.utc) + timedelta(seconds=seconds)}
+
+
+@pytest.mark.parametrize('encoder', CODEC_NAMES)
+@pytest.mark.parametrize('decoder', CODEC_NAMES)
+def test_codecs_are_interchangeable(encoder, decoder):
+    """
+    Тест для JWT кодеков - токен одного бэкенда читается любым другим
+    """
+    token = create_jwt_codec(encoder, SECRET).encode(make_payload())
+    payload = create_jwt_codec(decoder, SECRET).decode(token)
+    assert payload['user_id'] == 1
+    assert isinstance(payload['exp'], int)
+
+
+@pytest.mark.parametrize('name', CODEC_NAMES)
+def test_codecs_reject_expired_and_forged_tokens(name):
+    """
+    Тест для JWT кодеков - истёкший и подделанный токены отклоняются одинаково
+    """
+    codec = create_jwt_codec(name, SECRET)
+    expired = codec.encode(make_payload(-10))
+    with pytest.raises(TokenExpiredError):
+        codec.decode(expired)
+    assert codec.decode(expired, options={'verify_exp': False})['user_id'] == 1
+
+    forged = create_jwt_codec(name, 'other').encode(make_payload())
+    with pytest.raises(TokenInvalidError):
+        codec.decode(forged)
+    with pytest.raises(TokenInvalidError):
+        codec.decode('not.a.token')
+
+
+def test_decode_token_error_mapping():
+    """
+    Тест для JWT кодеков - ошибки по-прежнему превращаются в HTTPException 401/403
+    """
+    expired = SecurityService.JWT_CODEC.encode(make_payload(-10))
+    with pytest.raises(HTTPException) as error:
+        SecurityService.decode_token(expired)
+    assert error.value.status_code == HTTPStatus.UNAUTHORIZED
+
+    with pytest.raises(HTTPException) as error:
+        SecurityService.decode_token('garbage')
+    assert error.value.status_code == HTTPStatus.FORBIDDEN
+
+
+@pytest.mark.benchmark(group='jwt-encode')
+@pytest.mark.parametrize('name', CODEC_NAMES)
+def test_benchmark_encode(benchmark, name):
+    codec = create_jwt_codec(name, SECRET)
+    payload = make_payload()
+    benchmark(codec.encode, payload)
+
+
+@pytest.mark.benchmark(group='jwt-decode')
+@pytest.mark.parametrize('name', CODEC_NAMES)
+def test_benchmark_decode(benchmark, name):
+    codec = create_jwt_codec(name, SECRET)
+    token = codec.encode(make_payload())
+    benchmark(codec.decode, token)
+
+
+@pytest.mark.asyncio
+async def test_security_warm_up_passes_token_caches(monkeypatch):
+    """
+    Тест для SecurityService.warm_up - проверки JWT и CSRF проходят через кэши токенов, служебные записи не остаются
+    """
+    access_cache = TTLCache(maxsize=10, ttl=60)
+    csrf_cache = TTLCache(maxsize=10, ttl=60)
+    monkeypatch.setattr(SecurityService, 'ACCESS_TOKEN_CACHE', access_cache)
+    monkeypatch.setattr(SecurityService, 'CSRF_TOKEN_CACHE', csrf_cache)
+    monkeypatch.setattr(SecurityService.HASH_POOL, 'warm_up', AsyncMock())
+
+    await SecurityService.warm_up()
+
+    assert len(access_cache) == 0 and len(csrf_cache) == 0
+    assert access_cache.stats()['misses'] == 1 and csrf_cache.stats()['misses'] == 1
@@ -0,0 +1,108 @@
+import asyncio
+import time
+from http import HTTPStatus
+
+import pytest
+from fastapi import HTTPException
+
+from backend.src.app.core.services.password_hashing import PasswordHashPool
+from backend.src.app.core.services.security import PASSWORD_HASH_SECONDS, SecurityService
+from backend.src.modules.shared.exceptions import HashPoolOverloaded
+
+
+def slow_identity(value):
+    time.sleep(0.05)
+    return value
+
+
+@pytest.mark.asyncio
+async def test_hash_pool_runs_off_loop():
+    """
+    Тест для пула хеширования - функция выполняется в воркере и собираются метрики
+    """
+    pool = PasswordHashPool(workers=2, queue_limit=2)
+    try:
+        assert await pool.run(slow_identity, 'value') == 'value'
+        stats = pool.stats()
+        assert stats['completed'] == 1
+        assert stats['hash_seconds_max'] >= 0.05
+        assert stats['in_flight'] == 0
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_hash_pool_rejects_when_queue_full():
+    """
+    Тест для пула хеширования - при переполнении очереди задачи отбрасываются сразу
+    """
+    pool = PasswordHashPool(workers=1, queue_limit=1)
+    try:
+        results = await asyncio.gather(
+            *(pool.run(slow_identity, i) for i in range(3)),
+            return_exceptions=True,
+        )
+        assert results[:2] == [0, 1]
+        assert isinstance(results[2], HashPoolOverloaded)
+        assert pool.rejected == 1
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_hash_pool_warm_up_starts_all_workers():
+    """
+    Тест для прогрева пула хеширования - по одной дешёвой проверке bcrypt на каждый воркер
+    """
+    pool = PasswordHashPool(workers=3, queue_limit=0)
+    try:
+        await pool.warm_up()
+        assert pool.stats()['completed'] == 3
+        assert len(pool.executor._threads) == 3
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_hash_pool_keeps_slot_until_cancelled_call_finishes():
+    """
+    Тест для пула хеширования - отменённый запрос занимает место в очереди, пока воркер не закончит
+    """
+    pool = PasswordHashPool(workers=1, queue_limit=0)
+    try:
+        task = asyncio.create_task(pool.run(slow_identity, 'value'))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert pool.in_flight == 1
+        with pytest.raises(HashPoolOverloaded):
+            await pool.run(slow_identity, 'other')
+
+        await asyncio.sleep(0.1)
+        assert pool.in_flight == 0
+        assert await pool.run(slow_identity, 'other') == 'other'
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_rejected_hash_is_not_observed(monkeypatch):
+    """
+    Тест для SecurityService - отказ переполненного пула отвечает 503 и не пишется в гистограмму хеширования
+    """
+    pool = PasswordHashPool(workers=1, queue_limit=0)
+    monkeypatch.setattr(SecurityService, 'HASH_POOL', pool)
+    histogram = PASSWORD_HASH_SECONDS.labels('hash')
+    observed = histogram.count
+    try:
+        task = asyncio.create_task(pool.run(slow_identity, 'value'))
+        await asyncio.sleep(0.01)
+        with pytest.raises(HTTPException) as e:
+            await SecurityService.hash_password_async('password')
+        assert e.value.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+        assert histogram.count == observed
+        await task
+    finally:
+        pool.shutdown()
@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+from starlette.responses import Response
+
+from backend.src.app.core.services.security import SecurityService
+from backend.src.modules.session_store.stores import InMemorySessionStore
+from backend.src.modules.shared.cache import TTLCache
+
+
+class CountingSessionStore(InMemorySessionStore):
+
+    def __init__(self):
+        super().__init__()
+        self.rotations = 0
+
+    async def rotate(self, old_hash: str, new_hash: str, user_id: int, ttl: int) -> bool:
+        self.rotations += 1
+        await asyncio.sleep(0.01)
+        return await super().rotate(old_hash, new_hash, user_id, ttl)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_refreshes_share_one_rotation(monkeypatch):
+    """
+    Тест для ротации refresh токена - конкурентные обмены одного токена делают одну ротацию и получают один токен
+    """
+    store = CountingSessionStore()
+    monkeypatch.setattr(SecurityService, 'SESSION_STORE', store)
+    monkeypatch.setattr(SecurityService, 'REFRESH_GRACE', TTLCache(maxsize=100, ttl=5))
+
+    old_token = await SecurityService.set_refresh_token(Response(), 7)
+    tokens = await asyncio.gather(*(SecurityService.rotate_refresh_token(Response(), 7, old_token) for _ in range(5)))
+
+    assert store.rotations == 1
+    assert tokens[0] and len(set(tokens)) == 1
+    # повтор в grace окне отдаёт тот же токен без обращения к хранилищу
+    assert await SecurityService.rotate_refresh_token(Response(), 7, old_token) == tokens[0]
+    assert store.rotations == 1
+
+    SecurityService.REFRESH_GRACE.clear()
+    assert await SecurityService.rotate_refresh_token(Response(), 7, old_token) is None
+    assert await SecurityService.rotate_refresh_token(Response(), 7, tokens[0])
+    assert await store.active_sessions(7) == 1
@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from backend.src.app.core.readiness import ReadinessProbe
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_readiness_probe_is_cached_and_shared(sqlite_users):
+    """
+    Тест для ReadinessProbe - до прогрева starting, проба не чаще раза в interval, конкурентные запросы ждут одну пробу
+    """
+    engine = await sqlite_users('test_ready', schema=False)
+    clock = Clock()
+    probe = ReadinessProbe(engine, interval=2.0, clock=clock)
+    assert await probe.check() == {'status': 'starting'}
+    assert probe.probes == 0
+
+    probe.warmed_up = True
+    results = await asyncio.gather(*(probe.check() for _ in range(5)))
+    assert {result['status'] for result in results} == {'ready'}
+    assert probe.probes == 1
+
+    clock.now += 1
+    assert (await probe.check())['checked_seconds_ago'] == 1
+    assert probe.probes == 1
+
+    clock.now += 1
+    await probe.check()
+    assert probe.probes == 2
+
+
+@pytest.mark.asyncio
+async def test_readiness_probe_reports_unavailable_database(sqlite_users, tmp_path):
+    """
+    Тест для ReadinessProbe - недоступная БД даёт unavailable и только тип ошибки
+    """
+    engine = await sqlite_users('test_ready_missing', schema=False, path=tmp_path / 'missing' / 'ready.db')
+    probe = ReadinessProbe(engine)
+    probe.warmed_up = True
+    result = await probe.check()
+    assert result['status'] == 'unavailable'
+    assert result['error'] == 'OperationalError'
@@ -0,0 +1,39 @@
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from backend.db_pool import POOL_METRICS, STATEMENT_CACHE_METRICS
+from backend.db_session import MeteredAsyncSession
+from backend.src.app.core.warmup import open_pool_connections
+from backend.src.modules.shared.unit_of_work import UnitOfWork
+
+
+@pytest.mark.asyncio
+async def test_open_pool_connections_keeps_them_in_pool(sqlite_users):
+    """
+    Тест для прогрева пула - соединения открываются заранее и остаются в пуле, не больше pool_size
+    """
+    engine = await sqlite_users('test_warm_pool', schema=False, pool_size=3)
+    assert await open_pool_connections(engine, 5) == 3
+    assert engine.pool.checkedin() == 3
+    connects = POOL_METRICS['test_warm_pool'].connects
+
+    async with engine.connect():
+        pass
+    assert POOL_METRICS['test_warm_pool'].connects == connects
+
+
+@pytest.mark.asyncio
+async def test_warm_up_statements_fill_compiled_cache(sqlite_users):
+    """
+    Тест для прогрева statement'ов - после прогрева горячие чтения /auth берутся из compiled cache
+    """
+    engine = await sqlite_users('test_warm_statements', logins=['player'])
+    sessionmaker = async_sessionmaker(bind=engine, class_=MeteredAsyncSession, expire_on_commit=False)
+    metrics = STATEMENT_CACHE_METRICS['test_warm_statements']
+    async with UnitOfWork(sessionmaker) as uow:
+        assert await uow.user_repository.warm_up_statements() == uow.statements
+    misses = metrics.misses
+
+    async with UnitOfWork(sessionmaker) as uow:
+        await uow.user_repository.warm_up_statements()
+    assert metrics.misses == misses
@@ -0,0 +1,59 @@
+import datetime
+from pathlib import Path
+from typing import Iterable
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from backend.db_pool import create_pooled_engine
+from backend.src.infrastructure.models.users import User
+
+
+class SqliteUsers:
+    """
+    SQLite вместо MySQL для тестов репозиториев и пулов: файл в tmp_path, engine через create_pooled_engine.
+    Пользователи получают id по порядку с start_id, password_hash - hash<id>, чётные id - admin.
+    Все созданные engine закрываются после теста.
+    """
+
+    def __init__(self, tmp_path: Path):
+        self.tmp_path = tmp_path
+        self.engines: list[AsyncEngine] = []
+
+    async def __call__(self, name: str, logins: Iterable[str] = (), schema: bool = True, path: Path | None = None,
+                       **engine_kwargs) -> AsyncEngine:
+        """name - имя пула в POOL_METRICS и файла; schema=False - пустая база без таблицы users."""
+        engine_kwargs.setdefault('pre_ping', 'never')
+        engine = create_pooled_engine(url=f'sqlite+aiosqlite:///{path or self.tmp_path / f"{name}.db"}', name=name,
+                                      **engine_kwargs)
+        self.engines.append(engine)
+        if schema:
+            async with engine.begin() as connection:
+                await connection.run_sync(User.__table__.create)
+            await self.insert(engine, logins)
+        return engine
+
+    @staticmethod
+    async def insert(engine: AsyncEngine, logins: Iterable[str], start_id: int = 1) -> None:
+        # BIGINT ключ в SQLite не автоинкрементный, INSERT IGNORE нет - id задаются явно
+        now = datetime.datetime.now(datetime.timezone.utc)
+        rows = [{'id': id, 'login': login, 'password_hash': f'hash{id}',
+                 'user_type': 'admin' if id % 2 == 0 else 'player',
+                 'updated_by': 'test', 'created_at': now, 'updated_at': now}
+                for id, login in enumerate(logins, start=start_id)]
+        if rows:
+            async with engine.begin() as connection:
+                await connection.execute(User.__table__.insert(), rows)
+
+    async def dispose(self) -> None:
+        for engine in self.engines:
+            await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def sqlite_users(tmp_path):
+    pytest.importorskip('aiosqlite')
+    databases = SqliteUsers(tmp_path)
+    yield databases
+    await databases.dispose()
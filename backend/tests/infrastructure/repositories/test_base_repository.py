@@ -0,0 +1,224 @@
+import datetime
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from backend.db_session import MeteredAsyncSession
+from backend.src.infrastructure.models.users import User
+from backend.src.infrastructure.repositories._base_repository import BulkChunkReport
+from backend.src.infrastructure.repositories.user_repository import UserCredentials, UserLogin, UserRepository
+from backend.src.modules.shared.cache import TTLCache
+from backend.src.modules.shared.unit_of_work import UnitOfWork
+
+
+@pytest_asyncio.fixture
+async def sessionmaker(sqlite_users, request):
+    # пользователи user1..user5 с id 1..5, чётные id - admin
+    engine = await sqlite_users(request.node.name, logins=[f'user{index}' for index in range(1, 6)])
+    return async_sessionmaker(bind=engine, class_=MeteredAsyncSession, expire_on_commit=False)
+
+
+@pytest.mark.asyncio
+async def test_get_by_id_cached_reads_db_once(sessionmaker):
+    """
+    Тест для SqlAlchemyRepository.get_by_id_cached - повторное чтение и чтение проекции берутся из кэша
+    """
+    cache = TTLCache(maxsize=100, ttl=60)
+    async with UnitOfWork(sessionmaker, user_cache=cache) as uow:
+        assert (await uow.user_repository.get_by_id_cached(1)).login == 'user1'
+        assert (await uow.user_repository.get_by_id_cached(1)).login == 'user1'
+        credentials = await uow.user_repository.get_by_id_cached(1, result_type=UserCredentials)
+        assert credentials == UserCredentials(1, 'hash1')
+        assert await uow.user_repository.get_by_id_cached(1, result_type=UserCredentials) == credentials
+        assert await uow.user_repository.get_by_id_cached(99) is None
+        assert await uow.user_repository.get_by_id_cached(99) is None
+    # отсутствующая строка не кэшируется
+    assert uow.statements == 4
+    assert len(cache) == 2
+
+
+@pytest.mark.asyncio
+async def test_update_invalidates_cache_after_commit(sessionmaker):
+    """
+    Тест для SqlAlchemyRepository.update_by_id - старая строка, закэшированная до commit, сбрасывается после commit
+    """
+    cache = TTLCache(maxsize=100, ttl=60)
+    async with UnitOfWork(sessionmaker, user_cache=cache) as writer:
+        await writer.user_repository.get_by_id_cached(1)
+        await writer.user_repository.update_by_id(1, {'email': 'new@b.c'})
+        assert len(cache) == 0
+
+        # конкурентный запрос между UPDATE и commit видит и кэширует закоммиченную старую строку
+        async with UnitOfWork(sessionmaker, user_cache=cache) as reader:
+            assert (await reader.user_repository.get_by_id_cached(1)).email is None
+        assert len(cache) == 1
+
+        await writer.commit()
+        assert len(cache) == 0
+
+    async with UnitOfWork(sessionmaker, user_cache=cache) as uow:
+        assert (await uow.user_repository.get_by_id_cached(1)).email == 'new@b.c'
+
+
+@pytest.mark.asyncio
+async def test_rolled_back_update_invalidates_cache(sessionmaker):
+    """
+    Тест для SqlAlchemyRepository.update_by_id - версия строки, закэшированная внутри отменённой транзакции, сбрасывается
+    """
+    cache = TTLCache(maxsize=100, ttl=60)
+    async with UnitOfWork(sessionmaker, user_cache=cache) as uow:
+        await uow.user_repository.update_by_id(1, {'email': 'new@b.c'})
+        assert (await uow.user_repository.get_by_id_cached(1)).email == 'new@b.c'
+        await uow.session.rollback()
+        assert len(cache) == 0
+        assert (await uow.user_repository.get_by_id_cached(1)).email is None
+
+
+@pytest.mark.asyncio
+async def test_delete_and_swap_invalidate_cache_after_commit(sessionmaker):
+    """
+    Тест для delete_by_id и swap_refresh_token_hash - кэш сбрасывается и после commit
+    """
+    cache = TTLCache(maxsize=100, ttl=60)
+    async with UnitOfWork(sessionmaker, user_cache=cache) as uow:
+        await uow.user_repository.update_by_id(1, {'refresh_token_hash': 'old'}, commit=True)
+        await uow.user_repository.get_by_id_cached(1)
+        assert await uow.user_repository.swap_refresh_token_hash(1, 'old', 'new')
+        await uow.user_repository.get_by_id_cached(1)
+        await uow.commit()
+        assert len(cache) == 0
+        assert (await uow.user_repository.get_by_id_cached(1)).refresh_token_hash == 'new'
+
+        await uow.user_repository.delete_by_id(1, commit=True)
+        assert len(cache) == 0
+        assert await uow.user_repository.get_by_id_cached(1) is None
+
+
+@pytest.mark.asyncio
+async def test_get_page_boundaries(sessionmaker):
+    """
+    Тест для SqlAlchemyRepository.get_page - курсор по id, неполная и пустая последняя страница, обратный порядок
+    """
+    async with UnitOfWork(sessionmaker) as uow:
+        repository = uow.user_repository
+        pages, after = [], None
+        while True:
+            items, after = await repository.get_page(after=after, limit=2)
+            pages.append([item.id for item in items])
+            if after is None:
+                break
+        assert pages == [[1, 2], [3, 4], [5]]
+
+        # полная последняя страница отдаёт курсор, следующая пустая его закрывает
+        items, after = await repository.get_page(limit=5)
+        assert len(items) == 5 and after == 5
+        assert await repository.get_page(after=after, limit=5) == ([], None)
+
+        items, after = await repository.get_page(limit=2, descending=True)
+        assert ([item.id for item in items], after) == ([5, 4], 4)
+        items, after = await repository.get_page(after=after, limit=2, descending=True)
+        assert ([item.id for item in items], after) == ([3, 2], 2)
+
+
+@pytest.mark.asyncio
+async def test_get_page_order_by_with_ties(sessionmaker):
+    """
+    Тест для SqlAlchemyRepository.get_page - при order_by не по id одинаковые значения упорядочены по id,
+    курсор - кортеж (значение, id), проекция не получает служебные колонки
+    """
+    async with UnitOfWork(sessionmaker) as uow:
+        repository = uow.user_repository
+        items, after = await repository.get_page(limit=3, order_by=User.user_type, result_type=UserLogin)
+        assert items == [UserLogin('user2'), UserLogin('user4'), UserLogin('user1')]
+        assert after == ('player', 1)
+        items, after = await repository.get_page(after=after, limit=3, order_by=User.user_type, result_type=UserLogin)
+        assert (items, after) == ([UserLogin('user3'), UserLogin('user5')], None)
+
+        items, after = await repository.get_page(limit=3, order_by=User.user_type, descending=True)
+        assert [item.login for item in items] == ['user5', 'user3', 'user1']
+        assert after == ('player', 1)
+        items, after = await repository.get_page(after=after, limit=3, order_by=User.user_type, descending=True)
+        assert ([item.login for item in items], after) == (['user4', 'user2'], None)
+
+
+@pytest.mark.asyncio
+async def test_iter_pages_and_stream_batches(sessionmaker):
+    """
+    Тест для iter_pages и stream - выборка делится на пачки заданного размера, where и проекция применяются
+    """
+    async with UnitOfWork(sessionmaker) as uow:
+        repository = uow.user_repository
+        pages = [page async for page in repository.iter_pages(limit=2, result_type=UserCredentials)]
+        assert [[user.id for user in page] for page in pages] == [[1, 2], [3, 4], [5]]
+        assert pages[0][0] == UserCredentials(1, 'hash1')
+        pages = [page async for page in repository.iter_pages(limit=2, where=User.user_type == 'admin')]
+        assert [[user.id for user in page] for page in pages] == [[2, 4]]
+
+        batches = [batch async for batch in repository.stream(batch_size=2, order_by=User.id)]
+        assert [[user.id for user in batch] for batch in batches] == [[1, 2], [3, 4], [5]]
+        batches = [batch async for batch in repository.stream(where=User.user_type == 'player', result_type=UserLogin,
+                                                              order_by=User.login, batch_size=10)]
+        assert batches == [[UserLogin('user1'), UserLogin('user3'), UserLogin('user5')]]
+        assert [batch async for batch in repository.stream(where=User.id > 10)] == []
+
+
+def test_split_chunks_limits_rows_and_bytes():
+    """
+    Тест для SqlAlchemyRepository.split_chunks - пачки ограничены числом строк и оценкой размера
+    """
+    rows = [{'login': 'x' * 10} for _ in range(5)]
+    row_bytes = UserRepository._estimate_row_bytes(rows[0])
+    assert row_bytes == 14
+    # кириллица в utf-8 - два байта на символ
+    assert UserRepository._estimate_row_bytes({'login': 'ж' * 10}) == 24
+
+    chunks = UserRepository.split_chunks(rows, max_rows=2, max_bytes=1000)
+    assert [(len(chunk), size) for chunk, size in chunks] == [(2, 28), (2, 28), (1, 14)]
+    chunks = UserRepository.split_chunks(rows, max_rows=100, max_bytes=3 * row_bytes)
+    assert [len(chunk) for chunk, _ in chunks] == [3, 2]
+    # строка больше max_bytes всё равно уходит отдельной пачкой
+    chunks = UserRepository.split_chunks([{'login': 'x' * 100}, *rows[:1]], max_rows=100, max_bytes=50)
+    assert [len(chunk) for chunk, _ in chunks] == [1, 1]
+    assert UserRepository.split_chunks([], max_rows=2, max_bytes=1000) == []
+
+
+def test_bulk_chunk_id_range():
+    """
+    Тест для BulkChunkReport.id_range - диапазон только при известном first_id и вставке всех строк
+    """
+    assert BulkChunkReport(index=0, rows=3, estimated_bytes=0, rowcount=3, first_id=10).id_range == (10, 12)
+    assert BulkChunkReport(index=0, rows=3, estimated_bytes=0, rowcount=2, first_id=10).id_range is None
+    assert BulkChunkReport(index=0, rows=3, estimated_bytes=0, rowcount=3).id_range is None
+
+
+def _new_users(start: int, count: int) -> list[dict]:
+    # BIGINT ключ в SQLite не автоинкрементный, id задаются явно
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return [{'id': 100 + index, 'login': f'bulk{index}', 'password_hash': 'hash', 'user_type': 'player', 'updated_by': 'test',
+             'created_at': now, 'updated_at': now} for index in range(start, start + count)]
+
+
+@pytest.mark.asyncio
+async def test_bulk_insert_sequential_and_parallel(sessionmaker):
+    """
+    Тест для SqlAlchemyRepository.bulk_insert - пачки в одной сессии и параллельно в своих сессиях,
+    у параллельных пачек нет first_id и диапазона id
+    """
+    async with UnitOfWork(sessionmaker) as uow:
+        report = await uow.user_repository.bulk_insert(_new_users(0, 5), max_rows=2, commit=True)
+        assert [chunk.rows for chunk in report.chunks] == [2, 2, 1]
+        assert (report.rows, report.rowcount) == (5, 5)
+        assert all(chunk.first_id for chunk in report.chunks)
+
+        report = await uow.user_repository.bulk_insert(_new_users(5, 5), max_rows=2, sessionmaker=sessionmaker,
+                                                       concurrency=2)
+        assert (report.rows, report.rowcount) == (5, 5)
+        assert [chunk.first_id for chunk in report.chunks] == [None, None, None]
+        assert report.id_ranges == []
+
+    async with UnitOfWork(sessionmaker) as uow:
+        logins = [user.login async for page in uow.user_repository.iter_pages(result_type=UserLogin)
+                  for user in page]
+        assert sorted(logins) == sorted([f'user{index}' for index in range(1, 6)] +
+                                        [f'bulk{index}' for index in range(10)])
@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest_asyncio
+
+from backend.src.modules.session_store.resp import RespClient
+
+
+class FakeRespServer:
+    """Локальный сервер с подмножеством команд Redis, TTL запоминается, но ключи не истекают."""
+
+    def __init__(self):
+        self.strings: dict[bytes, bytes] = {}
+        self.ttls: dict[bytes, int] = {}
+        self.sets: dict[bytes, set[bytes]] = {}
+        self.commands: list[list[bytes]] = []
+        self.server: asyncio.Server | None = None
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self.handle, '127.0.0.1', 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+
+    @staticmethod
+    def encode(value) -> bytes:
+        if value is None:
+            return b'$-1\r\n'
+        if isinstance(value, int):
+            return b':%d\r\n' % value
+        if isinstance(value, bytes):
+            return b'$%d\r\n%s\r\n' % (len(value), value)
+        if isinstance(value, Exception):
+            return b'-ERR %s\r\n' % str(value).encode()
+        if isinstance(value, str):
+            return b'+%s\r\n' % value.encode()
+        return b'*%d\r\n' % len(value) + b''.join(FakeRespServer.encode(item) for item in value)
+
+    def run(self, name: bytes, *args: bytes):
+        if name == b'SET':
+            options = [option.upper() for option in args[2:]]
+            if b'NX' in options and args[0] in self.strings:
+                return None
+            self.strings[args[0]] = args[1]
+            if b'EX' in options:
+                self.ttls[args[0]] = int(args[2 + options.index(b'EX') + 1])
+            return 'OK'
+        if name == b'INCR':
+            value = int(self.strings.get(args[0], b'0')) + 1
+            self.strings[args[0]] = str(value).encode()
+            return value
+        if name == b'TTL':
+            if args[0] not in self.strings:
+                return -2
+            return self.ttls.get(args[0], -1)
+        if name == b'GET':
+            return self.strings.get(args[0])
+        if name == b'GETDEL':
+            return self.strings.pop(args[0], None)
+        if name == b'MGET':
+            return [self.strings.get(key) for key in args]
+        if name == b'DEL':
+            return sum((self.strings.pop(key, None) is not None) + (self.sets.pop(key, None) is not None) for key in args)
+        if name == b'SADD':
+            self.sets.setdefault(args[0], set()).update(args[1:])
+            return len(args) - 1
+        if name == b'SREM':
+            self.sets.get(args[0], set()).difference_update(args[1:])
+            return len(args) - 1
+        if name == b'SMEMBERS':
+            return sorted(self.sets.get(args[0], set()))
+        if name in (b'EXPIRE', b'SELECT', b'AUTH'):
+            return 'OK' if name != b'EXPIRE' else 1
+        return ValueError(f'unknown command {name.decode()}')
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                command = await RespClient.read_reply(reader)
+                self.commands.append(command)
+                writer.write(self.encode(self.run(*command)))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            writer.close()
+
+
+@pytest_asyncio.fixture
+async def fake_server():
+    server = FakeRespServer()
+    server.port = await server.start()
+    yield server
+    await server.stop()
+
+
+@pytest_asyncio.fixture
+async def closed_server_port():
+    """Порт, на котором только что слушал и уже не слушает сервер."""
+    server = FakeRespServer()
+    port = await server.start()
+    await server.stop()
+    return port
+
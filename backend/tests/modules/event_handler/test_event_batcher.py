@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from backend.src.modules.event_handler.event_batcher import EventBatcher
+from backend.src.modules.event_handler.event_handler import EventHandler
+
+
+@pytest.mark.asyncio
+async def test_batcher_coalesces_by_key_within_window():
+    """
+    Тест для буферизации событий - события за окно приходят одной пачкой, по ключу остаётся последнее значение
+    """
+    handler = EventHandler('hp')
+    batches = []
+
+    async def on_hp(batch):
+        batches.append(batch)
+
+    handler.link(on_hp, 'hp')
+    batcher = EventBatcher(handler, window=0.02, max_batch=100)
+
+    batcher.publish('hp', {'player': 1, 'hp': 10}, key=1)
+    batcher.publish('hp', {'player': 2, 'hp': 20}, key=2)
+    batcher.publish('hp', {'player': 1, 'hp': 5}, key=1)
+    assert batches == []
+
+    await asyncio.sleep(0.05)
+    assert batches == [[{'player': 1, 'hp': 5}, {'player': 2, 'hp': 20}]]
+    assert batcher.coalesced == 1
+
+
+@pytest.mark.asyncio
+async def test_batcher_flushes_on_max_batch_and_close():
+    """
+    Тест для буферизации событий - переполнение пачки и закрытие сбрасывают буфер
+    """
+    handler = EventHandler('tick')
+    batches = []
+
+    def on_tick(batch):
+        batches.append(batch)
+
+    handler.link(on_tick, 'tick')
+    batcher = EventBatcher(handler, window=10, max_batch=2)
+
+    batcher.publish('tick', 1)
+    batcher.publish('tick', 2)
+    batcher.publish('tick', 3)
+    await asyncio.sleep(0)
+    assert batches == [[1, 2]]
+
+    await batcher.aclose()
+    assert batches == [[1, 2], [3]]
+    with pytest.raises(RuntimeError):
+        batcher.publish('tick', 4)
@@ -0,0 +1,195 @@
+import asyncio
+import time
+
+import pytest
+
+from backend.src.modules.event_handler.event_handler import EventHandler
+from backend.src.modules.metrics.registry import MetricsRegistry
+
+
+@pytest.mark.asyncio
+async def test_fire_concurrent_runs_callbacks_together():
+    """
+    Тест для конкурентного fire - время события равно самому медленному колбэку, а не сумме
+    """
+    handler = EventHandler('tick')
+    calls = []
+
+    async def slow_async(value):
+        await asyncio.sleep(0.1)
+        calls.append(('async', value))
+
+    def slow_sync(value):
+        time.sleep(0.1)
+        calls.append(('sync', value))
+
+    handler.link(slow_async, 'tick')
+    handler.link(slow_sync, 'tick')
+
+    result = await handler.fire_concurrent('tick', 1)
+
+    assert result.all_ok
+    assert sorted(calls) == [('async', 1), ('sync', 1)]
+    assert result.elapsed < 0.19
+
+
+@pytest.mark.asyncio
+async def test_fire_concurrent_callback_timeout_tolerated():
+    """
+    Тест для конкурентного fire - таймаут колбэка попадает в результат при tolerate_callbacks_exceptions
+    """
+    handler = EventHandler('tick', tolerate_callbacks_exceptions=True)
+
+    async def hanging():
+        await asyncio.sleep(10)
+
+    async def fast():
+        return 'done'
+
+    handler.link(hanging, 'tick')
+    handler.link(fast, 'tick')
+
+    result = await handler.fire_concurrent('tick', callback_timeout=0.05)
+
+    assert not result
+    hanging_outcome, fast_outcome = result.outcomes
+    assert hanging_outcome.timed_out and isinstance(hanging_outcome.exception, TimeoutError)
+    assert fast_outcome.ok and fast_outcome.result == 'done'
+
+
+@pytest.mark.asyncio
+async def test_fire_concurrent_raises_without_tolerance():
+    """
+    Тест для конкурентного fire - без tolerate_callbacks_exceptions исключение колбэка пробрасывается
+    """
+    handler = EventHandler('tick')
+
+    async def broken():
+        raise ValueError('broken')
+
+    handler.link(broken, 'tick')
+
+    with pytest.raises(ValueError):
+        await handler.fire_concurrent('tick')
+
+
+@pytest.mark.asyncio
+async def test_fire_concurrent_event_timeout():
+    """
+    Тест для конкурентного fire - общий таймаут события отмечает незавершённые колбэки
+    """
+    handler = EventHandler('tick', tolerate_callbacks_exceptions=True)
+
+    async def hanging():
+        await asyncio.sleep(10)
+
+    handler.link(hanging, 'tick')
+
+    result = await handler.fire_concurrent('tick', event_timeout=0.05)
+
+    assert result.timed_out
+    assert result.outcomes[0].timed_out
+
+
+@pytest.mark.asyncio
+async def test_dispatch_table_keeps_link_order():
+    """
+    Тест для таблиц диспетчеризации - порядок вызова совпадает с порядком link, повторный link игнорируется
+    """
+    handler = EventHandler('tick')
+    calls = []
+
+    def first():
+        calls.append('first')
+
+    async def second():
+        calls.append('second')
+
+    assert handler.link(first, 'tick')
+    assert handler.link(second, 'tick')
+    assert not handler.link(first, 'tick')
+    assert handler.dispatch_table('tick') == ((first, False), (second, True))
+
+    await handler.fire('tick')
+    assert calls == ['first', 'second']
+
+    assert handler.unlink(first, 'tick')
+    assert handler.dispatch_table('tick') == ((second, True),)
+    assert await handler.fire('not_registered')
+
+
+@pytest.mark.asyncio
+async def test_wildcard_topics():
+    """
+    Тест для wildcard топиков - * совпадает с одним сегментом, # с любым количеством
+    """
+    handler = EventHandler('battle.1.card_played')
+    calls = []
+
+    def exact(*args):
+        calls.append('exact')
+
+    def single(*args):
+        calls.append('single')
+
+    def multi(*args):
+        calls.append('multi')
+
+    handler.link(exact, 'battle.1.card_played')
+    assert handler.link(single, 'battle.*.card_played')
+    assert handler.link(multi, 'battle.#')
+    assert not handler.link(multi, 'battle.#')
+
+    await handler.fire('battle.1.card_played')
+    assert calls == ['exact', 'single', 'multi']
+
+    calls.clear()
+    await handler.fire('battle.2.card_played')
+    assert calls == ['single', 'multi']
+
+    calls.clear()
+    await handler.fire('battle')
+    assert calls == ['multi']
+
+    calls.clear()
+    assert handler.unlink(single, 'battle.*.card_played')
+    await handler.fire('battle.2.card_played')
+    assert calls == ['multi']
+    assert handler.patterns == {'battle.#': (multi,)}
+
+
+def test_link_unregistered_event_still_raises():
+    """
+    Тест для wildcard топиков - обычные события по-прежнему требуют регистрации
+    """
+    handler = EventHandler()
+
+    def callback():
+        pass
+
+    with pytest.raises(EventHandler.Exceptions.EventNotAllowedError):
+        handler.link(callback, 'battle.start')
+
+
+@pytest.mark.asyncio
+async def test_fire_records_latency():
+    """
+    Тест для fire с fire_latency - время каждого fire вместе с колбэками попадает в гистограмму
+    """
+    histogram = MetricsRegistry().histogram('event_fire_seconds', 'Время fire')
+    handler = EventHandler('tick', fire_latency=histogram)
+
+    async def slow(value):
+        await asyncio.sleep(0.02)
+
+    handler.link(slow, 'tick')
+    await handler.fire('tick', 1)
+    await handler.fire('unlinked')
+
+    assert histogram.labels().count == 2
+    assert histogram.labels().sum >= 0.02
+
+    # fire_concurrent попадает в ту же гистограмму
+    await handler.fire_concurrent('tick', 2)
+    assert histogram.labels().count == 3
+    assert histogram.labels().sum >= 0.04
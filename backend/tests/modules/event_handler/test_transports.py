@@ -0,0 +1,183 @@
+import asyncio
+import os
+import socket
+
+import pytest
+
+from backend.src.modules.event_handler.event_handler import EventHandler
+from backend.src.modules.event_handler.transports import UnixSocketTransport, InMemoryTransport
+
+
+@pytest.mark.asyncio
+async def test_unix_socket_transport_delivers_between_handlers(tmp_path):
+    """
+    Тест для транспорта событий - событие из одного обработчика доходит до другого через unix сокет
+    """
+    socket_dir = str(tmp_path / 'bus')
+    sender = EventHandler('hp', transport=UnixSocketTransport(socket_dir, peers_ttl=0))
+    receiver = EventHandler('hp', transport=UnixSocketTransport(socket_dir, peers_ttl=0))
+    received = []
+
+    async def on_hp(player, hp=None):
+        received.append((player, hp))
+
+    receiver.link(on_hp, 'hp')
+    await sender.start_transport()
+    await receiver.start_transport()
+    try:
+        for hp in range(3):
+            await sender.fire('hp', 'player', hp=hp)
+        await asyncio.sleep(0.05)
+
+        assert received == [('player', 0), ('player', 1), ('player', 2)]
+        assert sender.transport.sent_datagrams == 1
+    finally:
+        await sender.close_transport()
+        await receiver.close_transport()
+
+
+def test_unix_socket_transport_frames_roundtrip():
+    """
+    Тест для транспорта событий - несколько событий упаковываются в одну датаграмму и читаются обратно
+    """
+    transport = UnixSocketTransport('/tmp', max_datagram_size=64)
+    frames = [UnixSocketTransport.encode('tick', (i,), {'key': 'value'}) for i in range(4)]
+
+    datagrams = transport._pack(frames)
+
+    assert len(datagrams) > 1
+    decoded = [message for datagram in datagrams for message in UnixSocketTransport.decode(datagram)]
+    assert decoded == [('tick', (i,), {'key': 'value'}) for i in range(4)]
+
+
+@pytest.mark.asyncio
+async def test_in_memory_transport_hub():
+    """
+    Тест для транспорта событий - обработчики с общим in-memory хабом получают события друг друга
+    """
+    hub = []
+    first = EventHandler('tick', transport=InMemoryTransport(hub))
+    second = EventHandler('tick', transport=InMemoryTransport(hub))
+    received = []
+
+    def on_tick(value):
+        received.append(value)
+
+    second.link(on_tick, 'tick')
+    await first.start_transport()
+    await second.start_transport()
+
+    await first.fire('tick', 1)
+    await asyncio.sleep(0)
+
+    assert received == [1]
+
+
+@pytest.mark.asyncio
+async def test_unix_socket_transport_removes_stale_socket(tmp_path):
+    """
+    Тест для транспорта событий - сокет упавшего воркера удаляется после первого отказа, события не теряются
+    """
+    socket_dir = tmp_path / 'bus'
+    socket_dir.mkdir(mode=0o700)
+    # воркер упал, не удалив свой сокет: файл есть, но его никто не слушает
+    stale_path = str(socket_dir / '1-0.sock')
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    stale.bind(stale_path)
+    stale.close()
+
+    sender = UnixSocketTransport(str(socket_dir), peers_ttl=0)
+    receiver = UnixSocketTransport(str(socket_dir), peers_ttl=0)
+    received = []
+
+    async def on_message(event_name, args, kwargs):
+        received.append(args)
+
+    await sender.start(on_message)
+    await receiver.start(on_message)
+    try:
+        for index in range(3):
+            sender.publish('tick', (index,), {})
+            await sender.flush()
+        await asyncio.sleep(0.05)
+
+        assert received == [(0,), (1,), (2,)]
+        assert (sender.stale_peers, sender.dropped_datagrams) == (1, 0)
+        assert not os.path.exists(stale_path)
+        assert sender.peers() == [receiver.path]
+    finally:
+        await sender.close()
+        await receiver.close()
+
+
+@pytest.mark.asyncio
+async def test_in_memory_transport_keeps_delivery_tasks():
+    """
+    Тест для транспорта событий - задачи доставки хранятся до завершения, close дожидается их
+    """
+    hub = []
+    sender, receiver = InMemoryTransport(hub), InMemoryTransport(hub)
+    received = []
+
+    async def on_message(event_name, args, kwargs):
+        await asyncio.sleep(0.01)
+        received.append(args)
+
+    await sender.start(on_message)
+    await receiver.start(on_message)
+    sender.publish('tick', (1,), {})
+    assert len(sender._tasks) == 1
+
+    await sender.close()
+    assert received == [(1,)]
+    assert not sender._tasks
+    await receiver.close()
+
+
+@pytest.mark.asyncio
+async def test_unix_socket_transport_rejects_open_socket_dir(tmp_path):
+    """
+    Тест для транспорта событий - каталог сокетов, доступный другим пользователям, не используется
+    """
+    socket_dir = tmp_path / 'bus'
+    socket_dir.mkdir(mode=0o755)
+    socket_dir.chmod(0o755)
+    transport = UnixSocketTransport(str(socket_dir))
+
+    async def on_message(event_name, args, kwargs):
+        pass
+
+    with pytest.raises(PermissionError):
+        await transport.start(on_message)
+    assert not transport.started and not os.listdir(socket_dir)
+
+    socket_dir.chmod(0o700)
+    await transport.start(on_message)
+    await transport.close()
+
+
+@pytest.mark.asyncio
+async def test_unix_socket_transport_drops_unsendable_events(tmp_path):
+    """
+    Тест для транспорта событий - событие, которое не влезает в датаграмму, получают локальные колбэки,
+    а пирам оно не отправляется и учитывается в dropped_events
+    """
+    handler = EventHandler('big', transport=UnixSocketTransport(str(tmp_path / 'bus'), max_datagram_size=64))
+    received = []
+
+    def on_big(payload):
+        received.append(len(payload))
+
+    handler.link(on_big, 'big')
+    await handler.start_transport()
+    try:
+        assert await handler.fire('big', 'x' * 100)
+        assert (await handler.fire_concurrent('big', 'y' * 100)).all_ok
+        # marshal не сериализует произвольные объекты
+        assert await handler.fire('big', [object()])
+
+        assert received == [100, 100, 1]
+        assert handler.transport.dropped_events == 3
+        assert not handler.transport._pending
+    finally:
+        await handler.close_transport()
@@ -0,0 +1,59 @@
+import pytest
+
+from backend.src.modules.metrics.registry import MetricsRegistry, stats_collector
+
+
+def test_histogram_exposition_is_cumulative():
+    """
+    Тест для Histogram - бакеты в выдаче накопительные, есть +Inf, _sum и _count
+    """
+    registry = MetricsRegistry()
+    histogram = registry.histogram('request_seconds', 'Время запроса', ('route',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.labels('/auth/login').observe(value)
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == ['# HELP request_seconds Время запроса', '# TYPE request_seconds histogram']
+    assert 'request_seconds_bucket{route="/auth/login",le="0.1"} 1' in lines
+    assert 'request_seconds_bucket{route="/auth/login",le="1.0"} 3' in lines
+    assert 'request_seconds_bucket{route="/auth/login",le="+Inf"} 4' in lines
+    assert 'request_seconds_sum{route="/auth/login"} 4.05' in lines
+    assert 'request_seconds_count{route="/auth/login"} 4' in lines
+
+
+def test_registry_returns_existing_metric_and_checks_labels():
+    """
+    Тест для MetricsRegistry - повторная регистрация отдаёт ту же метрику, неверное число меток - ошибка
+    """
+    registry = MetricsRegistry()
+    counter = registry.counter('logins_total', 'Логины', ('outcome',))
+    assert registry.counter('logins_total', 'Логины', ('outcome',)) is counter
+    with pytest.raises(ValueError):
+        registry.histogram('logins_total', 'Логины')
+    with pytest.raises(ValueError):
+        counter.labels()
+
+    counter.labels('ok').inc()
+    counter.labels('ok').inc(2)
+    counter.labels('say "hi"\n').inc()
+    lines = registry.render().splitlines()
+    assert 'logins_total{outcome="ok"} 3' in lines
+    assert 'logins_total{outcome="say \\"hi\\"\\n"} 1' in lines
+
+
+def test_stats_collector_exports_numeric_fields():
+    """
+    Тест для stats_collector - числовые поля stats() становятся gauge с меткой name, строки пропускаются
+    """
+    registry = MetricsRegistry()
+    registry.add_collector(stats_collector('db_pool', 'Пул', lambda: [
+        {'name': 'script', 'size': 10, 'hit_rate': 0.5, 'executor': 'thread'},
+        {'name': 'admin', 'size': 5, 'hit_rate': 0.0, 'executor': 'thread'},
+    ]))
+
+    lines = registry.render().splitlines()
+    assert '# TYPE db_pool_size gauge' in lines
+    assert 'db_pool_size{name="script"} 10' in lines
+    assert 'db_pool_size{name="admin"} 5' in lines
+    assert 'db_pool_hit_rate{name="script"} 0.5' in lines
+    assert not any(line.startswith('db_pool_executor') for line in lines)
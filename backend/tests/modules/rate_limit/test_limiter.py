@@ -0,0 +1,134 @@
+import pytest
+
+from backend.src.modules.rate_limit.limiter import (MemoryRateLimitBackend, RateLimiter, RateLimitRule,
+                                                    RespRateLimitBackend)
+from backend.src.modules.session_store.resp import RespClient
+from backend.src.modules.shared.exceptions import RateLimitExceeded
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_rate_limit_rule_parse():
+    """
+    Тест для RateLimitRule.parse - 'limit/period' и выключенное правило
+    """
+    rule = RateLimitRule.parse('login', '5/60')
+    assert (rule.limit, rule.period) == (5, 60.0)
+    assert rule.rate == pytest.approx(5 / 60)
+    assert RateLimitRule.parse('login', '0').limit == 0
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_token_bucket_refill():
+    """
+    Тест для MemoryRateLimitBackend - пропускается limit запросов подряд, дальше отказ до пополнения корзины
+    """
+    clock = Clock()
+    backend = MemoryRateLimitBackend(clock=clock)
+    rule = RateLimitRule('login', limit=3, period=30)
+
+    assert [await backend.hit('login:user', rule) for _ in range(3)] == [0, 0, 0]
+    retry_after = await backend.hit('login:user', rule)
+    assert retry_after == pytest.approx(10)
+    assert await backend.hit('login:other', rule) == 0
+
+    clock.now += 10
+    assert await backend.hit('login:user', rule) == 0
+    assert await backend.hit('login:user', rule) > 0
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_eviction():
+    """
+    Тест для MemoryRateLimitBackend - ограничение числа ключей и периодическая чистка полных корзин
+    """
+    clock = Clock()
+    backend = MemoryRateLimitBackend(max_keys=3, sweep_every=1000, clock=clock)
+    rule = RateLimitRule('login_ip', limit=2, period=10)
+
+    for index in range(5):
+        await backend.hit(f'ip{index}', rule)
+    assert list(backend.buckets) == ['ip2', 'ip3', 'ip4']
+    assert backend.evicted == 2
+
+    clock.now += 5
+    await backend.hit('ip4', rule)
+    # ip2 и ip3 пополнились полностью, ip4 только что использован
+    backend.sweep()
+    assert list(backend.buckets) == ['ip4']
+    assert backend.evicted == 4
+
+
+def test_memory_backend_sweep_skips_long_period_buckets():
+    """
+    Тест для MemoryRateLimitBackend.sweep - непополненная корзина длинного правила не останавливает чистку,
+    за один проход просматривается не больше limit ключей
+    """
+    clock = Clock()
+    backend = MemoryRateLimitBackend(sweep_every=1000, clock=clock)
+    backend.hit_now('registration_ip:1', RateLimitRule('registration_ip', limit=1, period=3600))
+    for index in range(5):
+        backend.hit_now(f'login:{index}', RateLimitRule('login', limit=5, period=10))
+
+    clock.now += 10
+    assert backend.sweep(limit=3) == 2
+    assert list(backend.buckets) == ['registration_ip:1', 'login:2', 'login:3', 'login:4']
+    assert backend.sweep() == 3
+    assert list(backend.buckets) == ['registration_ip:1']
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_counters_and_disabled_rule():
+    """
+    Тест для RateLimiter - исключение с retry_after, счётчики по правилам, правило с limit 0 не проверяется
+    """
+    limiter = RateLimiter([RateLimitRule('login', 1, 60), RateLimitRule('refresh_user', 0, 60)],
+                          MemoryRateLimitBackend())
+
+    await limiter.check('login', 'user')
+    with pytest.raises(RateLimitExceeded) as e:
+        await limiter.check('login', 'user')
+    assert e.value.rule == 'login' and e.value.retry_after > 0
+    for _ in range(10):
+        await limiter.check('refresh_user', 1)
+
+    stats = limiter.stats()
+    assert stats['rules']['login'] == {'allowed': 1, 'rejected': 1}
+    assert stats['rules']['refresh_user'] == {'allowed': 0, 'rejected': 0}
+    assert stats['keys'] == 1
+
+
+@pytest.mark.asyncio
+async def test_resp_backend_fixed_window(fake_server):
+    """
+    Тест для RespRateLimitBackend - счётчик окна общий для клиентов, превышение возвращает TTL окна
+    """
+    rule = RateLimitRule('registration_ip', limit=2, period=600)
+    clients = [RespClient(port=fake_server.port), RespClient(port=fake_server.port)]
+    try:
+        first, second = (RespRateLimitBackend(client) for client in clients)
+        assert await first.hit('registration_ip:1.2.3.4', rule) == 0
+        assert await second.hit('registration_ip:1.2.3.4', rule) == 0
+        assert await first.hit('registration_ip:1.2.3.4', rule) == 600
+        assert fake_server.ttls[b'ratelimit:registration_ip:1.2.3.4'] == 600
+    finally:
+        for client in clients:
+            await client.close()
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_skips_unavailable_backend(closed_server_port):
+    """
+    Тест для RateLimiter - недоступный общий backend не блокирует запросы
+    """
+    client = RespClient(port=closed_server_port, timeout=0.5)
+    limiter = RateLimiter([RateLimitRule('login', 1, 60)], RespRateLimitBackend(client))
+    await limiter.check('login', 'user')
+    await limiter.check('login', 'user')
+    assert limiter.backend_errors == 2
@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from backend.db_session import MeteredAsyncSession
+
+from backend.src.modules.session_store.resp import RespClient
+from backend.src.modules.session_store.stores import InMemorySessionStore, RespSessionStore, UserTableSessionStore
+from backend.src.modules.session_store.stores import create_session_store
+from backend.src.modules.shared.cache import TTLCache
+from backend.src.modules.shared.exceptions import RespConnectionError, RespError
+
+
+@pytest_asyncio.fixture(params=['memory', 'resp'])
+async def store(request, fake_server):
+    if request.param == 'memory':
+        yield InMemorySessionStore()
+        return
+    client = RespClient(port=fake_server.port, db=1)
+    yield RespSessionStore(client)
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_session_store_rotation_and_devices(store):
+    """
+    Тест для SessionStore - несколько устройств, одноразовая ротация, выход с устройства и со всех
+    """
+    await store.add('phone', 1, 60)
+    await store.add('laptop', 1, 60)
+    assert await store.active_sessions(1) == 2
+
+    assert await store.rotate('phone', 'phone-2', 1, 60)
+    assert not await store.rotate('phone', 'phone-3', 1, 60)
+    assert not await store.rotate('laptop', 'stolen', 2, 60)
+    assert await store.active_sessions(1) == 1
+
+    await store.add('tablet', 1, 60)
+    await store.revoke('tablet', 1)
+    assert await store.active_sessions(1) == 1
+    await store.revoke_user(1)
+    assert await store.active_sessions(1) == 0
+    assert not await store.rotate('phone-2', 'phone-3', 1, 60)
+
+
+@pytest.mark.asyncio
+async def test_resp_client_pipelines_concurrent_calls(fake_server):
+    """
+    Тест для RespClient - конкурентные команды идут по одному соединению, ответы не путаются
+    """
+    client = RespClient(port=fake_server.port)
+    try:
+        await asyncio.gather(*(client.execute('SET', f'key{index}', index) for index in range(50)))
+        values = await asyncio.gather(*(client.execute('GET', f'key{index}') for index in range(50)))
+        assert values == [str(index).encode() for index in range(50)]
+        assert client.connects == 1
+
+        with pytest.raises(RespError):
+            await client.execute('FLUSHALL')
+        assert await client.execute('GET', 'key1') == b'1'
+    finally:
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_resp_client_reports_unavailable_server(closed_server_port):
+    """
+    Тест для RespClient - недоступный сервер даёт RespConnectionError, а не зависший запрос
+    """
+    client = RespClient(port=closed_server_port, timeout=0.5)
+    with pytest.raises(RespConnectionError):
+        await client.execute('GET', 'key')
+
+
+@pytest.mark.asyncio
+async def test_user_table_session_store_compare_and_swap(sqlite_users):
+    """
+    Тест для UserTableSessionStore - ротация одним условным UPDATE, повтор старым хешем не проходит
+    """
+    engine = await sqlite_users('test_session_store', logins=['user'])
+    sessionmaker = async_sessionmaker(bind=engine, class_=MeteredAsyncSession, expire_on_commit=False)
+    user_cache = TTLCache(maxsize=10, ttl=60)
+    user_cache.set(('users', 1, None), 'stale')
+    store = UserTableSessionStore(sessionmaker, user_cache=user_cache)
+    await store.add('first', 1, 60)
+    # запись сессии сбрасывает строку пользователя в общем кэше
+    assert len(user_cache) == 0
+    results = await asyncio.gather(store.rotate('first', 'second', 1, 60), store.rotate('first', 'third', 1, 60))
+    assert sorted(results) == [False, True]
+    assert not await store.rotate('first', 'fourth', 2, 60)
+    assert await store.active_sessions(1) == 1
+
+    winner = 'second' if results[0] else 'third'
+    await store.revoke(winner, 1)
+    assert await store.active_sessions(1) == 0
+
+
+def test_create_session_store_refuses_memory_for_many_workers():
+    """
+    Тест для create_session_store - memory только для одного воркера, db использует переданный sessionmaker
+    """
+    assert isinstance(create_session_store('memory', maxsize=10, workers=1), InMemorySessionStore)
+    with pytest.raises(ValueError):
+        create_session_store('memory', workers=4)
+    with pytest.raises(ValueError):
+        create_session_store('db')
+    sessionmaker = async_sessionmaker(class_=MeteredAsyncSession)
+    assert create_session_store('db', sessionmaker=sessionmaker).sessionmaker is sessionmaker
@@ -0,0 +1,51 @@
+import pytest
+
+from backend.src.modules.shared.bloom import BloomFilter, LoginFilter
+
+
+def test_bloom_filter_has_no_false_negatives_and_bounded_false_positives():
+    """
+    Тест для BloomFilter - все добавленные ключи находятся, доля ложных срабатываний около error_rate
+    """
+    bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+    for index in range(10_000):
+        bloom.add(f'user{index}')
+
+    assert all(f'user{index}' in bloom for index in range(10_000))
+    false_positives = sum(f'absent{index}' in bloom for index in range(20_000))
+    assert false_positives / 20_000 < 0.02
+    assert bloom.false_positive_rate() == pytest.approx(0.01, rel=0.5)
+    # ~9.6 бит на ключ
+    assert bloom.nbytes < 10_000 * 10 / 8 + 64
+
+
+def test_login_filter_skips_only_after_load():
+    """
+    Тест для LoginFilter - до загрузки пропускает всё, после - отсекает неизвестные логины без учёта регистра
+    """
+    login_filter = LoginFilter(capacity=100)
+    login_filter.add('Player')
+    assert login_filter.might_exist('unknown')
+
+    login_filter.loaded = True
+    assert login_filter.might_exist('player')
+    assert login_filter.might_exist('PLAYER ')
+    assert not login_filter.might_exist('unknown')
+    assert login_filter.stats()['misses'] == 1
+
+
+def test_login_filter_grows_by_layers():
+    """
+    Тест для LoginFilter - при переполнении добавляется слой, оценка ложных срабатываний остаётся малой
+    """
+    login_filter = LoginFilter(capacity=1000, error_rate=0.01)
+    login_filter.load(f'user{index}' for index in range(5000))
+    login_filter.loaded = True
+
+    assert len(login_filter.layers) == 3
+    assert all(login_filter.might_exist(f'user{index}') for index in range(5000))
+    stats = login_filter.stats()
+    # логин, на котором уже срабатывает ранний слой, повторно не добавляется
+    assert stats['logins'] == pytest.approx(5000, rel=0.03)
+    assert stats['estimated_false_positive_rate'] < 0.03
+    assert stats['bytes'] == login_filter.nbytes
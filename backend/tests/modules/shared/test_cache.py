@@ -0,0 +1,29 @@
+import time
+
+from backend.src.modules.shared.cache import TTLCache
+
+
+def test_ttl_cache_lru_eviction_and_counters():
+    """
+    Тест для TTL кэша - вытеснение самой старой записи и счётчики попаданий
+    """
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.hits == 3 and cache.misses == 1
+
+
+def test_ttl_cache_respects_expires_at():
+    """
+    Тест для TTL кэша - запись живёт не дольше переданного expires_at
+    """
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set('token', 'payload', expires_at=time.time() - 1)
+
+    assert cache.get('token') is None
+    assert len(cache) == 0
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from backend.src.modules.shared.data_loader import DataLoader
+
+
+@pytest.mark.asyncio
+async def test_data_loader_batches_and_deduplicates():
+    """
+    Тест для DataLoader - загрузки за один проход loop собираются в одну пачку без дублей
+    """
+    calls = []
+
+    async def batch_load(keys):
+        calls.append(keys)
+        return {key: key * 10 for key in keys if key != 3}
+
+    loader = DataLoader(batch_load)
+    results = await asyncio.gather(*(loader.load(key) for key in (1, 2, 1, 3)))
+
+    assert results == [10, 20, 10, None]
+    assert calls == [[1, 2, 3]]
+
+    assert await loader.load(1) == 10
+    assert calls == [[1, 2, 3], [1]]
+
+
+@pytest.mark.asyncio
+async def test_data_loader_propagates_errors():
+    """
+    Тест для DataLoader - ошибка пачки получают все ожидающие
+    """
+    async def batch_load(keys):
+        raise RuntimeError('db down')
+
+    loader = DataLoader(batch_load)
+    results = await asyncio.gather(loader.load(1), loader.load(2), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_data_loader_keeps_batch_tasks():
+    """
+    Тест для DataLoader - задача пачки хранится, пока не завершится
+    """
+    release = asyncio.Event()
+
+    async def batch_load(keys):
+        await release.wait()
+        return {key: key for key in keys}
+
+    loader = DataLoader(batch_load)
+    pending = asyncio.ensure_future(loader.load(1))
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert len(loader._tasks) == 1
+
+    release.set()
+    assert await pending == 1
+    await asyncio.sleep(0)
+    assert not loader._tasks
@@ -0,0 +1,161 @@
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from backend.db_pool import STATEMENT_CACHE_METRICS
+from backend.db_replicas import ReplicaSet
+from backend.db_session import MeteredAsyncSession
+from backend.src.infrastructure.repositories.user_repository import UserCredentials
+from backend.src.modules.shared.bloom import LoginFilter
+from backend.src.modules.shared.unit_of_work import UnitOfWork
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_reads_from_replica_until_write(sqlite_users):
+    """
+    Тест для UnitOfWork - чтения идут в реплику, после записи - только в primary
+    """
+    primary = await sqlite_users('test_primary', logins=['primary'])
+    replica = await sqlite_users('test_replica', logins=['replica'])
+    replicas = ReplicaSet([replica])
+    sessionmaker = async_sessionmaker(bind=primary, class_=MeteredAsyncSession, expire_on_commit=False)
+    async with UnitOfWork(sessionmaker, replicas=replicas) as uow:
+        user = await uow.user_repository.get_by_id(1)
+        assert user.login == 'replica'
+
+        await uow.user_repository.update_by_id(1, {'email': 'a@b.c'})
+        user = await uow.user_repository.get_by_id(1)
+        assert (user.login, user.email) == ('primary', 'a@b.c')
+
+    async with UnitOfWork(sessionmaker) as uow:
+        user = await uow.user_repository.get_by_login('primary', result_type=UserCredentials)
+        assert user.id == 1
+
+
+@pytest.mark.asyncio
+async def test_replica_set_strategies(sqlite_users):
+    """
+    Тест для ReplicaSet - round_robin по кругу, least_connections выбирает наименее занятую реплику
+    """
+    engines = [await sqlite_users(f'test_replica_{index}', logins=['replica']) for index in range(2)]
+    round_robin = ReplicaSet(engines)
+    assert [round_robin.choose() for _ in range(4)] == [0, 1, 0, 1]
+
+    least_connections = ReplicaSet(engines, strategy='least_connections')
+    async with engines[0].connect():
+        assert [least_connections.choose() for _ in range(3)] == [1, 1, 1]
+    assert least_connections.stats()['replicas'][1]['chosen'] == 3
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_opens_session_lazily(sqlite_users):
+    """
+    Тест для UnitOfWork - без обращений к БД сессия не создаётся, запросы и время БД считаются
+    """
+    primary = await sqlite_users('test_lazy_primary', logins=['primary'])
+    sessionmaker = async_sessionmaker(bind=primary, class_=MeteredAsyncSession, expire_on_commit=False)
+    async with UnitOfWork(sessionmaker) as uow:
+        uow.user_repository
+        await uow.commit()
+    assert uow.stats() == {'session_opened': False, 'replica_session_opened': False,
+                           'statements': 0, 'db_seconds': 0.0}
+    assert primary.sync_engine.pool.checkedout() == 0
+
+    async with UnitOfWork(sessionmaker) as uow:
+        await uow.user_repository.get_by_id(1)
+        await uow.user_repository.get_many_by_ids([1, 2])
+    assert uow.stats()['statements'] == 2
+    assert uow.db_seconds > 0
+
+
+@pytest.mark.asyncio
+async def test_repository_reuses_compiled_statements(sqlite_users):
+    """
+    Тест для SqlAlchemyRepository - повторные get_by_id/update_by_id берут запрос из compiled cache
+    """
+    primary = await sqlite_users('test_statements', logins=['primary'])
+    sessionmaker = async_sessionmaker(bind=primary, class_=MeteredAsyncSession, expire_on_commit=False)
+    metrics = STATEMENT_CACHE_METRICS['test_statements']
+    setup_misses = metrics.misses
+    async with UnitOfWork(sessionmaker) as uow:
+        for email in ('a@b.c', 'd@e.f'):
+            assert (await uow.user_repository.get_by_id(1)).login == 'primary'
+            await uow.user_repository.update_by_id(1, {'email': email})
+        # объект из identity map сброшен после UPDATE, чтение видит новое значение
+        assert (await uow.user_repository.get_by_id(1)).email == 'd@e.f'
+        assert (await uow.user_repository.get_many_by_ids([1, 2]))[1].email == 'd@e.f'
+        assert (await uow.user_repository.get_many_by_ids([1, 2, 3]))[1].email == 'd@e.f'
+
+    stats = metrics.stats()
+    # get_by_id идёт через user_loader и разделяет запрос WHERE id IN (...) с get_many_by_ids
+    assert stats['misses'] - setup_misses == 2
+    assert stats['hits'] == 5
+
+
+@pytest.mark.asyncio
+async def test_login_filter_skips_unknown_logins(sqlite_users):
+    """
+    Тест для UserRepository с LoginFilter(trust_misses=True) - фильтр грузится из users.login, неизвестный логин не идёт в БД
+    """
+    engine = await sqlite_users('test_login_filter', logins=['player'])
+    sessionmaker = async_sessionmaker(bind=engine, class_=MeteredAsyncSession, expire_on_commit=False)
+    login_filter = LoginFilter(capacity=100, trust_misses=True)
+    async with UnitOfWork(sessionmaker, login_filter=login_filter) as uow:
+        await uow.user_repository.load_login_filter()
+        assert login_filter.loaded and len(login_filter) == 1
+        loaded_statements = uow.statements
+
+        assert await uow.user_repository.get_by_login('stranger') is None
+        assert not await uow.user_repository.login_exists('newcomer')
+        assert uow.statements == loaded_statements
+
+        assert await uow.user_repository.login_exists('player')
+        assert uow.statements == loaded_statements + 1
+    assert login_filter.stats()['misses'] == 2
+
+
+@pytest.mark.asyncio
+async def test_login_filter_miss_falls_back_to_db_across_workers(sqlite_users):
+    """
+    Тест для UserRepository с LoginFilter - логин, зарегистрированный в другом воркере, находится в БД
+    """
+    engine = await sqlite_users('test_login_filter_workers', logins=['player'])
+    sessionmaker = async_sessionmaker(bind=engine, class_=MeteredAsyncSession, expire_on_commit=False)
+    # у каждого воркера свой фильтр, событие user.registered до второго не дошло
+    first, second = LoginFilter(capacity=100), LoginFilter(capacity=100)
+    for login_filter in (first, second):
+        async with UnitOfWork(sessionmaker, login_filter=login_filter) as uow:
+            await uow.user_repository.load_login_filter()
+
+    # регистрация в первом воркере (INSERT IGNORE в SQLite нет - вставка напрямую)
+    await sqlite_users.insert(engine, ['newcomer'], start_id=2)
+    first.add('newcomer')
+    assert first.might_exist('newcomer') and not second.might_exist('newcomer')
+
+    async with UnitOfWork(sessionmaker, login_filter=second) as uow:
+        user = await uow.user_repository.get_by_login('newcomer', result_type=UserCredentials)
+        assert user is not None and user.password_hash == 'hash2'
+        assert await uow.user_repository.get_by_login('stranger') is None
+    # найденный в БД логин запомнен, следующий запрос фильтр уже пропускает
+    assert second.might_exist('newcomer')
+    stats = second.stats()
+    assert (stats['false_negatives'], stats['false_positives']) == (1, 0)
+
+
+@pytest.mark.asyncio
+async def test_get_by_id_batches_through_user_loader(sqlite_users):
+    """
+    Тест для UserRepository.get_by_id - конкурентные чтения полных строк собираются загрузчиком в один запрос,
+    проекции читаются напрямую
+    """
+    primary = await sqlite_users('test_user_loader', logins=['primary'])
+    sessionmaker = async_sessionmaker(bind=primary, class_=MeteredAsyncSession, expire_on_commit=False)
+    async with UnitOfWork(sessionmaker) as uow:
+        users = await asyncio.gather(*(uow.user_repository.get_by_id(id) for id in (1, 1, 2)))
+        assert [user and user.login for user in users] == ['primary', 'primary', None]
+        assert (uow.user_loader.loads, uow.user_loader.batches, uow.statements) == (3, 1, 1)
+
+        credentials = await uow.user_repository.get_by_id(1, result_type=UserCredentials)
+        assert credentials == UserCredentials(1, 'hash1')
+        assert (uow.user_loader.loads, uow.statements) == (3, 2)
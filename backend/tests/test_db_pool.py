@@ -0,0 +1,71 @@
+import time
+
+import pytest
+from sqlalchemy import event, exc, text
+
+from backend.db_pool import POOL_METRICS
+
+
+@pytest.mark.asyncio
+async def test_pool_metrics_separate_connect_from_wait(sqlite_users):
+    """
+    Тест для PoolMetrics - открытие нового соединения считается в connect, а не в ожидании пула
+    """
+    engine = await sqlite_users('test_pool_connect', schema=False, pool_size=1, max_overflow=0, pool_timeout=0.1)
+
+    @event.listens_for(engine.sync_engine, 'do_connect')
+    def slow_connect(dialect, connection_record, cargs, cparams):
+        time.sleep(0.05)
+
+    metrics = POOL_METRICS['test_pool_connect']
+    for _ in range(2):
+        async with engine.connect() as connection:
+            await connection.execute(text('SELECT 1'))
+
+    stats = metrics.stats()
+    assert (stats['connects'], stats['checkouts'], stats['checkins']) == (1, 2, 2)
+    assert metrics.connect_count == 1 and stats['connect_seconds_max'] >= 0.05
+    assert metrics.wait_count == 2 and stats['wait_seconds_max'] < 0.05
+
+    # единственное соединение занято: checkout ждёт pool_timeout и падает
+    async with engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            await engine.connect().start()
+    stats = metrics.stats()
+    assert stats['timeouts'] == 1
+    assert stats['wait_seconds_max'] >= 0.1
+    assert stats['size'] == 1 and stats['checked_in'] == 1
+
+
+@pytest.mark.asyncio
+async def test_idle_pre_ping_only_after_idle(sqlite_users):
+    """
+    Тест для pre_ping='idle' - пинг только после простоя, неудачный пинг переоткрывает соединение
+    """
+    engine = await sqlite_users('test_pool_idle_ping', schema=False, pool_size=1, pre_ping='idle',
+                                pre_ping_idle_seconds=60)
+    metrics = POOL_METRICS['test_pool_idle_ping']
+    for _ in range(3):
+        async with engine.connect() as connection:
+            await connection.execute(text('SELECT 1'))
+            record = (await connection.get_raw_connection())._connection_record
+    assert metrics.pings == 0
+
+    # соединение "простаивало" дольше pre_ping_idle_seconds
+    record.info['checked_in_at'] -= 61
+    async with engine.connect() as connection:
+        await connection.execute(text('SELECT 1'))
+    assert (metrics.pings, metrics.ping_failures, metrics.connects) == (1, 0, 1)
+
+    record.info['checked_in_at'] -= 61
+    dialect = engine.sync_engine.dialect
+    original_ping = dialect.do_ping
+
+    def failing_ping(dbapi_connection):
+        dialect.do_ping = original_ping
+        raise ConnectionError('server has gone away')
+
+    dialect.do_ping = failing_ping
+    async with engine.connect() as connection:
+        assert (await connection.execute(text('SELECT 1'))).scalar() == 1
+    assert (metrics.pings, metrics.ping_failures, metrics.invalidations, metrics.connects) == (2, 1, 1, 2)
@@ -0,0 +1,66 @@
+import json
+import logging
+import os
+import subprocess
+import sys
+
+from backend.logger import JsonFormatter, SamplingFilter
+
+
+def make_record(name: str, level: int = logging.INFO, **extra) -> logging.LogRecord:
+    record = logging.LogRecord(name, level, __file__, 1, 'user %s', ('login',), None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_sampling_filter_keeps_every_nth_info_record():
+    """
+    Тест для SamplingFilter - ниже WARNING пишется каждая N-я запись, предупреждения и другие логгеры не трогаются
+    """
+    sampling = SamplingFilter(SamplingFilter.parse('battle_cards.security=0.25, battle_cards.off=0'))
+
+    kept = [sampling.filter(make_record('battle_cards.security')) for _ in range(8)]
+    assert kept == [True, False, False, False, True, False, False, False]
+    assert sampling.filter(make_record('battle_cards.security', logging.WARNING))
+    assert sampling.filter(make_record('battle_cards'))
+    assert not sampling.filter(make_record('battle_cards.off'))
+    assert sampling.dropped == 7
+
+
+def test_json_formatter_renders_extra_fields():
+    """
+    Тест для JsonFormatter - одна JSON строка с сообщением и полями из extra
+    """
+    payload = json.loads(JsonFormatter().format(make_record('battle_cards', user_id=7)))
+
+    assert payload['message'] == 'user login'
+    assert payload['level'] == 'INFO'
+    assert payload['logger'] == 'battle_cards'
+    assert payload['user_id'] == 7
+
+
+def test_create_logger_twice_exits_cleanly():
+    """
+    Тест для create_logger - повторная настройка (двойной импорт logger) не роняет остановку потока при выходе
+    """
+    code = 'import backend.logger as first; first.create_logger(); first.GLOG.warning("done")'
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(sys.path)}
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, env=env, timeout=30)
+    assert result.returncode == 0
+    assert 'done' in result.stderr
+    assert 'Traceback' not in result.stderr
+
+
+def test_log_json_is_parsed_as_flag():
+    """
+    Тест для LOG_JSON - "0" выключает JSON даже в production, без LOG_JSON формат следует PROD
+    """
+    code = 'import backend.logger as logger; print(logger.LOG_JSON)'
+    base_env = {key: value for key, value in os.environ.items() if key not in ('LOG_JSON', 'PROD')}
+    base_env['PYTHONPATH'] = os.pathsep.join(sys.path)
+    outputs = []
+    for env in ({'LOG_JSON': '0', 'PROD': '1'}, {'PROD': '1'}, {'LOG_JSON': '1'}, {}):
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                                env={**base_env, **env}, timeout=30)
+        outputs.append(result.stdout.strip())
+    assert outputs == ['False', 'True', 'True', 'False']